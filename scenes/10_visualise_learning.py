@@ -1,7 +1,10 @@
-import json
 import numpy as np
 from manim import *
 
+from reeval.checkpoint import load_checkpoint, save_checkpoint
+from reeval.histogram import HistogramBars, HistogramTransition, histogram_densities
+from reeval.logs import load_learning_logs
+
 Text.set_default(font_size=24)
 
 class VisualizeLearningScene(Scene):
@@ -44,34 +47,32 @@ class VisualizeLearningScene(Scene):
         z_iterations = len(z_data)  # Should be 4
         theta_iterations = len(theta_data)  # Should be 14
         
+        # Bin every iteration up front; each transition then only moves bar heights
+        z_densities = histogram_densities(z_data, y_max=z_axes.y_range[1])
+        theta_densities = histogram_densities(theta_data, y_max=theta_axes.y_range[1])
+
         # Phase 1: Z Distribution Animation
-        current_hist = None
+        z_hist = HistogramBars(current_axes, z_densities[0], RED, 0.7)
         
         for iteration in range(z_iterations):
-            z_values = z_data[iteration]
-            z_hist = self.create_histogram(z_values, current_axes, RED, 0.7)
-            
-            
             if iteration == 0:
                 # First iteration: create histogram
                 self.play(
                     Create(z_hist),
                     run_time=1.5
                 )
-                current_hist = z_hist
             else:
-                self.play(ReplacementTransform(current_hist, z_hist), run_time=1.0)
-                current_hist = z_hist
+                self.play(HistogramTransition(z_hist, z_densities[iteration]), run_time=1.0)
             
             self.wait(0.1)
         
         # Keep the final Z histogram and switch to theta axes
         # First, rescale the Z histogram for the new theta axes range
-        final_z_values = z_data[-1]  # Get the last Z iteration
-        final_z_hist_rescaled = self.create_histogram(final_z_values, theta_axes, RED, 0.4)  # Lower opacity
+        final_z_density = histogram_densities(z_data[-1], y_max=theta_axes.y_range[1])
+        final_z_hist_rescaled = HistogramBars(theta_axes, final_z_density, RED, 0.4)  # Lower opacity
         
         self.play(
-            ReplacementTransform(current_hist, final_z_hist_rescaled),  # Rescale Z histogram
+            ReplacementTransform(z_hist, final_z_hist_rescaled),  # Rescale Z histogram
             ReplacementTransform(current_axes, theta_axes),
             run_time=1.5
         )
@@ -81,134 +82,34 @@ class VisualizeLearningScene(Scene):
         final_z_histogram = final_z_hist_rescaled  # Keep reference to the Z histogram
         
         # Phase 2: Theta Distribution Animation
-        current_theta_hist = None
+        theta_hist = HistogramBars(current_axes, theta_densities[0], BLUE, 0.6)  # Semi-transparent
         
         for iteration in range(theta_iterations):
-            theta_values = theta_data[iteration]
-            theta_hist = self.create_histogram(theta_values, current_axes, BLUE, 0.6)  # Semi-transparent
-            
             if iteration == 0:
                 # First theta iteration: create histogram (Z histogram stays in background)
                 self.play(
                     Create(theta_hist),
                     run_time=1.5
                 )
-                current_theta_hist = theta_hist
             else:
-                # Smoothly transform theta histogram bars (Z histogram remains unchanged)
-                self.play(ReplacementTransform(current_theta_hist, theta_hist), run_time=1.0)
-                current_theta_hist = theta_hist
+                # Smoothly resize theta histogram bars (Z histogram remains unchanged)
+                self.play(HistogramTransition(theta_hist, theta_densities[iteration]), run_time=1.0)
             
             self.wait(0.1)
         
         self.wait(2)
+        save_checkpoint(self, "learning_final", axes=current_axes, z_hist=final_z_histogram, theta_hist=theta_hist)
     
     def load_data(self):
-        """Load theta and z batch data"""
-        # Load theta data
-        theta_data = []
-        with open('/Users/ronan/Library/CloudStorage/OneDrive-LECOLECO.,LTD/Media - Personal/REEVAL/animation/data/rasch_global_theta.jsonl', 'r') as f:
-            for line in f:
-                entry = json.loads(line.strip())
-                theta_data.append(entry['parameters']['theta'])
-        
-        # Load z batch data (combine both batches)
-        z_data = []
-        
-        # Load first batch
-        with open('/Users/ronan/Library/CloudStorage/OneDrive-LECOLECO.,LTD/Media - Personal/REEVAL/animation/data/rasch_global_z_batch_0_50000.jsonl', 'r') as f:
-            z_batch_1 = []
-            for line in f:
-                entry = json.loads(line.strip())
-                z_batch_1.append(entry['parameters']['z'])
-        
-        # Load second batch
-        with open('/Users/ronan/Library/CloudStorage/OneDrive-LECOLECO.,LTD/Media - Personal/REEVAL/animation/data/rasch_global_z_batch_50000_78712.jsonl', 'r') as f:
-            z_batch_2 = []
-            for line in f:
-                entry = json.loads(line.strip())
-                z_batch_2.append(entry['parameters']['z'])
-        
-        # Combine z batches for each iteration
-        max_iterations = min(len(z_batch_1), len(z_batch_2))
-        for i in range(max_iterations):
-            combined_z = z_batch_1[i] + z_batch_2[i]  # Concatenate the two batches
-            z_data.append(combined_z)
-        
-        return z_data, theta_data
-    
-    def create_histogram(self, data, axes, color, opacity):
-        """Create a normalized histogram (density) from data values"""
-        # Create bins
-        bins = np.arange(-4, 4.2, 0.2)
-        density, _ = np.histogram(data, bins=bins, density=True)
-        
-        # Scale density to fit within axes range
-        max_density = np.max(density)
-        axes_max_y = axes.y_range[1]  # Get the maximum y value from axes
-        
-        if max_density > axes_max_y:
-            # Scale down all density values to fit within axes range
-            scale_factor = (axes_max_y * 0.9) / max_density  # Use 90% of max to leave some headroom
-            density = density * scale_factor
-        
-        # Create rectangles for histogram - ALWAYS create all bars for consistent structure
-        rectangles = VGroup()
-        bin_width = 0.2
-        
-        for i, dens in enumerate(density):
-            bin_left = bins[i]
-            bin_center = bin_left + bin_width / 2
-            
-            # Create rectangle even if density is 0 (for smooth transformations)
-            if dens > 0:
-                rect_height = axes.c2p(0, dens)[1] - axes.c2p(0, 0)[1]
-            else:
-                rect_height = 0.01  # Minimum height for zero bars
-            
-            rect_width = axes.c2p(bin_width, 0)[0] - axes.c2p(0, 0)[0]
-            
-            rect = Rectangle(
-                height=max(rect_height, 0.01),
-                width=rect_width,
-                fill_color=color,
-                fill_opacity=opacity if dens > 0 else 0.1,  # Lower opacity for zero bars
-                stroke_width=1 if dens > 0 else 0,
-                stroke_color=color if dens > 0 else GRAY
-            )
-            
-            # Position rectangle properly
-            if dens > 0:
-                rect.move_to(axes.c2p(bin_center, dens/2))
-            else:
-                rect.move_to(axes.c2p(bin_center, 0.005))  # Position zero bars at bottom
-                
-            rectangles.add(rect)
-        
-        return rectangles
+        """Load theta and z batch data (iterations x values, memory-mapped)"""
+        return load_learning_logs()
 
 
 class HistogramSplitMergeScene(Scene):
     def construct(self):
-        # Load data to get final distributions
-        z_data, theta_data = self.load_data()
-        final_z_values = z_data[-1]  # Last Z iteration
-        final_theta_values = theta_data[-1]  # Last Theta iteration
-
-        # Create dummy axes for histogram creation (won't be displayed)
-        dummy_axes = Axes(
-            x_range=[-4, 4, 0.5],
-            y_range=[0, 1, 0.2],
-            x_length=10,
-            y_length=5,
-            axis_config={"color": BLUE, "include_tip": False},
-            x_axis_config={"numbers_to_include": np.arange(-4, 5, 1)},
-            y_axis_config={"numbers_to_include": np.arange(0, 1.1, 0.2)},
-        )
-        
-        # Create the overlapping histograms (final state)
-        z_hist = self.create_histogram(final_z_values, dummy_axes, RED, 0.4)
-        theta_hist = self.create_histogram(final_theta_values, dummy_axes, BLUE, 0.6)
+        # Start from the final histograms of VisualizeLearningScene (without its axes)
+        state = load_checkpoint("learning_final", producer=VisualizeLearningScene)["named"]
+        z_hist, theta_hist = state["z_hist"], state["theta_hist"]
         
         # Initial setup - show overlapping histograms
         self.play(
@@ -252,87 +153,4 @@ class HistogramSplitMergeScene(Scene):
         )
         
         self.wait(3)
-    
-    def load_data(self):
-        """Load theta and z batch data (same as original scene)"""
-        # Load theta data
-        theta_data = []
-        with open('/Users/ronan/Library/CloudStorage/OneDrive-LECOLECO.,LTD/Media - Personal/REEVAL/animation/data/rasch_global_theta.jsonl', 'r') as f:
-            for line in f:
-                entry = json.loads(line.strip())
-                theta_data.append(entry['parameters']['theta'])
-        
-        # Load z batch data (combine both batches)
-        z_data = []
-        
-        # Load first batch
-        with open('/Users/ronan/Library/CloudStorage/OneDrive-LECOLECO.,LTD/Media - Personal/REEVAL/animation/data/rasch_global_z_batch_0_50000.jsonl', 'r') as f:
-            z_batch_1 = []
-            for line in f:
-                entry = json.loads(line.strip())
-                z_batch_1.append(entry['parameters']['z'])
-        
-        # Load second batch
-        with open('/Users/ronan/Library/CloudStorage/OneDrive-LECOLECO.,LTD/Media - Personal/REEVAL/animation/data/rasch_global_z_batch_50000_78712.jsonl', 'r') as f:
-            z_batch_2 = []
-            for line in f:
-                entry = json.loads(line.strip())
-                z_batch_2.append(entry['parameters']['z'])
-        
-        # Combine z batches for each iteration
-        max_iterations = min(len(z_batch_1), len(z_batch_2))
-        for i in range(max_iterations):
-            combined_z = z_batch_1[i] + z_batch_2[i]  # Concatenate the two batches
-            z_data.append(combined_z)
-        
-        return z_data, theta_data
-    
-    def create_histogram(self, data, axes, color, opacity):
-        """Create a normalized histogram (density) from data values (same as original scene)"""
-        # Create bins
-        bins = np.arange(-4, 4.2, 0.2)
-        density, _ = np.histogram(data, bins=bins, density=True)
-        
-        # Scale density to fit within axes range
-        max_density = np.max(density)
-        axes_max_y = axes.y_range[1]  # Get the maximum y value from axes
-        
-        if max_density > axes_max_y:
-            # Scale down all density values to fit within axes range
-            scale_factor = (axes_max_y * 0.9) / max_density  # Use 90% of max to leave some headroom
-            density = density * scale_factor
-        
-        # Create rectangles for histogram - ALWAYS create all bars for consistent structure
-        rectangles = VGroup()
-        bin_width = 0.2
-        
-        for i, dens in enumerate(density):
-            bin_left = bins[i]
-            bin_center = bin_left + bin_width / 2
-            
-            # Create rectangle even if density is 0 (for smooth transformations)
-            if dens > 0:
-                rect_height = axes.c2p(0, dens)[1] - axes.c2p(0, 0)[1]
-            else:
-                rect_height = 0.01  # Minimum height for zero bars
-            
-            rect_width = axes.c2p(bin_width, 0)[0] - axes.c2p(0, 0)[0]
-            
-            rect = Rectangle(
-                height=max(rect_height, 0.01),
-                width=rect_width,
-                fill_color=color,
-                fill_opacity=opacity if dens > 0 else 0.1,  # Lower opacity for zero bars
-                stroke_width=1 if dens > 0 else 0,
-                stroke_color=color if dens > 0 else GRAY
-            )
-            
-            # Position rectangle properly
-            if dens > 0:
-                rect.move_to(axes.c2p(bin_center, dens/2))
-            else:
-                rect.move_to(axes.c2p(bin_center, 0.005))  # Position zero bars at bottom
-                
-            rectangles.add(rect)
-        
-        return rectangles
+
@@ -1,6 +1,7 @@
 from manim import *
 import numpy as np
-import random
+
+from reeval.cat import SimulatedResponder, simulate
 
 class AdaptiveTestingVisualization(Scene):
     def construct(self):
@@ -8,6 +9,8 @@ class AdaptiveTestingVisualization(Scene):
         self.item_bank_size = 50  # Number of items in the bank
         self.num_iterations = 7   # Total number of test items to administer
         self.ability_range = [-2, 2]
+        self.true_ability = 0.35  # Ability of the simulated test-taker
+        self.seed = 1
         
         # Initialize components
         self.setup_visual_elements()
@@ -43,32 +46,25 @@ class AdaptiveTestingVisualization(Scene):
             color=BLUE
         ).scale(0.15).next_to(self.ability_scale.n2p(0), UP, buff=0.1)
         
-        # Item Bank (Grid of grey dots)
+        # Item Bank (grey dots, each above its difficulty on the ability scale)
+        rng = np.random.default_rng(self.seed)
+        self.item_difficulties = rng.uniform(*self.ability_range, self.item_bank_size)
         self.item_positions = []
         self.item_dots = VGroup()
         
-        # Create a grid-like arrangement with some randomness
-        rows, cols = 5, 5
-        for i in range(self.item_bank_size):
-            if i < rows * cols:
-                row = i // cols
-                col = i % cols
-                # Add some randomness to make it look more natural
-                x = (col - cols//2) * 0.8 + random.uniform(-0.15, 0.15)
-                y = (row - rows//2) * 0.6 + random.uniform(-0.1, 0.1) + 1.5
-                pos = np.array([x, y, 0])
-            else:
-                # Random positions for extra dots
-                pos = np.array([
-                    random.uniform(-3, 3),
-                    random.uniform(0.5, 2.5),
-                    0
-                ])
-            
+        for difficulty in self.item_difficulties:
+            pos = np.array([self.ability_scale.n2p(difficulty)[0], rng.uniform(0.5, 2.5), 0])
             self.item_positions.append(pos)
             dot = Dot(point=pos, radius=0.08, color=GREY, fill_opacity=0.7)
             self.item_dots.add(dot)
         
+        # One real MFI session (items, answers, EAP estimates) to replay
+        responder = SimulatedResponder([self.true_ability], self.item_difficulties, seed=self.seed)
+        trajectory = simulate(responder, self.item_difficulties, max_items=self.num_iterations)
+        self.trajectory_items = trajectory.items[0].tolist()
+        self.trajectory_responses = trajectory.responses[0].astype(bool).tolist()
+        self.trajectory_theta = trajectory.theta[0].tolist()
+        
         # Initialize tracking variables
         self.current_item_index = 0
         self.selected_items = []
@@ -104,8 +100,8 @@ class AdaptiveTestingVisualization(Scene):
             )
         )
         
-        # 4. Transform first item to glowing yellow
-        self.current_item_index = random.randint(0, len(self.item_dots) - 1)
+        # 4. Transform first item (most informative at 0) to glowing yellow
+        self.current_item_index = self.trajectory_items[0]
         first_item = self.item_dots[self.current_item_index]
         self.selected_items.append(self.current_item_index)
         
@@ -141,25 +137,25 @@ class AdaptiveTestingVisualization(Scene):
             run_time=0.8
         )
         
-        # 2. Flash green (correct answer)
-        green_flash = Circle(
+        # 2. Flash green (correct answer) or red (incorrect answer)
+        flash = Circle(
             radius=0.25,
-            color=GREEN,
+            color=GREEN if self.trajectory_responses[0] else RED,
             fill_opacity=0.8,
             stroke_width=0
         ).move_to(current_item.get_center())
         
         self.play(
-            FadeIn(green_flash),
+            FadeIn(flash),
             run_time=0.3
         )
         self.play(
-            FadeOut(green_flash),
+            FadeOut(flash),
             run_time=0.3
         )
         
-        # 3. Update ability estimate to the right
-        new_ability = 0.5
+        # 3. Update ability estimate
+        new_ability = self.trajectory_theta[1]
         self.ability_estimate = new_ability
         new_position = self.ability_scale.n2p(new_ability)
         
@@ -187,9 +183,8 @@ class AdaptiveTestingVisualization(Scene):
         # 1. Transfer glow to new item
         old_item = self.item_dots[self.current_item_index]
         
-        # Select adjacent item (or random if no clear adjacent)
-        available_indices = [i for i in range(len(self.item_dots)) if i not in self.selected_items]
-        self.current_item_index = random.choice(available_indices)
+        # Most informative remaining item at the new estimate
+        self.current_item_index = self.trajectory_items[1]
         new_item = self.item_dots[self.current_item_index]
         self.selected_items.append(self.current_item_index)
         
@@ -245,19 +240,19 @@ class AdaptiveTestingVisualization(Scene):
             run_time=0.8
         )
         
-        # 3. Flash red (incorrect answer)
-        red_flash = Circle(
+        # 3. Flash the answer
+        flash = Circle(
             radius=0.25,
-            color=RED,
+            color=GREEN if self.trajectory_responses[1] else RED,
             fill_opacity=0.8,
             stroke_width=0
         ).move_to(new_item.get_center())
         
-        self.play(FadeIn(red_flash), run_time=0.3)
-        self.play(FadeOut(red_flash), run_time=0.3)
+        self.play(FadeIn(flash), run_time=0.3)
+        self.play(FadeOut(flash), run_time=0.3)
         
-        # 4. Update ability estimate to the left
-        new_ability = 0.2
+        # 4. Update ability estimate
+        new_ability = self.trajectory_theta[2]
         self.ability_estimate = new_ability
         new_position = self.ability_scale.n2p(new_ability)
         
@@ -271,23 +266,17 @@ class AdaptiveTestingVisualization(Scene):
     def scene_4_iterative_process(self):
         """Scene 4: The Iterative Process"""
         
-        # Define ability updates for remaining iterations (showing convergence)
-        ability_updates = [0.4, 0.3, 0.35, 0.33, 0.34]  # Converging around 0.34
-        responses = [True, False, True, True, False]  # Mix of correct/incorrect
+        # Remaining steps of the simulated session (estimates converge on the true ability)
+        remaining = zip(self.trajectory_items[2:], self.trajectory_responses[2:], self.trajectory_theta[3:])
         
-        for i, (response, target_ability) in enumerate(zip(responses, ability_updates)):
+        for i, (item_index, response, target_ability) in enumerate(remaining):
             # Speed up later iterations
             speed_multiplier = 1 + (i * 0.3)  # Progressively faster
             base_time = max(0.5, 1.0 / speed_multiplier)
             
             # Transfer to new item
             old_item = self.item_dots[self.current_item_index]
-            available_indices = [j for j in range(len(self.item_dots)) if j not in self.selected_items]
-            
-            if not available_indices:  # If we run out, reuse some items
-                available_indices = list(range(len(self.item_dots)))
-            
-            self.current_item_index = random.choice(available_indices)
+            self.current_item_index = item_index
             new_item = self.item_dots[self.current_item_index]
             self.selected_items.append(self.current_item_index)
             
@@ -1,20 +1,23 @@
 from manim import *
-import random
 import numpy as np
 
+from reeval.numlabels import NumberLabelFactory, NumberReadout
+from reeval.particles import ParticleCloud, ParticleSystem, bake
 
 MathTex.set_default(font_size=34)
-DecimalNumber.set_default(num_decimal_places=0, font_size=34)
 
 class TriangleStackGravityScene(MovingCameraScene):
     """Build a triangular stack of circles, pause, then drop them with gravity and bounces."""
 
     def construct(self):
-        random.seed(7)
-
         base_count = 12
         circle_radius = 0.18
         gap = 0.06
+        # Run times of the plays the particles fall through
+        lift_time = 1.0
+        label_time = 0.4
+        count_time = 1.2
+        settle_time = 3.8
 
         diameter = 2 * circle_radius
         horizontal_step = diameter + gap
@@ -65,62 +68,40 @@ class TriangleStackGravityScene(MovingCameraScene):
         left_x = -frame_w / 2 + 0.1
         right_x = frame_w / 2 - 0.1
 
-        gravity = 5.2
-
-        def apply_physics(mobj: Mobject, dt: float) -> None:
-            v = getattr(mobj, "velocity", np.array([0.0, 0.0, 0.0], dtype=float))
-            restitution = getattr(mobj, "restitution", 0.65)
-
-            v[1] -= gravity * dt
-            mobj.shift(v * dt)
-
-            if mobj.get_bottom()[1] <= floor_y:
-                c = mobj.get_center()
-                c[1] = floor_y + circle_radius
-                mobj.move_to(c)
-                if v[1] < 0:
-                    v[1] = -v[1] * restitution
-                    v[0] += random.uniform(-0.5, 0.5)
-                v[0] *= 0.985
-
-            if mobj.get_left()[0] <= left_x:
-                c = mobj.get_center()
-                c[0] = left_x + circle_radius
-                mobj.move_to(c)
-                if v[0] < 0:
-                    v[0] = -v[0] * restitution
-
-            if mobj.get_right()[0] >= right_x:
-                c = mobj.get_center()
-                c[0] = right_x - circle_radius
-                mobj.move_to(c)
-                if v[0] > 0:
-                    v[0] = -v[0] * restitution
-
-            if abs(v[1]) < 0.02 and abs(mobj.get_bottom()[1] - floor_y) < 1e-3:
-                v[1] = 0.0
-            mobj.velocity = v
-
+        # Every falling circle is one particle of a single vectorized system, drawn as one mobject
         falling_circles = [c for c in all_circles if c is not top_circle]
-        for c in falling_circles:
-            c.velocity = np.array([random.uniform(-0.25, 0.25), 0.0, 0.0], dtype=float)
-            c.restitution = random.uniform(0.58, 0.75)
-            c.add_updater(apply_physics)
+        rng = np.random.default_rng(7)
+        system = ParticleSystem(
+            [c.get_center() for c in falling_circles],
+            velocities=np.column_stack([rng.uniform(-0.25, 0.25, len(falling_circles)), np.zeros(len(falling_circles))]),
+            restitution=rng.uniform(0.58, 0.75, len(falling_circles)),
+            radius=circle_radius,
+            bounds=(left_x, right_x, floor_y),
+            seed=7,
+        )
+        # Simulated once at a fixed step (cached per seed and parameters), replayed by time;
+        # the bake covers exactly the plays below, so retiming them retimes the bake
+        fall_time = settle_time + (lift_time + label_time + count_time if top_circle is not None else 0.0)
+        trajectory = bake(system, duration=fall_time)
+        particles = ParticleCloud(system, template=falling_circles[0])
+        self.remove(*falling_circles)
+        self.add(particles.replay(trajectory))
+        if top_circle is not None:
+            self.bring_to_front(top_circle)
 
         if top_circle is not None:
-            self.play(top_circle.animate.move_to(pyramid_group.get_top()), run_time=1.0)
+            self.play(top_circle.animate.move_to(pyramid_group.get_top()), run_time=lift_time)
 
-            theta_text = MathTex(r"\theta =")
-            theta_number = DecimalNumber(0, num_decimal_places=0)
-            theta_group = VGroup(theta_text, theta_number).arrange(RIGHT, buff=0.15)
+            # "\theta =" and the digits from one TeX compile; counting up only moves glyph points
+            theta_value = ValueTracker(0)
+            theta_group = NumberReadout(NumberLabelFactory(r"\theta =", num_decimal_places=0, font_size=34), 0).track(theta_value)
             theta_group.next_to(top_circle, DOWN, buff=0.6)
-            self.play(FadeIn(theta_group, shift=0.2 * UP), run_time=0.4)
-            self.play(ChangeDecimalToValue(theta_number, 2), run_time=1.2, rate_func=linear)
+            self.play(FadeIn(theta_group, shift=0.2 * UP), run_time=label_time)
+            self.play(theta_value.animate.set_value(2), run_time=count_time, rate_func=linear)
 
-        self.wait(3.8)
+        self.wait(settle_time)
 
-        for c in falling_circles:
-            c.remove_updater(apply_physics)
+        particles.stop()
 
         self.wait(0.5)
 
@@ -1,24 +1,10 @@
 from manim import *
-import numpy as np
+
+from reeval.curves import ParameterSweepCurve, TrackedTexLabel
+from reeval.irt import icc
 
 Text.set_default(font_size=34)
 MathTex.set_default(font_size=34)
-def icc_function(theta, a=2.5, b=0, c=0):
-    """
-    Calculates the probability of a correct response using the 3-Parameter Logistic (3PL) IRT model.
-
-    Args:
-        theta (float or np.array): The ability level(s).
-        a (float): The discrimination parameter.
-        b (float): The difficulty parameter.
-        c (float): The guessing parameter (lower asymptote).
-    """
-    # The original 2PL probability calculation
-    prob_from_ability = 1 / (1 + np.exp(-a * (theta - b)))
-
-    # Scale the probability by the (1-c) range and add the 'c' floor
-    return c + (1 - c) * prob_from_ability
-
 
 class Scene1(Scene):
     """Scene 1: The Basic Item Characteristic Curve (ICC)"""
@@ -43,10 +29,11 @@ class Scene1(Scene):
         
         # Create the basic ICC curve with more curvature
         icc_curve = axes.plot(
-            lambda theta: icc_function(theta, a=2.5, b=0),
+            lambda theta: icc(theta, a=2.5, b=0),
             color=BLUE,
             stroke_width=4,
-            x_range=[-4, 4]
+            x_range=[-4, 4],
+            use_vectorized=True
         )
         
         # Animate the creation of axes
@@ -85,29 +72,33 @@ class Scene2(Scene):
         b_tracker_2 = ValueTracker(0)
         x_tracker = ValueTracker(0)
         
-        # Create dynamic label that updates with b_tracker
-        dynamic_y_label = always_redraw(lambda: axes.get_y_axis_label(
-            rf"P(\theta, b={b_tracker.get_value():.1f})", 
-            edge=UP, 
-            direction=LEFT, 
-            buff=0.3
-        ))
+        # Create dynamic label that updates with b_tracker (one TeX build per shown value)
+        dynamic_y_label = TrackedTexLabel(
+            b_tracker,
+            r"P(\theta, b={:.1f})",
+            lambda tex: axes.get_y_axis_label(tex, edge=UP, direction=LEFT, buff=0.3)
+        )
         x_label = axes.get_x_axis_label(r"\theta", edge=DOWN, direction=DOWN, buff=0.3)
         
-        # Create the basic ICC curve with more curvature
-        original_curve = always_redraw(lambda: axes.plot(
-            lambda theta: icc_function(theta, a=2.5, b=b_tracker.get_value()),
+        # Create the basic ICC curve with more curvature (family precomputed over b)
+        original_curve = ParameterSweepCurve(
+            axes,
+            lambda theta, b: icc(theta, a=2.5, b=b),
+            b_tracker,
+            param_range=(-2, 2),
             color=BLUE,
-            stroke_width=4,
-            x_range=[-4, 4]
-        ))
+            stroke_width=4
+        )
 
-        upper_original_curve = always_redraw(lambda: axes.plot(
-            lambda theta: icc_function(theta, a=2.5, b=b_tracker_2.get_value()),
+        upper_original_curve = ParameterSweepCurve(
+            axes,
+            lambda theta, b: icc(theta, a=2.5, b=b),
+            b_tracker_2,
+            param_range=(-2, 2),
+            x_min_tracker=x_tracker,
             color=YELLOW,
-            stroke_width=4,
-            x_range=[x_tracker.get_value(), 4]
-        ))
+            stroke_width=4
+        )
 
         # 2-PL formula (from PL_forms) and title
         title_1pl = Title("1-PL Model")
@@ -177,24 +168,21 @@ class Scene3(Scene):
         a_tracker = ValueTracker(2.5)
 
         # Create dynamic label that updates with a_tracker
-        dynamic_y_label = always_redraw(lambda: axes.get_y_axis_label(
-            rf"P(\theta, b, a={a_tracker.get_value():.1f})",
-            edge=UP, 
-            direction=LEFT, 
-            buff=0.3
-        ))
+        dynamic_y_label = TrackedTexLabel(
+            a_tracker,
+            r"P(\theta, b, a={:.1f})",
+            lambda tex: axes.get_y_axis_label(tex, edge=UP, direction=LEFT, buff=0.3)
+        )
         x_label = axes.get_x_axis_label(r"\theta", edge=DOWN, direction=DOWN, buff=0.3)
         
-        # Sigmoid function
-        def sigmoid(x, a=1, b=0):
-            return 1 / (1 + np.exp(-a * (x - b)))
-        
-        original_curve = always_redraw(lambda: axes.plot(
-            lambda x: sigmoid(x, a=a_tracker.get_value(), b=0),
-            x_range=[-4, 4],
+        original_curve = ParameterSweepCurve(
+            axes,
+            lambda x, a: icc(x, a=a, b=0),
+            a_tracker,
+            param_range=(1, 6),
             color=BLUE,
             stroke_width=4
-        ))
+        )
 
         # 2-PL formula (from PL_forms) and title
         title_2pl = Title("2-PL Model")
@@ -244,21 +232,22 @@ class Scene4(Scene):
         c_tracker = ValueTracker(0)
 
         # Create a dynamic label that updates with c_tracker
-        dynamic_y_label = always_redraw(lambda: axes.get_y_axis_label(
-            rf"P(\theta, b, a, c={c_tracker.get_value():.2f})",
-            edge=UP, 
-            direction=LEFT, 
-            buff=0.3
-        ))
+        dynamic_y_label = TrackedTexLabel(
+            c_tracker,
+            r"P(\theta, b, a, c={:.2f})",
+            lambda tex: axes.get_y_axis_label(tex, edge=UP, direction=LEFT, buff=0.3)
+        )
 
         # Create the initial ICC curve with a low guessing parameter
-        # We use always_redraw so the curve morphs as the tracker changes
-        icc_curve = always_redraw(lambda: axes.plot(
-            lambda theta: icc_function(theta, a=1.5, b=0, c=c_tracker.get_value()),
+        # The curve family over c is precomputed so it morphs as the tracker changes
+        icc_curve = ParameterSweepCurve(
+            axes,
+            lambda theta, c: icc(theta, a=1.5, b=0, c=c),
+            c_tracker,
+            param_range=(0, 0.25),
             color=BLUE,
-            stroke_width=4,
-            x_range=[-4, 4]
-        ))
+            stroke_width=4
+        )
 
         # Dashed line to show the "floor" set by the c-parameter
         c_line = always_redraw(lambda: DashedLine(
@@ -268,7 +257,8 @@ class Scene4(Scene):
             stroke_width=3,
         ))
         
-        c_line_label = always_redraw(lambda: MathTex("c", color=YELLOW).next_to(c_line, LEFT, buff=0.2))
+        c_line_label = MathTex("c", color=YELLOW)
+        c_line_label.add_updater(lambda m: m.next_to(c_line, LEFT, buff=0.2), call_updater=True)
 
         # 3-PL formula (from PL_forms) and title
         title_3pl = Title("3-PL Model")
@@ -1,6 +1,9 @@
 from manim import *
 import numpy as np
 
+from reeval.crowd import ApplyToCrowd, Crowd, axes_points, in_coordinates
+from reeval.irt import expit
+
 Text.set_default(font_size=24)
 
 class SigmoidSquash(Scene):
@@ -22,10 +25,7 @@ class SigmoidSquash(Scene):
         self.wait(0.5)
 
         # Sigmoid function and its graph
-        def sigmoid(x: float) -> float:
-            return 1.0 / (1.0 + np.exp(-x))
-
-        curve = axes.plot(lambda x: sigmoid(x), x_range=[-10, 10], color=YELLOW, stroke_width=4)
+        curve = axes.plot(expit, x_range=[-10, 10], color=YELLOW, stroke_width=4, use_vectorized=True)
 
         # Random dots scattered across the entire plot
         num_dots = 240  # at least 200
@@ -34,21 +34,15 @@ class SigmoidSquash(Scene):
         xs = np.random.uniform(x_min, x_max, size=num_dots)
         ys = np.random.uniform(y_min, y_max, size=num_dots)
 
-        dots = VGroup(
-            *[Dot(point=axes.c2p(x, y), radius=0.03, color=WHITE) for x, y in zip(xs, ys)]
-        )
+        dots = Crowd.dots(axes_points(axes, xs, ys), radius=0.03, color=WHITE).set_sizes(0)
+        self.add(dots)
 
-        self.play(FadeIn(dots, lag_ratio=0.04, run_time=1.2))
+        self.play(ApplyToCrowd(dots, sizes=1, lag_ratio=0.04, run_time=1.2))
         self.play(Create(curve), run_time=1.5)
 
-        # Transform each dot to (x, sigmoid(x)) while keeping x fixed
-        animations = []
-        for i, dot in enumerate(dots):
-            x_value = xs[i]
-            target_point = axes.c2p(x_value, sigmoid(x_value))
-            animations.append(Transform(dot, Dot(point=target_point, radius=0.03, color=WHITE)))
-
-        self.play(*animations, run_time=3, rate_func=smooth)
+        # Move each dot to (x, sigmoid(x)) while keeping x fixed
+        squash = in_coordinates(axes, lambda x, y: (x, expit(x)))
+        self.play(ApplyToCrowd(dots, squash, run_time=3))
 
         # Hold final state
         self.wait(3)
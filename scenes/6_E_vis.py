@@ -3,39 +3,33 @@ from manim.opengl import *
 import numpy as np
 import random
 
+from reeval.checkpoint import restore_checkpoint, save_checkpoint
+from reeval.config import data_path
+from reeval.ctt import array_statistics
+from reeval.impute import Imputer
+from reeval.logs import load_learning_logs
+from reeval.numlabels import NumberLabelFactory
+from reeval.resmat import ResponseMatrix
+
 config.background_color = WHITE
 num_students = 12
+num_questions = 8
+# Seed of the imputed answers for missing responses; both scenes draw the same cells
+nan_seed = 7
+
+
+def response_subset():
+    """First ``num_students`` x ``num_questions`` of the response matrix, missing cells imputed from the fitted Rasch model."""
+    response_matrix = ResponseMatrix.open(data_path("resmat"))
+    z_log, theta_log = load_learning_logs()
+    imputer = Imputer(theta_log[-1], z_log[-1], seed=nan_seed)
+    return imputer.take(response_matrix, slice(num_students), slice(num_questions))
 
-# Predetermined random choices for NaN replacement (for reproducibility across scenes)
-# This is a 12x8 matrix of 0s and 1s to replace NaN values
-nan_replacements = [
-    [1, 0, 1, 0, 1, 1, 0, 1],  # Student 0
-    [0, 1, 0, 1, 0, 1, 1, 0],  # Student 1
-    [1, 1, 0, 0, 1, 0, 1, 1],  # Student 2
-    [0, 0, 1, 1, 0, 1, 0, 0],  # Student 3
-    [1, 0, 0, 1, 1, 0, 1, 1],  # Student 4
-    [0, 1, 1, 0, 0, 1, 0, 1],  # Student 5
-    [1, 1, 1, 0, 1, 1, 1, 0],  # Student 6
-    [0, 0, 0, 1, 0, 0, 1, 1],  # Student 7
-    [1, 0, 1, 1, 1, 0, 0, 1],  # Student 8
-    [0, 1, 0, 0, 0, 1, 1, 0],  # Student 9
-    [1, 1, 0, 1, 1, 1, 0, 1],  # Student 10
-    [0, 0, 1, 0, 0, 0, 1, 0],  # Student 11
-]
 
 class Scene1(Scene):
     def construct(self):
-        # Load response matrix data
-        response_matrix_data = np.load("../data/resmat_trunc.npy")
-        # Use a smaller subset for visualization (first 12 students, first 8 questions)
-        matrix_subset = response_matrix_data[:12, :8]
-        
-        # Create a cleaner matrix by replacing NaN with predetermined values for visualization
-        for i in range(matrix_subset.shape[0]):
-            for j in range(matrix_subset.shape[1]):
-                if np.isnan(matrix_subset[i, j]):
-                    matrix_subset[i, j] = nan_replacements[i][j]  # Use predetermined values
-        
+        # Load a small subset for visualization (first 12 students, first 8 questions), NaNs imputed
+        matrix_subset = response_subset()
         
         # === Initial State: Blank Scene ===
         self.camera.background_color = "#141414"
@@ -117,7 +111,6 @@ class Scene1(Scene):
         # === Introduce Questions & Data ===
         
         # Create empty difficulty boxes on the right side
-        num_questions = 8
         difficulty_boxes = VGroup()
         box_labels = VGroup()
         
@@ -225,92 +218,30 @@ class Scene1(Scene):
         )
         
         self.wait(2)
+        save_checkpoint(
+            self, "e_vis_scene1",
+            test_taker_circles=test_taker_circles,
+            difficulty_boxes=difficulty_boxes, box_labels=box_labels,
+            matrix_group=matrix_group, matrix_label=matrix_label,
+        )
 
 
 class Scene2(Scene):
     def construct(self):
-        # Load response matrix data (same as Scene 1)
-        response_matrix_data = np.load("../data/resmat_trunc.npy")
-        matrix_subset = response_matrix_data[:12, :8]
-        
-        # Create a cleaner matrix by replacing NaN with predetermined values for visualization
-        for i in range(matrix_subset.shape[0]):
-            for j in range(matrix_subset.shape[1]):
-                if np.isnan(matrix_subset[i, j]):
-                    matrix_subset[i, j] = nan_replacements[i][j]  # Use predetermined values
-        
-        # === Recreate Scene 1 final state ===
-        self.camera.background_color = "#141414"
-        
-        # Test-takers (faded)
-        test_taker_circles = VGroup()
-        rows, cols = 3, 4
-        offsets_x = [-0.125, 0.218, -0.268, -0.014, 0.152, 0.207, 0.191, 0.297, 0.178, -0.288, -0.128, 0.066]
-        offsets_y = [0.197, -0.049, 0.038, -0.236, 0.146, -0.131, -0.298, 0.276, 0.199, 0.113, -0.209, -0.117]
-
-        for i in range(num_students):
-            row = i // cols
-            col = i % cols
-
-            # Use precomputed offsets for reproducibility
-            offset_x = offsets_x[i]
-            offset_y = offsets_y[i]
-            circle = Circle(
-                radius=0.2,
-                color=GREY,
-                fill_opacity=0.1,
-                stroke_color=DARK_GREY,
-                stroke_width=2,
-                stroke_opacity=0.1
-            )
-            circle.move_to([-5.5 + col * 0.8 + offset_x, 1.5 - row * 0.8 + offset_y, 0])
-            test_taker_circles.add(circle)
-        # Difficulty boxes (empty)
-        difficulty_boxes = VGroup()
-        box_labels = VGroup()
-        
-        for i in range(8):
-            box = Rectangle(
-                width=0.4,
-                height=2.0,
-                color=DARK_GRAY,
-                fill_opacity=0,
-                stroke_width=2
-            )
-            box.move_to([4.5 + (i % 4) * 0.6, 1 - (i // 4) * 2.5, 0])
-            
-            label = Text(f"Q{i+1}", color=WHITE, font_size=16)
-            label.next_to(box, DOWN, buff=0.1)
-            
-            difficulty_boxes.add(box)
-            box_labels.add(label)
-        # Response matrix
-        matrix_group = VGroup()
-        matrix_entries = []
-        for i in range(matrix_subset.shape[0]):
-            row = []
-            for j in range(matrix_subset.shape[1]):
-                if matrix_subset[i, j] == 1:
-                    cell = Rectangle(width=0.3, height=0.3, fill_color=GREEN, fill_opacity=0.8, stroke_color=WHITE, stroke_width=1)
-                else:
-                    cell = Rectangle(width=0.3, height=0.3, fill_color=RED, fill_opacity=0.8, stroke_color=WHITE, stroke_width=1)
-                cell.move_to([j * 0.35 - 1.2, 1.5 - i * 0.35, 0])
-                matrix_group.add(cell)
-                row.append(cell)
-            matrix_entries.append(row)
-        
-        matrix_label = Text(
-            "Response Matrix",
-            color=WHITE,
-            font_size=24
-        ).next_to(matrix_group, DOWN, buff=0.5)
-        
-        # Add everything to scene
-        self.add(
-            test_taker_circles,
-            difficulty_boxes, box_labels,
-            matrix_group, matrix_label
-        )
+        # Load response matrix data (same cells and imputed values as Scene 1)
+        matrix_subset = response_subset()
+        # Bar heights (proportion incorrect) and theta labels (proportion correct) of the shown subset
+        stats = array_statistics(matrix_subset)
+        difficulties = stats.difficulty
+        abilities = stats.person_score
+        # One TeX compile for "\theta =" and the digits; every label is composed from it
+        theta_labels = NumberLabelFactory(r"\theta =", num_decimal_places=2, font_size=24, color=WHITE)
+        
+        # === Continue from Scene 1 final state ===
+        state = restore_checkpoint(self, "e_vis_scene1", producer=Scene1)
+        test_taker_circles = state["test_taker_circles"]
+        difficulty_boxes = state["difficulty_boxes"]
+        matrix_group = state["matrix_group"]
         
         # === PART A: Estimating Question Difficulty ===
         
@@ -341,8 +272,7 @@ class Scene2(Scene):
         self.wait(0.5)
         
         # Calculate difficulty for first question (proportion of incorrect answers)
-        first_col_data = matrix_subset[:, 0]
-        difficulty_prop = 1 - np.mean(first_col_data)  # Higher when more students got it wrong
+        difficulty_prop = difficulties[0]  # Higher when more students got it wrong
         
         # Fill the first difficulty box
         fill_height = difficulty_prop * 1.8  # Scale to box height
@@ -388,8 +318,7 @@ class Scene2(Scene):
         self.play(Transform(first_col_highlight, second_col_highlight), run_time=1)
         
         # Fill second box
-        second_col_data = matrix_subset[:, 1]
-        difficulty_prop_2 = 1 - np.mean(second_col_data)
+        difficulty_prop_2 = difficulties[1]
         fill_height_2 = difficulty_prop_2 * 1.8
         
         second_fill = Rectangle(
@@ -411,8 +340,7 @@ class Scene2(Scene):
         # Fill remaining boxes rapidly with LaggedStart
         remaining_fills = VGroup()
         for j in range(2, 8):
-            col_data = matrix_subset[:, j]
-            difficulty_prop = 1 - np.mean(col_data)
+            difficulty_prop = difficulties[j]
             fill_height = difficulty_prop * 1.8
             
             fill = Rectangle(
@@ -478,12 +406,11 @@ class Scene2(Scene):
         )
         
         # Calculate and apply opacity for first student
-        first_student_data = matrix_subset[0, :]
-        ability_score = np.mean(first_student_data)
+        ability_score = abilities[0]
         opacity = 0.3 + 0.7 * ability_score  # Higher ability = more opaque
         
         # Create theta label for first student
-        first_theta_label = MathTex(f"\\theta = {ability_score:.2f}", color=WHITE, font_size=24)
+        first_theta_label = theta_labels.label(ability_score)
         first_theta_label.next_to(test_taker_circles[0], RIGHT, buff=0.3)
         
         self.play(
@@ -513,12 +440,11 @@ class Scene2(Scene):
         )
         
         # Calculate and apply opacity for second student
-        second_student_data = matrix_subset[1, :]
-        second_ability_score = np.mean(second_student_data)
+        second_ability_score = abilities[1]
         second_opacity = 0.3 + 0.7 * second_ability_score
         
         # Create theta label for second student
-        second_theta_label = MathTex(f"\\theta = {second_ability_score:.2f}", color=WHITE, font_size=24)
+        second_theta_label = theta_labels.label(second_ability_score)
         second_theta_label.next_to(test_taker_circles[1], RIGHT, buff=0.3)
         
         self.play(
@@ -533,16 +459,13 @@ class Scene2(Scene):
 
         # Apply opacity changes to all remaining students quickly
         remaining_opacity_animations = []
-        remaining_theta_labels = []
+        remaining_theta_labels = list(theta_labels.labels(abilities[2:]))
         for i in range(2, 12):
-            student_data = matrix_subset[i, :]
-            ability_score = np.mean(student_data)
+            ability_score = abilities[i]
             opacity = 0.3 + 0.7 * ability_score
             
-            # Create theta label for this student
-            theta_label = MathTex(f"\\theta = {ability_score:.2f}", color=WHITE, font_size=24)
-            theta_label.next_to(test_taker_circles[i], RIGHT, buff=0.3)
-            remaining_theta_labels.append(theta_label)
+            # Place the theta label for this student
+            remaining_theta_labels[i - 2].next_to(test_taker_circles[i], RIGHT, buff=0.3)
             
             remaining_opacity_animations.append(test_taker_circles[i].animate.set_fill(BLUE).set_stroke(DARK_BLUE).set_opacity(opacity))
 
@@ -559,9 +482,7 @@ class Scene2(Scene):
         all_theta_labels = [first_theta_label, second_theta_label] + remaining_theta_labels
         
         for i in range(12):
-            student_data = matrix_subset[i, :]
-            ability_score = np.mean(student_data)
-            student_abilities.append((ability_score, i, test_taker_circles[i], all_theta_labels[i]))
+            student_abilities.append((abilities[i], i, test_taker_circles[i], all_theta_labels[i]))
         
         # Sort by ability (highest first)
         student_abilities.sort(key=lambda x: x[0], reverse=True)
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
-import math
 import numpy as np
 from manim import *
 
+from reeval.crowd import ApplyToCrowd, Crowd, axes_points
+from reeval.irt import normal_pdf
+from reeval.sampling import NormalPrior, stratified_sample, stratum_counts
+
 # ====== Layout constants (tweak here to adjust quickly) ======
 TEST_TAKER_X = LEFT * 4
 TEST_TAKER_Y_OFFSET = DOWN * 0.0  # align horizontally with paper and b (y=0)
@@ -21,6 +24,7 @@ AXES_SCALE = 0.25  # smaller distribution to sit on top of the circle
 AXES_OFFSET_FROM_THETA = UP * 0.0  # will place relative to the test-taker top
 
 NUM_RANDOM_SAMPLES = 300
+SAMPLE_SEED = 0
 DOT_RADIUS = 0.04
 DOT_Y_ABOVE_AXIS = 0.02
 
@@ -183,10 +187,7 @@ class UnknownAbilityToDistribution(Scene):
         x_axis_label = MathTex(r"\theta").scale(0.8)
         x_axis_label.next_to(axes.x_axis, DOWN, buff=0.25)
 
-        def standard_normal_pdf(x: float) -> float:
-            return (1.0 / np.sqrt(2 * np.pi)) * np.exp(-(x**2) / 2.0)
-
-        graph = axes.plot(standard_normal_pdf, color="#2a9d8f")
+        graph = axes.plot(normal_pdf, color="#2a9d8f", use_vectorized=True)
 
         distribution_group = VGroup(axes, graph, x_axis_label)
         distribution_group.scale(AXES_SCALE)
@@ -196,59 +197,35 @@ class UnknownAbilityToDistribution(Scene):
         self.play(ReplacementTransform(question_mark, distribution_group), run_time=1.0)
         self.wait(0.3)
 
-        # Random samples proportional to N(0,1) for tails vs center
-        def normal_cdf(x: float) -> float:
-            return 0.5 * (1.0 + math.erf(x / math.sqrt(2.0)))
-
+        # Random samples proportional to N(0,1) for tails vs center, drawn per stratum
         tail_threshold = 2.0
-        p_tail_one_side = 1.0 - normal_cdf(tail_threshold)
-
-        total_n = NUM_RANDOM_SAMPLES
-        left_n = int(round(total_n * p_tail_one_side))
-        right_n = int(round(total_n * p_tail_one_side))
-        center_n = max(0, total_n - left_n - right_n)
-
-        def sample_until(count: int, predicate) -> np.ndarray:
-            if count <= 0:
-                return np.array([], dtype=float)
-            samples: list[float] = []
-            batch = max(16, count * 4)
-            while len(samples) < count:
-                cand = np.random.normal(loc=0.0, scale=1.0, size=batch)
-                for val in cand:
-                    if predicate(float(val)):
-                        samples.append(float(val))
-                        if len(samples) >= count:
-                            break
-            return np.array(samples[:count], dtype=float)
-
-        left_samples = sample_until(left_n, lambda v: v <= -tail_threshold)
-        right_samples = sample_until(right_n, lambda v: v >= tail_threshold)
-        center_samples = sample_until(center_n, lambda v: (-tail_threshold < v < tail_threshold))
+        prior = NormalPrior()
+        cuts = [-np.inf, -tail_threshold, tail_threshold, np.inf]
+        left_n, center_n, right_n = stratum_counts(prior, cuts, NUM_RANDOM_SAMPLES)
+        left_samples, center_samples, right_samples = stratified_sample(
+            prior, cuts, [left_n, center_n, right_n], seed=SAMPLE_SEED
+        )
 
         all_x = np.concatenate([center_samples, left_samples, right_samples])
 
-        dots = VGroup()
-        left_tail_dots = VGroup()
-        right_tail_dots = VGroup()
-
-        for x_value in all_x:
-            x_float = float(x_value)
-            dot_point = axes.c2p(x_float, DOT_Y_ABOVE_AXIS)
-            dot = Dot(point=dot_point, radius=DOT_RADIUS, color=BLUE)
-            dots.add(dot)
-            if x_float <= -tail_threshold:
-                left_tail_dots.add(dot)
-            elif x_float >= tail_threshold:
-                right_tail_dots.add(dot)
-
-        self.play(LaggedStart(*[FadeIn(d, scale=0.8) for d in dots], lag_ratio=0.08), run_time=2.0)
+        dots = Crowd.dots(axes_points(axes, all_x, DOT_Y_ABOVE_AXIS), radius=DOT_RADIUS, color=BLUE).set_sizes(0)
+        self.add(dots)
+        self.play(ApplyToCrowd(dots, sizes=1, lag_ratio=0.08), run_time=2.0)
+
+        # Tails as their own mobjects so they can be indicated separately
+        left_tail = all_x <= -tail_threshold
+        right_tail = all_x >= tail_threshold
+        left_tail_dots = dots.take(left_tail)
+        right_tail_dots = dots.take(right_tail)
+        self.remove(dots)
+        self.add(dots.take(~(left_tail | right_tail)), left_tail_dots, right_tail_dots)
+
         # Highlight both tails at once (skip gracefully if a tail is empty)
         self.wait(2)
         highlight_anims = []
-        if len(left_tail_dots) > 0:
+        if left_tail.any():
             highlight_anims.append(Indicate(left_tail_dots, color=YELLOW, scale_factor=1.4))
-        if len(right_tail_dots) > 0:
+        if right_tail.any():
             highlight_anims.append(Indicate(right_tail_dots, color=YELLOW, scale_factor=1.4))
         if highlight_anims:
             self.play(*highlight_anims, run_time=1.2)
@@ -1,6 +1,8 @@
 from manim import *
 import numpy as np
-import random
+
+from reeval.montecarlo import RevealPointCloud, sample_quarter_circle
+from reeval.numlabels import NumberLabelFactory, NumberReadout
 
 
 class MonteCarloPi(MovingCameraScene):
@@ -30,24 +32,22 @@ class MonteCarloPi(MovingCameraScene):
             run_time=1.5,
         )
 
+        # --- 2) The Monte Carlo Simulation ---
+        # Every sample is drawn up front; the animation only reveals more of them
+        target_points = 200_000
+        samples = sample_quarter_circle(target_points, radius, seed=7)
+        cloud = RevealPointCloud.from_labels(samples.points, samples.inside, [RED, BLUE], stroke_width=2)
+        reveal_tracker = ValueTracker(0)
+        cloud.follow(reveal_tracker)
+
         # --- 3) Approximating Pi (readout below the square) ---
-        inside_tracker = ValueTracker(0.0)
-        total_tracker = ValueTracker(0.0)
-
-        pi_label = MathTex("\\pi \\approx", color=WHITE)
-        pi_number = DecimalNumber(
-            0.0,
-            num_decimal_places=4,
-            color=YELLOW,
-            include_sign=False,
-        )
+        # Digits come from one compiled glyph atlas; each frame only rewrites their points
+        pi_number = NumberReadout(NumberLabelFactory(num_decimal_places=4, color=YELLOW), 0.0)
 
-        # Update the displayed value smoothly based on trackers
+        # Read the running estimate for however many points are visible
         def update_pi_value(mobj):
-            total = max(1.0, total_tracker.get_value())
-            inside = inside_tracker.get_value()
-            approx = 4.0 * (inside / total)
-            mobj.set_value(approx)
+            revealed = int(reveal_tracker.get_value())
+            mobj.set_value(samples.pi_estimates[revealed - 1] if revealed else 0.0)
 
         pi_number.add_updater(update_pi_value)
         pi_formula = MathTex(r"\frac{b}{r} \approx \pi \approx", color=WHITE)
@@ -57,59 +57,19 @@ class MonteCarloPi(MovingCameraScene):
         pi_group.next_to(square, DOWN, buff=0.5)
         self.play(Write(pi_group))
 
-        # --- 2) The Monte Carlo Simulation ---
-        random.seed(7)
-        np.random.seed(7)
-
-        dots_group = VGroup()
-
-        # Generate a target number of points but animate in batches for performance
-        target_points = 2000
-        batch_size = 200
-        num_batches = int(np.ceil(target_points / batch_size))
-
-        # Helper to build one batch of dots and final tracker values
-        def build_batch(start_index: int, count: int):
-            dots = []
-            inside_count = 0
-            for _ in range(count):
-                x = random.uniform(0.0, radius)
-                y = random.uniform(0.0, radius)
-                is_inside = (x * x + y * y) <= (radius * radius)
-                color = BLUE if is_inside else RED
-                if is_inside:
-                    inside_count += 1
-                dot = Dot(point=[x, y, 0], radius=0.015, color=color, fill_opacity=1.0)
-                dots.append(dot)
-            return dots, inside_count
-
-        current_inside = 0
-        current_total = 0
-
-        for b in range(num_batches):
-            remaining = target_points - current_total
-            this_batch = min(batch_size, remaining)
-            batch_dots, batch_inside = build_batch(current_total, this_batch)
-
-            # Prepare animations: dots fade in one-by-one using lag for a dynamic feel
-            dots_group.add(*batch_dots)
-            dot_anims = [FadeIn(d, scale=0.2) for d in batch_dots]
-
-            # Compute new totals and animate trackers to smoothly update the decimal
-            new_total = current_total + this_batch
-            new_inside = current_inside + batch_inside
+        self.add(cloud)
+
+        # Reveal in geometrically growing batches so the early, noisy estimates stay readable
+        num_batches = 10
+        batch_ends = np.geomspace(200, target_points, num_batches).astype(int)
 
+        for b, batch_end in enumerate(batch_ends):
             self.play(
-                AnimationGroup(*dot_anims, lag_ratio=0.04),
-                inside_tracker.animate.set_value(new_inside),
-                total_tracker.animate.set_value(new_total),
+                reveal_tracker.animate(rate_func=linear).set_value(batch_end),
                 *([] if b != num_batches // 10 else [frame.animate.move_to([square.get_center()]).set_width(side_length * 2)]),
                 run_time=2.0,
             )
 
-            current_total = new_total
-            current_inside = new_inside
-
         self.wait(2.5)
 
 class MonteCarloText(Scene):
@@ -0,0 +1 @@
+"""Makes ``reeval`` importable from ``tests/`` (manim itself puts ``scenes/`` on ``sys.path``)."""
@@ -0,0 +1,5 @@
+"""Shared data, model and rendering helpers for the REEVAL scenes.
+
+Scene files import from this package directly (manim puts the scene file's
+directory on ``sys.path``), e.g. ``from reeval.resmat import ResponseMatrix``.
+"""
@@ -0,0 +1,274 @@
+"""Amortized item difficulties: ``z_j = f_phi(e_j)`` from precomputed item embeddings.
+
+::
+
+    python -m reeval.amortized fit                          # trains on <data_dir>/item_embeddings.npy
+    python -m reeval.amortized predict new_items.npy z.npy  # bulk difficulties for unseen items
+
+``f_omega`` (question text -> embedding, ``input.text`` in the store's
+column labels) is any sentence encoder run outside this repo; its output is
+an (items x dim) ``.npy`` aligned with the response-matrix columns.
+``DifficultyHead`` is ``f_phi``: standardised embeddings, an optional tanh
+hidden layer and a linear read-out, in plain NumPy.
+
+Training is the EM of the slides with the per-item difficulties replaced by
+the head. The E step is exactly ``calibrate``'s: posterior weights over a
+Gauss-Hermite grid from the node log-likelihood of the current predictions.
+The M step runs Adam on the expected complete-data log-likelihood::
+
+    Q(phi) = sum_j sum_k [r_kj log P(node_k, z_j) + (n_kj - r_kj) log(1 - P(node_k, z_j))],  z_j = f_phi(e_j)
+
+whose gradient in ``z_j`` is ``sum_k n_kj P_kj - R_j`` (``R_j`` the item's
+number correct), so the M step only needs the expected answer counts
+``n`` (nodes x items) from one pass over the matrix and never touches it
+again. Item passes go through the same ``items`` executors as
+``calibrate`` (serial or ``reeval.shards.ShardedItems``).
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from . import config
+from .calibrate import (
+    BLOCK_SIZE,
+    NUM_NODES,
+    SerialItems,
+    gauss_hermite_grid,
+    mml_pass,
+    posterior,
+    reduce_shards,
+    score_totals,
+)
+from .irt import expit
+from .resmat import ResponseMatrix
+
+EMBEDDINGS_FILE = "item_embeddings.npy"
+HEAD_FILE = "difficulty_head.npz"
+PREDICT_BATCH = 16384
+
+
+class AmortizedFit(NamedTuple):
+    head: "DifficultyHead"
+    theta: np.ndarray
+    z: np.ndarray
+    sigma: float
+    log_likelihood: float  # marginal, at the final predictions
+
+
+class DifficultyHead:
+    """
+    Regression head from item embeddings to Rasch difficulty.
+
+    Args:
+        dim (int): Embedding size.
+        hidden (int): Width of the tanh hidden layer; 0 for a linear head.
+        seed (int): Initialisation seed.
+    """
+
+    def __init__(self, dim: int, hidden: int = 64, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.mean = np.zeros(dim, dtype=np.float32)
+        self.scale = np.ones(dim, dtype=np.float32)
+        if hidden:
+            self.params = {
+                "w1": (rng.standard_normal((dim, hidden)) / np.sqrt(dim)).astype(np.float32),
+                "b1": np.zeros(hidden, dtype=np.float32),
+                "w2": (rng.standard_normal(hidden) / np.sqrt(hidden)).astype(np.float32),
+                "b2": np.zeros(1, dtype=np.float32),
+            }
+        else:
+            self.params = {"w2": np.zeros(dim, dtype=np.float32), "b2": np.zeros(1, dtype=np.float32)}
+
+    @property
+    def hidden(self) -> int:
+        return self.params["b1"].size if "w1" in self.params else 0
+
+    def fit_scaler(self, embeddings, batch_size: int = PREDICT_BATCH) -> "DifficultyHead":
+        """Per-feature mean/SD of ``embeddings``, accumulated in batches."""
+        total = np.zeros(embeddings.shape[1])
+        total_sq = np.zeros(embeddings.shape[1])
+        for start in range(0, len(embeddings), batch_size):
+            batch = np.asarray(embeddings[start:start + batch_size], dtype=np.float64)
+            total += batch.sum(axis=0)
+            total_sq += (batch**2).sum(axis=0)
+        n = max(len(embeddings), 1)
+        mean = total / n
+        self.mean = mean.astype(np.float32)
+        self.scale = np.sqrt(np.maximum(total_sq / n - mean**2, 1e-12)).astype(np.float32)
+        return self
+
+    def forward(self, embeddings):
+        """Difficulties for one batch plus what ``backward`` needs."""
+        x = (np.asarray(embeddings, dtype=np.float32) - self.mean) / self.scale
+        h = np.tanh(x @ self.params["w1"] + self.params["b1"]) if self.hidden else x
+        return h @ self.params["w2"] + self.params["b2"][0], (x, h)
+
+    def backward(self, cache, grad_z) -> dict:
+        """Gradients of ``sum(grad_z * z)`` with respect to every parameter."""
+        x, h = cache
+        grad_z = grad_z.astype(np.float32)
+        grads = {"w2": h.T @ grad_z, "b2": np.array([grad_z.sum()], dtype=np.float32)}
+        if self.hidden:
+            grad_pre = np.outer(grad_z, self.params["w2"]) * (1 - h**2)
+            grads["w1"] = x.T @ grad_pre
+            grads["b1"] = grad_pre.sum(axis=0)
+        return grads
+
+    def predict(self, embeddings, batch_size: int = PREDICT_BATCH) -> np.ndarray:
+        """Difficulties for any number of items, ``batch_size`` rows at a time."""
+        out = np.empty(len(embeddings), dtype=np.float32)
+        for start in range(0, len(embeddings), batch_size):
+            out[start:start + batch_size] = self.forward(embeddings[start:start + batch_size])[0]
+        return out
+
+    def save(self, path) -> Path:
+        path = Path(path)
+        np.savez(path, mean=self.mean, scale=self.scale, **self.params)
+        return path
+
+    @classmethod
+    def load(cls, path) -> "DifficultyHead":
+        data = np.load(path)
+        head = cls(data["mean"].size, hidden=data["b1"].size if "w1" in data else 0)
+        head.mean, head.scale = data["mean"], data["scale"]
+        head.params = {key: data[key] for key in head.params}
+        return head
+
+
+class Adam:
+    def __init__(self, params: dict, lr: float = 1e-2, betas=(0.9, 0.999), eps: float = 1e-8):
+        self.lr, self.betas, self.eps = lr, betas, eps
+        self.m = {k: np.zeros_like(v) for k, v in params.items()}
+        self.v = {k: np.zeros_like(v) for k, v in params.items()}
+        self.t = 0
+
+    def step(self, params: dict, grads: dict) -> None:
+        self.t += 1
+        b1, b2 = self.betas
+        for key, grad in grads.items():
+            self.m[key] = b1 * self.m[key] + (1 - b1) * grad
+            self.v[key] = b2 * self.v[key] + (1 - b2) * grad**2
+            m_hat = self.m[key] / (1 - b1**self.t)
+            v_hat = self.v[key] / (1 - b2**self.t)
+            params[key] -= (self.lr * m_hat / (np.sqrt(v_hat) + self.eps)).astype(params[key].dtype)
+
+
+def expected_answers_pass(resmat, weights, block_size: int = BLOCK_SIZE):
+    """Posterior-expected number of answers at each node, per item: ``(nodes, items)``."""
+    weights32 = weights.T.astype(np.float32)
+    counts = np.empty((weights.shape[1], resmat.shape[1]), dtype=np.float32)
+    for start, stop, _, observed in resmat.iter_column_blocks(block_size):
+        counts[:, start:stop] = weights32 @ observed.astype(np.float32)
+    return (counts,)
+
+
+def m_step(head: DifficultyHead, optimizer: Adam, embeddings, expected_answers, item_correct, nodes, steps: int, batch_size: int, weight_decay: float, rng) -> None:
+    """Adam steps on ``-Q(phi)`` over contiguous item batches in shuffled order."""
+    n_items = len(embeddings)
+    starts = np.arange(0, n_items, batch_size)
+    for step in range(steps):
+        if step % len(starts) == 0:
+            rng.shuffle(starts)
+        start = starts[step % len(starts)]
+        stop = min(start + batch_size, n_items)
+        z, cache = head.forward(embeddings[start:stop])
+        p = expit(nodes[:, None] - z[None, :])
+        # d(-Q)/dz_j = R_j - sum_k n_kj P_kj
+        grad_z = item_correct[start:stop] - (expected_answers[:, start:stop] * p).sum(axis=0)
+        grads = head.backward(cache, grad_z / (stop - start))
+        for key in grads:
+            if key.startswith("w"):
+                grads[key] += weight_decay * head.params[key]
+        optimizer.step(head.params, grads)
+
+
+def fit_amortized(resmat: ResponseMatrix, embeddings, head: DifficultyHead | None = None, hidden: int = 64, em_iterations: int = 20, m_steps: int = 50, batch_size: int = 4096, lr: float = 1e-2, weight_decay: float = 1e-4, num_nodes: int = NUM_NODES, block_size: int = BLOCK_SIZE, seed: int = 0, items=None, callback=None) -> AmortizedFit:
+    """
+    Train ``f_phi`` with EM on ``resmat``.
+
+    Args:
+        embeddings (np.array): (items, dim), row j embeds column j of ``resmat``.
+        head (DifficultyHead): Warm start; a new head is built otherwise.
+        em_iterations (int): E/M alternations.
+        m_steps (int): Adam steps per M step.
+        batch_size (int): Items per Adam step.
+        callback (callable): ``callback(iteration, theta, z, log_likelihood)``.
+    """
+    if len(embeddings) != resmat.shape[1]:
+        raise ValueError(f"{len(embeddings)} embeddings for {resmat.shape[1]} items")
+    callback = callback or (lambda *args: None)
+    rng = np.random.default_rng(seed)
+    items = items or SerialItems(resmat)
+    totals = score_totals(resmat, block_size, items)
+    item_correct = totals.item_correct.astype(np.float32)
+    no_extremes = np.zeros(resmat.shape[1], dtype=int)  # predictions stay finite, nothing to pin
+
+    if head is None:
+        head = DifficultyHead(embeddings.shape[1], hidden, seed).fit_scaler(embeddings)
+    optimizer = Adam(head.params, lr)
+    unit_nodes, node_weights = gauss_hermite_grid(num_nodes)
+    log_weights = np.log(node_weights)
+    sigma, nodes = 1.0, unit_nodes
+
+    def e_step(z, nodes):
+        _, node_ll = reduce_shards(items.map(mml_pass, (z, totals.item_correct, no_extremes), None, None, nodes, 0, block_size))
+        return posterior(node_ll, nodes, log_weights)
+
+    z = head.predict(embeddings)
+    weights, theta, _, ll = e_step(z, nodes)
+    callback(0, theta, z, ll)
+    for iteration in range(1, em_iterations + 1):
+        (expected_answers,) = reduce_shards(items.map(expected_answers_pass, (), weights, block_size))
+        m_step(head, optimizer, embeddings, expected_answers, item_correct, nodes, m_steps, batch_size, weight_decay, rng)
+        sigma = float(np.sqrt(np.mean(weights @ nodes**2)))
+        nodes = sigma * unit_nodes
+        z = head.predict(embeddings)
+        weights, theta, _, ll = e_step(z, nodes)
+        callback(iteration, theta, z, ll)
+
+    return AmortizedFit(head, theta, z, sigma, ll)
+
+
+def load_embeddings(path=None) -> np.ndarray:
+    """Memory-map an (items x dim) embedding file, ``<data_dir>/item_embeddings.npy`` by default."""
+    return np.load(path or config.data_path(EMBEDDINGS_FILE), mmap_mode="r")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Train or apply the amortized item-difficulty head.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    fit = sub.add_parser("fit", help="train the head with EM on the response matrix")
+    fit.add_argument("--store", default=None, help="response matrix store (default: <data_dir>/resmat)")
+    fit.add_argument("--embeddings", default=None, help=f"(items x dim) .npy (default: <data_dir>/{EMBEDDINGS_FILE})")
+    fit.add_argument("--out", default=None, help=f"head file (default: <data_dir>/{HEAD_FILE})")
+    fit.add_argument("--hidden", type=int, default=64, help="hidden units, 0 for a linear head")
+    fit.add_argument("-n", "--em-iterations", type=int, default=20)
+    predict = sub.add_parser("predict", help="predict difficulties for new items")
+    predict.add_argument("embeddings", help="(items x dim) .npy of the new items")
+    predict.add_argument("out", help="where to write the float32 difficulties (.npy)")
+    predict.add_argument("--head", default=None, help=f"head file (default: <data_dir>/{HEAD_FILE})")
+    args = parser.parse_args(argv)
+
+    start = time.time()
+    if args.command == "fit":
+        resmat = ResponseMatrix.open(args.store or config.data_path("resmat"))
+        embeddings = np.asarray(load_embeddings(args.embeddings), dtype=np.float32)
+        result = fit_amortized(resmat, embeddings, hidden=args.hidden, em_iterations=args.em_iterations)
+        path = result.head.save(args.out or config.data_path(HEAD_FILE))
+        print(f"Wrote {path} in {time.time() - start:.1f}s, marginal log-likelihood {result.log_likelihood:.1f}")
+    else:
+        head = DifficultyHead.load(args.head or config.data_path(HEAD_FILE))
+        z = head.predict(load_embeddings(args.embeddings))
+        np.save(args.out, z)
+        print(f"Predicted {len(z)} difficulties in {time.time() - start:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
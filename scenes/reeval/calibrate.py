@@ -0,0 +1,392 @@
+"""Rasch calibration of the response matrix: joint ML and marginal ML via EM.
+
+::
+
+    python -m reeval.calibrate                 # MML-EM, writes rasch_calibrated_{theta,z}.jsonl
+    python -m reeval.calibrate --method jml -n 30
+    python -m reeval.calibrate --shard-size 50000 -j 2   # item shards in parallel, see reeval.shards
+    python -m reeval.calibrate --prefix rasch_global --overwrite   # replace the logs the scenes show
+
+The model is ``P(y_ij = 1) = sigma(theta_i - z_j)`` with ``z`` the item
+difficulty (``b`` in ``reeval.irt``). Missing responses are left out through
+the observed mask of the ``ResponseMatrix``; nothing is imputed.
+
+Every iteration is one pass over column blocks of the bit-packed store, so
+memory is O(persons x block_size) whatever the size of the bank:
+
+- JML: one Newton step per item (inside its block) and per person
+  (accumulated over blocks), both from the same probability matrix.
+  Difficulties are re-centred to mean 0 afterwards to fix the scale.
+- MML-EM: abilities are integrated out on a Gauss-Hermite grid for an
+  N(0, sigma^2) population, sigma re-estimated each iteration. The per-person
+  log-likelihood at every node from the previous pass gives the posterior
+  (E step); each block then gets its expected counts and Newton steps for
+  its difficulties (M step) and adds its share of the next likelihood, so E
+  and M share a single read of the matrix. Theta is the EAP estimate.
+
+Items (and, for JML, persons) with all or none of their answers correct
+have no finite estimate and are pinned to ``-BOUND``/``+BOUND``.
+
+Iteration 0 of the written logs holds the starting values (logits of the
+raw proportions correct), which is what the learning scenes open with.
+The scenes read the externally produced ``rasch_global`` logs; a run writes
+its own prefix and never deletes existing logs without ``overwrite``.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from contextlib import ExitStack
+from typing import NamedTuple
+
+import numpy as np
+
+from . import config, logs
+from .irt import expit, log_expit, logit
+from .resmat import ResponseMatrix
+
+BLOCK_SIZE = 8192
+NUM_NODES = 41  # each person answers thousands of items, so posteriors are narrow; coarse grids oscillate
+MAX_STEP = 1.0  # largest Newton step per iteration, in logits
+BOUND = 6.0  # estimates are clipped to [-BOUND, BOUND]; extreme scores have no finite MLE
+EPS = 1e-12
+CALIBRATION_PREFIX = "rasch_calibrated"  # default log prefix, distinct from the scenes' logs.LOG_PREFIX
+
+
+class ScoreTotals(NamedTuple):
+    person_correct: np.ndarray
+    person_observed: np.ndarray
+    item_correct: np.ndarray
+    item_observed: np.ndarray
+
+
+class Calibration(NamedTuple):
+    theta: np.ndarray
+    z: np.ndarray
+    theta_se: np.ndarray
+    log_likelihood: float  # joint (JML) or marginal (MML)
+    iterations: int
+    converged: bool
+    sigma: float = 1.0  # estimated ability SD (MML only)
+
+
+def totals_pass(resmat: ResponseMatrix, block_size: int = BLOCK_SIZE):
+    """Per-item ``(2, items)`` [correct, answered] counts plus per-person correct and answered counts."""
+    n_rows, n_cols = resmat.shape
+    person_correct = np.zeros(n_rows, dtype=np.int64)
+    person_observed = np.zeros(n_rows, dtype=np.int64)
+    item_counts = np.zeros((2, n_cols), dtype=np.int64)
+    for start, stop, correct, observed in resmat.iter_column_blocks(block_size):
+        correct = correct.astype(bool) & observed
+        person_correct += correct.sum(axis=1)
+        person_observed += observed.sum(axis=1)
+        item_counts[0, start:stop] = correct.sum(axis=0)
+        item_counts[1, start:stop] = observed.sum(axis=0)
+    return item_counts, person_correct, person_observed
+
+
+def score_totals(resmat: ResponseMatrix, block_size: int = BLOCK_SIZE, items=None) -> ScoreTotals:
+    """Number correct and number answered per person and per item, in one pass."""
+    item_counts, person_correct, person_observed = reduce_shards((items or SerialItems(resmat)).map(totals_pass, (), block_size))
+    return ScoreTotals(person_correct, person_observed, item_counts[0], item_counts[1])
+
+
+def extreme_scores(correct, observed) -> np.ndarray:
+    """+1 where every answer is correct, -1 where none is, 0 otherwise (or nothing answered)."""
+    return np.where(observed > 0, (correct == observed).astype(int) - (correct == 0), 0)
+
+
+def pin_extremes(theta, z, totals: ScoreTotals):
+    """Perfect and zero scores have no finite ML estimate; put them on the bounds instead."""
+    items = extreme_scores(totals.item_correct, totals.item_observed)
+    persons = extreme_scores(totals.person_correct, totals.person_observed)
+    return np.where(persons != 0, persons * BOUND, theta), np.where(items != 0, -items * BOUND, z)
+
+
+def start_values(totals: ScoreTotals) -> tuple[np.ndarray, np.ndarray]:
+    """Logits of the (smoothed) proportions correct; difficulties centred to mean 0."""
+    theta = logit((totals.person_correct + 0.5) / (totals.person_observed + 1.0))
+    z = -logit((totals.item_correct + 0.5) / (totals.item_observed + 1.0))
+    free = extreme_scores(totals.item_correct, totals.item_observed) == 0
+    shift = z[free].mean() if free.any() else 0.0
+    return pin_extremes(np.clip(theta - shift, -BOUND, BOUND), np.clip(z - shift, -BOUND, BOUND), totals)
+
+
+def gauss_hermite_grid(num_nodes: int = NUM_NODES) -> tuple[np.ndarray, np.ndarray]:
+    """Nodes and weights (summing to 1) for expectations under N(0, 1)."""
+    nodes, weights = np.polynomial.hermite_e.hermegauss(num_nodes)
+    return nodes, weights / weights.sum()
+
+
+def _newton_step(gradient, information):
+    step = gradient / np.maximum(information, EPS)
+    return np.where(information > 0, np.clip(step, -MAX_STEP, MAX_STEP), 0.0)
+
+
+def block_node_log_likelihood(correct, observed, nodes, z) -> np.ndarray:
+    """Log-likelihood of one column block at every node, shape (persons, nodes).
+
+    ``y log P + (1 - y) log(1 - P) = y (theta - z) + log(1 - P)``, so one
+    (persons x block) @ (block x nodes) product covers the whole block.
+    """
+    y = correct.astype(np.float32)
+    log_q = log_expit(z[None, :] - nodes[:, None]).astype(np.float32)
+    linear = np.outer(y.sum(axis=1), nodes) - (y @ z.astype(np.float32))[:, None]
+    return linear + observed.astype(np.float32) @ log_q.T
+
+
+def expit32(x):
+    """In-place float32 ``expit`` for the large JML blocks (``x`` is overwritten)."""
+    x *= 0.5
+    np.tanh(x, out=x)
+    x *= 0.5
+    x += 0.5
+    return x
+
+
+def _logsumexp(x, axis):
+    peak = x.max(axis=axis, keepdims=True)
+    return (peak + np.log(np.exp(x - peak).sum(axis=axis, keepdims=True))).squeeze(axis)
+
+
+def jml_pass(resmat, z, item_correct, theta, block_size=BLOCK_SIZE):
+    """Newton step for the difficulties of ``resmat``'s items plus the person sufficient statistics.
+
+    Returns:
+        tuple: ``(z, expected_score, information, log_likelihood)``, the last
+        three per person and summed over this matrix's items. The
+        log-likelihood is that of the incoming estimates.
+    """
+    expected_person = np.zeros_like(theta)
+    info_person = np.zeros_like(theta)
+    new_z = z.copy()
+    ll = 0.0
+    # float32 halves the memory traffic of the (persons x block) temporaries; sums stay pairwise
+    theta32, z32 = theta.astype(np.float32), z.astype(np.float32)
+    for start, stop, correct, observed in resmat.iter_column_blocks(block_size):
+        p = expit32(theta32[:, None] - z32[None, start:stop])
+        p *= observed  # P on observed cells, 0 elsewhere
+        q = observed - p  # 1 - P on observed cells, 0 elsewhere
+        info = p * q
+        expected_person += p.sum(axis=1)
+        info_person += info.sum(axis=1)
+        # d logL / dz_j = sum_i (p_ij - y_ij)
+        new_z[start:stop] += _newton_step(p.sum(axis=0) - item_correct[start:stop], info.sum(axis=0))
+        # P if correct, 1 - P if wrong, 1 if missing (contributes log 1 = 0); arithmetic beats np.where here
+        ll += np.log(q + correct * (p - q) + ~observed).sum(dtype=float)
+    return np.clip(new_z, -BOUND, BOUND), expected_person, info_person, ll
+
+
+def jml_person_step(theta, z, totals: ScoreTotals, expected_person, info_person):
+    """Person Newton step from the all-reduced statistics, then re-centre and pin extremes.
+
+    Returns:
+        tuple: ``(theta, z, theta_se)``.
+    """
+    theta = np.clip(theta + _newton_step(totals.person_correct - expected_person, info_person), -BOUND, BOUND)
+    free = extreme_scores(totals.item_correct, totals.item_observed) == 0
+    if free.any():
+        shift = z[free].mean()
+        theta, z = theta - shift, z - shift
+    theta, z = pin_extremes(theta, z, totals)
+    with np.errstate(divide="ignore"):
+        theta_se = 1.0 / np.sqrt(info_person)
+    return theta, z, theta_se
+
+
+def posterior(node_ll, nodes, log_weights):
+    """E step: posterior weights over nodes, EAP theta, posterior SD and marginal log-likelihood."""
+    log_joint = node_ll + log_weights[None, :]
+    marginal = _logsumexp(log_joint, axis=1)
+    weights = np.exp(log_joint - marginal[:, None])
+    eap = weights @ nodes
+    sd = np.sqrt(np.maximum(weights @ nodes**2 - eap**2, 0.0))
+    return weights, eap, sd, float(marginal.sum())
+
+
+def mml_pass(resmat, z, item_correct, extreme, weights, nodes, next_nodes, newton_steps=2, block_size=BLOCK_SIZE):
+    """M step for ``resmat``'s items plus their share of the node log-likelihood for the next E step.
+
+    Args:
+        extreme (np.array): ``extreme_scores`` of the items; those are pinned.
+        weights (np.array): Posterior (persons, nodes) on ``nodes``; unused
+            when ``newton_steps`` is 0 (likelihood only).
+        next_nodes (np.array): Nodes of the next E step (after the SD update).
+
+    Returns:
+        tuple: ``(z, node_ll)`` with ``node_ll`` of shape (persons, nodes).
+    """
+    new_z = z.copy()
+    node_ll = np.zeros((resmat.shape[0], len(next_nodes)))
+    weights32 = weights.T.astype(np.float32) if newton_steps else None
+    for start, stop, correct, observed in resmat.iter_column_blocks(block_size):
+        block = new_z[start:stop]
+        if newton_steps:
+            # Posterior rows sum to 1, so expected corrects summed over nodes are just the item totals
+            expected_answered = weights32 @ observed.astype(np.float32)  # (nodes, block)
+            r = item_correct[start:stop]
+            for _ in range(newton_steps):
+                p = expit(nodes[:, None] - block[None, :])
+                n_p = expected_answered * p
+                block = np.clip(block + _newton_step(n_p.sum(axis=0) - r, (n_p * (1 - p)).sum(axis=0)), -BOUND, BOUND)
+            block = np.where(extreme[start:stop] != 0, -extreme[start:stop] * BOUND, block)
+            new_z[start:stop] = block
+        node_ll += block_node_log_likelihood(correct, observed, next_nodes, block)
+    return new_z, node_ll
+
+
+class SerialItems:
+    """Runs every item pass over the whole matrix in this process (a single shard).
+
+    ``map(fn, item_arrays, *args)`` calls ``fn(resmat, *item_arrays, *args)``
+    once per shard, each shard seeing its own columns and the matching slices
+    of ``item_arrays``; ``reduce_shards`` then combines the results. The
+    sharded, multi-process counterpart is ``reeval.shards.ShardedItems``.
+    """
+
+    def __init__(self, resmat: ResponseMatrix):
+        self.resmat = resmat
+        self.shards = [(0, resmat.shape[1])]
+
+    def map(self, fn, item_arrays, *args) -> list:
+        return [fn(self.resmat, *item_arrays, *args)]
+
+
+def reduce_shards(results: list):
+    """Concatenate the per-item output (first element, last axis) and sum the rest: the all-reduce."""
+    first = np.concatenate([r[0] for r in results], axis=-1) if len(results) > 1 else results[0][0]
+    return (first, *(sum(r[i] for r in results) for i in range(1, len(results[0]))))
+
+
+def calibrate(resmat: ResponseMatrix, method: str = "mml", max_iter: int = 50, tol: float = 1e-3, num_nodes: int = NUM_NODES, estimate_sigma: bool = True, block_size: int = BLOCK_SIZE, callback=None, items=None) -> Calibration:
+    """
+    Fit the Rasch model to ``resmat``.
+
+    Args:
+        resmat (ResponseMatrix): Persons x items responses with a missing mask.
+        method (str): ``"mml"`` (EM over a quadrature grid) or ``"jml"``.
+        max_iter (int): Iteration limit.
+        tol (float): Stop once no difficulty moves by more than this.
+        num_nodes (int): Gauss-Hermite nodes (MML).
+        estimate_sigma (bool): Re-estimate the ability SD each iteration (MML).
+        block_size (int): Items per column block.
+        callback (callable): ``callback(iteration, theta, z, log_likelihood)``,
+            called for the starting values (iteration 0) and after every iteration.
+        items: Where item passes run; ``SerialItems(resmat)`` by default,
+            ``reeval.shards.ShardedItems`` for a process pool over item shards.
+    """
+    if method not in ("mml", "jml"):
+        raise ValueError(f"unknown method {method!r}, expected 'mml' or 'jml'")
+    callback = callback or (lambda *args: None)
+    items = items or SerialItems(resmat)
+    totals = score_totals(resmat, block_size, items)
+    theta, z = start_values(totals)
+    theta_se = np.full_like(theta, np.nan)
+    ll = np.nan
+    callback(0, theta, z, ll)
+
+    if method == "mml":
+        unit_nodes, node_weights = gauss_hermite_grid(num_nodes)
+        log_weights = np.log(node_weights)
+        sigma = 1.0
+        nodes = sigma * unit_nodes
+        extreme = extreme_scores(totals.item_correct, totals.item_observed)
+        _, node_ll = reduce_shards(items.map(mml_pass, (z, totals.item_correct, extreme), None, None, nodes, 0, block_size))
+        weights, theta, theta_se, ll = posterior(node_ll, nodes, log_weights)
+    else:
+        sigma = np.nan
+
+    converged = False
+    iteration = 0
+    for iteration in range(1, max_iter + 1):
+        if method == "mml":
+            if estimate_sigma:
+                sigma = float(np.sqrt(np.mean(weights @ nodes**2)))
+            next_nodes = sigma * unit_nodes
+            new_z, node_ll = reduce_shards(items.map(mml_pass, (z, totals.item_correct, extreme), weights, nodes, next_nodes, 2, block_size))
+            nodes = next_nodes
+            weights, theta, theta_se, ll = posterior(node_ll, nodes, log_weights)
+        else:
+            new_z, expected_person, info_person, ll = reduce_shards(items.map(jml_pass, (z, totals.item_correct), theta, block_size))
+            theta, new_z, theta_se = jml_person_step(theta, new_z, totals, expected_person, info_person)
+        delta = np.max(np.abs(new_z - z)) if z.size else 0.0
+        z = new_z
+        callback(iteration, theta, z, ll)
+        if delta < tol:
+            converged = True
+            break
+
+    return Calibration(theta, z, theta_se, ll, iteration, converged, sigma)
+
+
+def _existing_logs(param: str, prefix: str, data_dir) -> list:
+    try:
+        return logs.find_log_files(param, prefix, data_dir)
+    except (FileNotFoundError, ValueError):
+        return []
+
+
+def calibrate_to_logs(
+    resmat: ResponseMatrix, prefix: str = CALIBRATION_PREFIX, data_dir=None, method: str = "mml", items=None, overwrite: bool = False, **options
+) -> Calibration:
+    """Run ``calibrate`` and write ``<prefix>_theta.jsonl`` / ``<prefix>_z.jsonl`` (one line per iteration).
+
+    With a sharded ``items`` the z log is split per shard as
+    ``<prefix>_z_batch_<start>_<stop>.jsonl``. Existing logs under ``prefix``
+    are only replaced with ``overwrite``.
+    """
+    existing = [path for param in ("theta", "z") for path in _existing_logs(param, prefix, data_dir)]
+    if existing and not overwrite:
+        raise FileExistsError(f"{existing[0]} already exists; pass overwrite=True (--overwrite) to replace the {prefix!r} logs")
+    items = items or SerialItems(resmat)
+    z_shards = items.shards if len(items.shards) > 1 else [None]
+    for param in ("theta", "z"):
+        logs.clear_parameter_logs(param, prefix, data_dir)
+    with ExitStack() as stack:
+        theta_log = stack.enter_context(logs.ParameterLogWriter("theta", prefix, data_dir))
+        z_logs = [stack.enter_context(logs.ParameterLogWriter("z", prefix, data_dir, shard)) for shard in z_shards]
+
+        def write(iteration, theta, z, ll):
+            extra = {"iteration": iteration, "method": method, "log_likelihood": None if np.isnan(ll) else ll}
+            theta_log.append(theta, **extra)
+            for shard, z_log in zip(z_shards, z_logs):
+                z_log.append(z if shard is None else z[shard[0]:shard[1]], **extra)
+
+        return calibrate(resmat, method, callback=write, items=items, **options)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Calibrate the Rasch model on the response matrix and write the iteration logs.")
+    parser.add_argument("--store", default=None, help="response matrix store (default: <data_dir>/resmat)")
+    parser.add_argument("--method", default="mml", choices=["mml", "jml"])
+    parser.add_argument("-n", "--max-iter", type=int, default=50)
+    parser.add_argument("--tol", type=float, default=1e-3)
+    parser.add_argument("--nodes", type=int, default=NUM_NODES, help="quadrature nodes (mml)")
+    parser.add_argument("--block-size", type=int, default=BLOCK_SIZE)
+    parser.add_argument("--shard-size", type=int, default=None, help="items per shard; shards run in a process pool (default: one process)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes for --shard-size (default: CPU count)")
+    parser.add_argument("--prefix", default=CALIBRATION_PREFIX, help=f"log file prefix (the scenes read {logs.LOG_PREFIX!r})")
+    parser.add_argument("--overwrite", action="store_true", help="replace existing logs with the same prefix")
+    parser.add_argument("--data-dir", default=None, help="where the logs are written (default: data_dir setting)")
+    args = parser.parse_args(argv)
+
+    resmat = ResponseMatrix.open(args.store or config.data_path("resmat"))
+    start = time.time()
+    with ExitStack() as stack:
+        items = None
+        if args.shard_size:
+            from .shards import ShardedItems
+
+            items = stack.enter_context(ShardedItems(resmat, args.shard_size, workers=args.workers))
+        result = calibrate_to_logs(
+            resmat, args.prefix, args.data_dir, args.method, items, args.overwrite,
+            max_iter=args.max_iter, tol=args.tol, num_nodes=args.nodes, block_size=args.block_size,
+        )
+    status = "converged" if result.converged else "stopped"
+    print(f"{args.method}: {status} after {result.iterations} iterations in {time.time() - start:.1f}s, log-likelihood {result.log_likelihood:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
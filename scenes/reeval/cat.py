@@ -0,0 +1,493 @@
+"""Computerized adaptive testing: many MFI sessions at once over the item bank.
+
+::
+
+    python -m reeval.cat --sessions 2000 --max-items 30   # real answers from the response matrix
+    python -m reeval.cat --simulate --sessions 5000       # answers drawn from the model
+
+One step of the loop in ``12_mfi_algorithm.py`` is a handful of array
+operations over every active session: the most informative remaining item at
+the session's current estimate, the answer and the ability update. Selection
+goes through ``itembank.DifficultyIndex`` (O(log n) per session and step);
+``DenseSelector`` computes the full (sessions x bank) information matrix
+instead, with administered and unanswerable items masked out. Sessions run
+``session_block`` at a time so the per-session state stays bounded on the
+78k-item bank. Exposure control and content quotas plug in between
+``simulate`` and the selector as a ``strategy`` from ``reeval.selection``.
+
+A session ends after ``max_items``, when nothing eligible is left, or
+earlier by a ``StoppingRule``: the SE of the estimate below a threshold, or
+the test information levelling off. The test information (sum of the
+information of every administered item at the estimate it was chosen for)
+is kept incrementally per session, one addition per answer.
+``length_report`` compares the resulting test lengths with giving every
+test-taker the whole bank.
+
+Every session keeps its log-likelihood on a Gauss-Hermite grid, so an answer
+costs one (sessions x nodes) update. ``"eap"`` reads off the posterior mean
+and SD under the N(0, prior_sd^2) prior. ``"mle"`` takes Newton steps on the
+administered items (the ``argmax_theta`` of the slides), starting from the
+EAP; until a session has both a right and a wrong answer its MLE is
+infinite and the EAP is used instead.
+
+Answers come from a responder. ``MatrixResponder`` replays the real answers
+of response-matrix rows (only items the test-taker answered are eligible);
+``SimulatedResponder`` draws them from the model for known abilities.
+``Trajectories`` holds the item, answer, estimate and SE of every step, which
+is what ``13_mfi_illusration.py`` replays.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from . import config, logs
+from .calibrate import BOUND, EPS, MAX_STEP, NUM_NODES, expit32, gauss_hermite_grid, posterior
+from .irt import expit, fisher_information, icc, log_icc
+from .itembank import DifficultyIndex
+from .resmat import ResponseMatrix
+from .selection import ContentQuota, ExposureCounters, MaxInfo, Randomesque, SympsonHetter, content_groups, proportional_caps
+
+TRAJECTORIES_FILE = "cat_trajectories.npz"
+SESSION_BLOCK = 256
+NEWTON_STEPS = 3
+STOP_REASONS = ("max_items", "se", "plateau", "exhausted")
+
+
+class Trajectories(NamedTuple):
+    items: np.ndarray  # (sessions, max_items) int32 bank index, -1 once the session has stopped
+    responses: np.ndarray  # (sessions, max_items) int8 1/0, -1 once the session has stopped
+    theta: np.ndarray  # (sessions, max_items + 1) estimate before the first item and after every answer
+    se: np.ndarray  # (sessions, max_items + 1)
+    true_theta: np.ndarray  # (sessions,) generating or full-bank ability, NaN if unknown
+    information: np.ndarray  # (sessions, max_items + 1) cumulative test information
+    stop_reason: np.ndarray  # (sessions,) int8 index into STOP_REASONS
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return (self.items >= 0).sum(axis=1)
+
+    def save(self, path) -> Path:
+        path = Path(path)
+        np.savez_compressed(path, **self._asdict())
+        return path
+
+    @classmethod
+    def load(cls, path) -> "Trajectories":
+        data = np.load(path)
+        # Files written before the stopping rules lack the newer fields
+        return cls(*(data[field] if field in data else None for field in cls._fields))
+
+
+class StoppingRule(NamedTuple):
+    """
+    Early termination on top of ``max_items``.
+
+    Args:
+        max_se (float): Stop once the SE of the estimate is below this.
+        min_gain (float): Information plateau: stop once the last
+            ``plateau_items`` items together added less than this fraction of
+            the test information.
+        plateau_items (int): Window of the plateau rule.
+        min_items (int): Never stop before this many items.
+    """
+
+    max_se: float | None = None
+    min_gain: float | None = None
+    plateau_items: int = 3
+    min_items: int = 1
+
+    def check(self, step: int, se, information) -> np.ndarray:
+        """``STOP_REASONS`` index per session after ``step + 1`` answers, -1 to go on.
+
+        Args:
+            se (np.array): Current SE, shape (sessions,).
+            information (np.array): Cumulative information so far, (sessions, step + 2).
+        """
+        reason = np.full(len(se), -1, dtype=np.int8)
+        if step + 1 < self.min_items:
+            return reason
+        if self.min_gain is not None and step + 1 > self.plateau_items:
+            total = information[:, -1]
+            gain = total - information[:, -1 - self.plateau_items]
+            reason[gain < self.min_gain * total] = STOP_REASONS.index("plateau")
+        if self.max_se is not None:
+            reason[se < self.max_se] = STOP_REASONS.index("se")
+        return reason
+
+
+class LengthReport(NamedTuple):
+    sessions: int
+    mean_length: float  # items given per session
+    mean_full_length: float  # items the session could have been given (its whole eligible bank)
+    saved: float  # 1 - mean_length / mean_full_length
+    mean_se: float
+    rmse: float  # final estimate against the reference ability, NaN without one
+    stop_reasons: dict  # STOP_REASONS -> number of sessions
+
+
+def length_report(result: Trajectories, full_lengths) -> LengthReport:
+    """Test length saved against giving every session its whole eligible bank."""
+    lengths = result.lengths
+    full = np.broadcast_to(np.asarray(full_lengths, dtype=float), lengths.shape)
+    errors = result.theta[:, -1] - result.true_theta
+    rmse = float(np.sqrt(np.nanmean(errors**2))) if np.isfinite(errors).any() else np.nan
+    counts = np.bincount(result.stop_reason, minlength=len(STOP_REASONS))
+    return LengthReport(
+        len(lengths),
+        float(lengths.mean()),
+        float(full.mean()),
+        float(1 - lengths.sum() / max(full.sum(), 1)),
+        float(result.se[:, -1].mean()),
+        rmse,
+        dict(zip(STOP_REASONS, counts.tolist())),
+    )
+
+
+class SimulatedResponder:
+    """
+    Answers drawn from the model for known abilities.
+
+    Args:
+        theta (np.array): True ability of every session.
+        b, a, c (float or np.array): Item parameters of the bank.
+        seed (int): Seed for the answers.
+    """
+
+    def __init__(self, theta, b, a=1.0, c=0.0, seed=None):
+        self.true_theta = np.asarray(theta, dtype=float)
+        self.b, self.a, self.c = np.asarray(b, dtype=float), a, c
+        self.rng = np.random.default_rng(seed)
+
+    @property
+    def num_sessions(self) -> int:
+        return len(self.true_theta)
+
+    def eligible(self, sessions) -> np.ndarray:
+        return np.ones((len(sessions), len(self.b)), dtype=bool)
+
+    @property
+    def full_lengths(self) -> np.ndarray:
+        """Items each session could take: the whole bank."""
+        return np.full(self.num_sessions, len(self.b))
+
+    def answer(self, sessions, items) -> np.ndarray:
+        p = icc(self.true_theta[sessions], _at(self.a, items), self.b[items], _at(self.c, items))
+        return (self.rng.random(len(sessions)) < p).astype(np.int8)
+
+
+class MatrixResponder:
+    """
+    Real answers: session ``k`` is test-taker ``rows[k]`` of ``resmat``.
+
+    Rows may repeat (sessions resampled from the 183 test-takers); their
+    observed masks are unpacked once per distinct row.
+
+    Args:
+        resmat (ResponseMatrix): The response matrix.
+        rows (np.array): Matrix row of every session.
+        true_theta (np.array): Per-row reference ability (e.g. the full-bank
+            calibration), reported alongside the trajectories.
+    """
+
+    def __init__(self, resmat: ResponseMatrix, rows, true_theta=None):
+        self.resmat = resmat
+        self.rows = np.asarray(rows, dtype=np.int64)
+        distinct, self._position = np.unique(self.rows, return_inverse=True)
+        self._observed = resmat.take(distinct)[1]
+        reference = np.full(resmat.shape[0], np.nan) if true_theta is None else np.asarray(true_theta, dtype=float)
+        self.true_theta = reference[self.rows]
+
+    @property
+    def num_sessions(self) -> int:
+        return len(self.rows)
+
+    def eligible(self, sessions) -> np.ndarray:
+        return self._observed[self._position[sessions]]
+
+    @property
+    def full_lengths(self) -> np.ndarray:
+        """Items each session could take: every item its test-taker answered."""
+        return self._observed.sum(axis=1)[self._position]
+
+    def answer(self, sessions, items) -> np.ndarray:
+        return self.resmat.take_pairs(self.rows[sessions], items)[0].astype(np.int8)
+
+
+def _at(value, items):
+    value = np.asarray(value, dtype=float)
+    return value[items] if value.ndim else value
+
+
+def item_information(theta, b, a=1.0, c=0.0) -> np.ndarray:
+    """(sessions, items) float32 information of every item at every session's estimate.
+
+    Without guessing ``a^2 s (1 - s) = a^2 (1 - tanh^2(x / 2)) / 4`` for
+    ``x = a (theta - b)``: one ``tanh`` and three in-place passes over the
+    (sessions x bank) array. With guessing ``a^2 s^2 (1 - P) / P`` where
+    ``s = sigma(x)`` and ``P = c + (1 - c) s``. Either way the same quantity as
+    ``irt.fisher_information`` at a fraction of its memory traffic.
+    """
+    a = np.asarray(a, dtype=np.float32)
+    c = np.asarray(c, dtype=np.float32)
+    x = np.subtract(np.asarray(theta, dtype=np.float32)[:, None], np.asarray(b, dtype=np.float32)[None, :])
+    if not np.any(c):
+        x *= 0.5 * a
+        np.tanh(x, out=x)
+        x *= x
+        x *= -0.25 * a * a
+        x += 0.25 * a * a
+        return x
+    x *= a
+    s = expit32(x)
+    p = c + (1 - c) * s
+    s *= s
+    s *= (1 - p) / p
+    s *= a * a
+    return s
+
+
+class DenseSelector:
+    """
+    Maximum-information selection by a full (sessions x bank) information matrix.
+
+    The reference for ``itembank.DifficultyIndex``, which answers the same
+    query in O(log n); both take ``(b, a, c, available)`` and offer
+    ``select(rows, theta)``, ``remove(rows, items)``, ``restore(rows, items)``
+    and ``close_group(rows, group)``.
+    """
+
+    def __init__(self, b, a=1.0, c=0.0, available=None, groups=None):
+        self.b, self.a, self.c = b, a, c
+        self.available = available
+        self.groups = groups
+
+    def select(self, rows, theta) -> np.ndarray:
+        # Administered and unanswerable items have information 0
+        info = item_information(theta, self.b, self.a, self.c)
+        info *= self.available if len(rows) == len(self.available) else self.available[rows]
+        chosen = info.argmax(axis=1)
+        return np.where(self.available[rows, chosen], chosen, -1)
+
+    def remove(self, rows, items) -> None:
+        self.available[rows, items] = False
+
+    def restore(self, rows, items) -> None:
+        self.available[rows, items] = True
+
+    def close_group(self, rows, group: int) -> None:
+        self.available[np.ix_(rows, np.flatnonzero(self.groups == group))] = False
+
+
+SELECTORS = {"index": DifficultyIndex, "dense": DenseSelector}
+
+
+def _score(theta, responses, b, a, c):
+    """Per-session gradient of the log-likelihood and test information, all items of a row summed."""
+    s = expit(a * (theta[:, None] - b))
+    p = c + (1 - c) * s
+    slope = a * (1 - c) * s * (1 - s)  # dP / dtheta
+    pq = np.maximum(p * (1 - p), EPS)
+    return (slope * (responses - p) / pq).sum(axis=1), (slope**2 / pq).sum(axis=1)
+
+
+def newton_theta(theta, answered, responses, b, a=1.0, c=0.0, steps: int = NEWTON_STEPS):
+    """Fisher-scoring steps towards each session's MLE on its administered items.
+
+    Args:
+        theta (np.array): Starting estimates, shape (sessions,).
+        answered (np.array): Administered item indices, (sessions, t).
+        responses (np.array): Their 0/1 answers, (sessions, t).
+
+    Returns:
+        tuple: ``(theta, se)``, SE from the test information at the estimate.
+    """
+    a, b, c = _at(a, answered), b[answered], _at(c, answered)
+    for _ in range(steps):
+        gradient, information = _score(theta, responses, b, a, c)
+        theta = np.clip(theta + np.clip(gradient / np.maximum(information, EPS), -MAX_STEP, MAX_STEP), -BOUND, BOUND)
+    _, information = _score(theta, responses, b, a, c)
+    return theta, 1.0 / np.sqrt(np.maximum(information, EPS))
+
+
+def simulate(responder, b, a=1.0, c=0.0, max_items: int = 30, method: str = "eap", theta_start: float = 0.0, prior_sd: float = 1.0, num_nodes: int = NUM_NODES, session_block: int = SESSION_BLOCK, selector: str = "index", strategy=None, exposure: ExposureCounters | None = None, stopping: StoppingRule | None = None) -> Trajectories:
+    """
+    Run ``responder.num_sessions`` adaptive tests with maximum-information selection.
+
+    Args:
+        responder: ``MatrixResponder`` or ``SimulatedResponder``.
+        b, a, c (float or np.array): Bank parameters (calibrated ``z`` as ``b``).
+        max_items (int): Test length; a session also stops when no eligible item is left.
+        method (str): ``"eap"`` or ``"mle"`` ability updates.
+        theta_start (float): Estimate before the first answer.
+        prior_sd (float): SD of the N(0, prior_sd^2) ability prior.
+        num_nodes (int): Gauss-Hermite nodes of the per-session likelihood.
+        session_block (int): Sessions run together; bounds the (sessions x bank) temporaries.
+        selector (str): ``"index"`` (``itembank.DifficultyIndex``, O(log n) per
+            query) or ``"dense"`` (``DenseSelector``, the full information matrix).
+        strategy: A ``reeval.selection`` strategy (exposure control, content
+            quotas); ``MaxInfo()`` by default.
+        exposure (ExposureCounters): Offer and administration counts to add to.
+        stopping (StoppingRule): SE and information-plateau termination.
+    """
+    if method not in ("eap", "mle"):
+        raise ValueError(f"unknown method {method!r}, expected 'eap' or 'mle'")
+    if selector not in SELECTORS:
+        raise ValueError(f"unknown selector {selector!r}, expected one of {sorted(SELECTORS)}")
+    b = np.asarray(b, dtype=float)
+    strategy = strategy or MaxInfo()
+    n_sessions = responder.num_sessions
+    max_items = min(max_items, len(b))
+    items = np.full((n_sessions, max_items), -1, dtype=np.int32)
+    responses = np.full((n_sessions, max_items), -1, dtype=np.int8)
+    theta = np.empty((n_sessions, max_items + 1))
+    se = np.empty((n_sessions, max_items + 1))
+    information = np.zeros((n_sessions, max_items + 1))
+    stop_reason = np.zeros(n_sessions, dtype=np.int8)
+
+    unit_nodes, node_weights = gauss_hermite_grid(num_nodes)
+    nodes, log_prior = prior_sd * unit_nodes, np.log(node_weights)
+    # (items, nodes) answer log-likelihoods, looked up per administered item
+    log_p, log_q = (np.ascontiguousarray(table.T, dtype=np.float32) for table in log_icc(nodes[:, None], a, b, c))
+
+    for start in range(0, n_sessions, session_block):
+        sessions = np.arange(start, min(start + session_block, n_sessions))
+        available = responder.eligible(sessions)
+        active = available.any(axis=1)
+        bank = SELECTORS[selector](b, a, c, available, groups=strategy.groups)
+        strategy.start(bank, sessions, exposure)
+        estimate = np.full(len(sessions), float(theta_start))
+        error = np.full(len(sessions), float(prior_sd))
+        node_ll = np.zeros((len(sessions), num_nodes))
+        num_correct = np.zeros(len(sessions), dtype=int)
+        test_information = np.zeros(len(sessions))
+        stop_reason[sessions[~active]] = STOP_REASONS.index("exhausted")
+        theta[sessions, 0], se[sessions, 0] = estimate, error
+
+        for step in range(max_items):
+            live = np.flatnonzero(active)
+            if len(live):
+                chosen = strategy.select(live, estimate[live])
+                exhausted = chosen < 0
+                active[live[exhausted]] = False
+                stop_reason[sessions[live[exhausted]]] = STOP_REASONS.index("exhausted")
+                live, chosen = live[~exhausted], chosen[~exhausted]
+            if len(live):
+                bank.remove(live, chosen)
+                strategy.administered(live, chosen)
+                if exposure is not None:
+                    exposure.record_administered(chosen)
+                y = responder.answer(sessions[live], chosen)
+                items[sessions[live], step] = chosen
+                responses[sessions[live], step] = y
+                # Information of the new item at the estimate it was chosen for
+                test_information[live] += fisher_information(estimate[live], _at(a, chosen), b[chosen], _at(c, chosen))
+                num_correct[live] += y
+                node_ll[live] += np.where(y[:, None] == 1, log_p[chosen], log_q[chosen])
+                _, estimate[live], error[live], _ = posterior(node_ll[live], nodes, log_prior)
+                if method == "mle":
+                    mixed = live[(num_correct[live] > 0) & (num_correct[live] < step + 1)]
+                    if len(mixed):
+                        rows = sessions[mixed]
+                        estimate[mixed], error[mixed] = newton_theta(
+                            estimate[mixed], items[rows, :step + 1], responses[rows, :step + 1], b, a, c
+                        )
+            # Stopped sessions keep their last estimate
+            theta[sessions, step + 1], se[sessions, step + 1] = estimate, error
+            information[sessions, step + 1] = test_information
+            if stopping is not None and len(live):
+                reason = stopping.check(step, error[live], information[sessions[live], :step + 2])
+                done = reason >= 0
+                active[live[done]] = False
+                stop_reason[sessions[live[done]]] = reason[done]
+            if not active.any():
+                theta[sessions, step + 2:] = estimate[:, None]
+                se[sessions, step + 2:] = error[:, None]
+                information[sessions, step + 2:] = test_information[:, None]
+                break
+
+    return Trajectories(items, responses, theta, se, responder.true_theta, information, stop_reason)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Simulate maximum-information adaptive tests on the calibrated item bank.")
+    parser.add_argument("--store", default=None, help="response matrix store (default: <data_dir>/resmat)")
+    parser.add_argument("--prefix", default=logs.LOG_PREFIX, help="calibration log prefix (bank difficulties and reference abilities)")
+    parser.add_argument("--data-dir", default=None, help="where the logs are read from (default: data_dir setting)")
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--max-items", type=int, default=30)
+    parser.add_argument("--method", default="eap", choices=["eap", "mle"])
+    parser.add_argument("--simulate", action="store_true", help="draw answers from the model for N(0, 1) abilities instead of replaying test-takers")
+    parser.add_argument("--session-block", type=int, default=SESSION_BLOCK)
+    parser.add_argument("--selector", default="index", choices=sorted(SELECTORS), help="sorted-difficulty index or full information matrix")
+    parser.add_argument("--strategy", default="maxinfo", choices=["maxinfo", "randomesque", "sympson-hetter"], help="exposure control, see reeval.selection")
+    parser.add_argument("--top-k", type=int, default=5, help="candidates per pick (randomesque)")
+    parser.add_argument("--max-exposure", type=float, default=0.2, help="target largest share of sessions seeing an item (sympson-hetter)")
+    parser.add_argument("--sh-rounds", type=int, default=5, help="simulations used to set the exposure parameters (sympson-hetter)")
+    parser.add_argument("--quota-by", default=None, help="column label to balance, e.g. benchmark; caps are proportional to the bank")
+    parser.add_argument("--max-se", type=float, default=None, help="stop a session once its SE is below this")
+    parser.add_argument("--min-gain", type=float, default=None, help="stop once the last --plateau-items items added less than this share of the test information")
+    parser.add_argument("--plateau-items", type=int, default=3)
+    parser.add_argument("--min-items", type=int, default=1, help="never stop earlier than this")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help=f"trajectory file (default: <data_dir>/{TRAJECTORIES_FILE})")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    b = np.asarray(logs.load_parameter_log("z", args.prefix, args.data_dir)[-1], dtype=float)
+    resmat = None
+    if not args.simulate or args.quota_by:
+        resmat = ResponseMatrix.open(args.store or config.data_path("resmat"))
+    if args.simulate:
+        responder = SimulatedResponder(rng.standard_normal(args.sessions), b, seed=args.seed)
+    else:
+        reference = np.asarray(logs.load_parameter_log("theta", args.prefix, args.data_dir)[-1], dtype=float)
+        responder = MatrixResponder(resmat, rng.integers(0, resmat.shape[0], args.sessions), reference)
+
+    if args.strategy == "randomesque":
+        strategy = Randomesque(args.top_k, seed=args.seed)
+    elif args.strategy == "sympson-hetter":
+        strategy = SympsonHetter(n_items=len(b), seed=args.seed)
+    else:
+        strategy = MaxInfo()
+    if args.quota_by:
+        groups, names = content_groups(resmat.columns[args.quota_by])
+        strategy = ContentQuota(groups, proportional_caps(groups, args.max_items), inner=strategy)
+    stopping = None
+    if args.max_se is not None or args.min_gain is not None:
+        stopping = StoppingRule(args.max_se, args.min_gain, args.plateau_items, args.min_items)
+    options = dict(max_items=args.max_items, method=args.method, session_block=args.session_block, selector=args.selector, stopping=stopping)
+
+    exposure = ExposureCounters(len(b))
+    start = time.time()
+    if args.strategy == "sympson-hetter":
+        control = strategy.inner if args.quota_by else strategy
+        for round_ in range(args.sh_rounds):
+            exposure.reset()
+            simulate(responder, b, strategy=strategy, exposure=exposure, **options)
+            print(f"Sympson-Hetter round {round_ + 1}: largest exposure {control.update(exposure, args.sessions, args.max_exposure):.3f}")
+        exposure.reset()
+    result = simulate(responder, b, strategy=strategy, exposure=exposure, **options)
+    elapsed = time.time() - start
+    path = result.save(args.out or config.data_path(TRAJECTORIES_FILE))
+    report = length_report(result, responder.full_lengths)
+    rates = exposure.administered / args.sessions
+    print(
+        f"{args.sessions} sessions x {report.mean_length:.1f} items on a {len(b)}-item bank in {elapsed:.1f}s; "
+        f"final SE {report.mean_se:.3f}, RMSE vs reference {report.rmse:.3f}; wrote {path}"
+    )
+    print(
+        f"Test length: {report.mean_length:.1f} of {report.mean_full_length:.0f} items per session on average "
+        f"({report.saved:.1%} saved); stopped by " + ", ".join(f"{name} {count}" for name, count in report.stop_reasons.items())
+    )
+    print(f"Exposure: largest {rates.max(initial=0):.3f}, {np.count_nonzero(rates)} items used")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
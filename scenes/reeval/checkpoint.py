@@ -0,0 +1,121 @@
+"""Save a scene's final mobjects so a continuation scene can start from them.
+
+The producing scene ends with::
+
+    save_checkpoint(self, "e_vis_scene1", circles=test_taker_circles, matrix=matrix_group)
+
+and the next scene begins with::
+
+    state = restore_checkpoint(self, "e_vis_scene1", producer=Scene1)
+    circles, matrix = state["circles"], state["matrix"]
+
+The whole ``self.mobjects`` list (order = z-order) plus the named handles are
+pickled together, so the handles point at the very objects on screen and the
+cut is pixel-identical. Updaters are closures and are not saved; re-attach
+them after restoring if the continuation needs them.
+
+A checkpoint records a hash of everything the producer's final state
+depends on: its source file, the ``reeval`` sources, the data files it reads
+(``render.hash_inputs``) and the manim version. If it is missing or stale and
+a ``producer`` class is given, the producer is run in-process with every
+animation skipped and no output written (construction cost only), which
+writes a fresh checkpoint.
+"""
+from __future__ import annotations
+
+import hashlib
+import inspect
+import os
+import pickle
+from importlib import metadata
+from pathlib import Path
+
+from . import config
+from .render import hash_inputs
+
+CHECKPOINT_VERSION = 2
+UPDATER_ATTRS = ("updaters", "time_based_updaters", "non_time_updaters")
+
+
+def checkpoint_path(name: str) -> Path:
+    return config.media_dir() / "checkpoints" / f"{name}.pkl"
+
+
+def input_hash(scene_class) -> str:
+    """Hash of the producer's source, the ``reeval`` package, its data inputs and the manim version."""
+    digest = hashlib.sha256()
+    try:
+        digest.update(metadata.version("manim").encode())
+    except metadata.PackageNotFoundError:
+        digest.update(b"<manim unknown>")
+    hash_inputs(digest, Path(inspect.getsourcefile(scene_class)).resolve())
+    return digest.hexdigest()
+
+
+def _stash_updaters(mobjects) -> list:
+    """Detach updaters from every mobject in the families of ``mobjects``."""
+    stashed = []
+    for mob in mobjects:
+        for member in mob.get_family():
+            for attr in UPDATER_ATTRS:
+                updaters = getattr(member, attr, None)
+                if updaters:
+                    stashed.append((member, attr, updaters))
+                    setattr(member, attr, [])
+    return stashed
+
+
+def save_checkpoint(scene, name: str, **named) -> Path:
+    """Pickle ``scene.mobjects`` and the ``named`` handles into the checkpoint ``name``."""
+    path = checkpoint_path(name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    state = {
+        "version": CHECKPOINT_VERSION,
+        "input_hash": input_hash(type(scene)),
+        "background_color": getattr(scene.camera, "background_color", None),
+        "mobjects": list(scene.mobjects),
+        "named": named,
+    }
+    stashed = _stash_updaters(state["mobjects"] + list(named.values()))
+    try:
+        payload = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+    finally:
+        for member, attr, updaters in stashed:
+            setattr(member, attr, updaters)
+    # Per-process name: parallel renders may produce the same checkpoint at once
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_bytes(payload)
+    tmp.replace(path)
+    return path
+
+
+def load_checkpoint(name: str, producer=None) -> dict:
+    """Read checkpoint ``name``, (re)producing it from ``producer`` if missing or stale."""
+    path = checkpoint_path(name)
+    state = pickle.loads(path.read_bytes()) if path.exists() else None
+    fresh = state is not None and state.get("version") == CHECKPOINT_VERSION
+    if fresh and producer is not None:
+        fresh = state.get("input_hash") == input_hash(producer)
+    if not fresh:
+        if producer is None:
+            raise FileNotFoundError(f"checkpoint {name!r} is missing or outdated; render the producing scene first")
+        _produce(producer)
+        state = pickle.loads(path.read_bytes())
+    return state
+
+
+def restore_checkpoint(scene, name: str, producer=None) -> dict:
+    """Add the saved mobjects to ``scene`` (same order) and return the named handles."""
+    state = load_checkpoint(name, producer)
+    if state["background_color"] is not None:
+        scene.camera.background_color = state["background_color"]
+    scene.add(*state["mobjects"])
+    return state["named"]
+
+
+def _produce(producer) -> None:
+    """Run ``producer`` without rendering frames or writing files, so it saves its checkpoint."""
+    from manim import tempconfig
+
+    with tempconfig({"dry_run": True, "from_animation_number": config.SKIP_ALL}):
+        producer().render()
@@ -0,0 +1,226 @@
+"""Render one long scene in parallel by splitting it at ``self.play`` boundaries.
+
+::
+
+    python -m reeval.chunked 13_mfi_illusration.py AdaptiveTestingVisualization -j 8 -q h
+
+1. A probe run executes ``construct`` with every animation skipped (manim
+   jumps each one straight to its final state) and records the run time of
+   each ``play``/``wait``.
+2. The plays are split into contiguous ranges of roughly equal duration.
+3. Each range is rendered by its own process using manim's
+   ``from_animation_number``/``upto_animation_number``: earlier plays are
+   skipped the same way as in the probe, so every worker reaches its first
+   frame in the exact state the serial render would have, then renders only
+   its range into a private media dir.
+4. The partial movies are concatenated in order with ``ffmpeg -c copy``
+   into ``<media_dir>/videos/<file>/<quality>/<Scene>.mp4``.
+
+Every worker seeds ``random`` and ``np.random`` with the same value before
+``construct`` so scenes that draw unseeded random layouts agree across
+chunks. Updaters that integrate ``dt`` see one large step while skipping, so
+scenes that rely on them are only chunk-safe once their motion is baked (as
+``1_triangle_circle.py`` does with ``reeval.particles.bake``).
+"""
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from . import config, texcache
+
+QUALITY_NAMES = {
+    "l": "low_quality",
+    "m": "medium_quality",
+    "h": "high_quality",
+    "p": "production_quality",
+    "k": "fourk_quality",
+}
+DEFAULT_SEED = 0
+
+
+def plan_chunks(durations: list[float], num_chunks: int) -> list[tuple[int, int]]:
+    """Split play indices into contiguous inclusive ``(first, last)`` ranges of similar total duration."""
+    num_chunks = max(1, min(num_chunks, len(durations)))
+    total = sum(durations)
+    chunks, start, acc = [], 0, 0.0
+    for i, duration in enumerate(durations):
+        acc += duration
+        remaining_plays = len(durations) - i - 1
+        remaining_chunks = num_chunks - len(chunks) - 1
+        target = total * (len(chunks) + 1) / num_chunks
+        if remaining_chunks > 0 and (acc >= target or remaining_plays == remaining_chunks):
+            chunks.append((start, i))
+            start = i + 1
+    chunks.append((start, len(durations) - 1))
+    chunks = [c for c in chunks if c[0] <= c[1]]
+    # A range ending at play 0 can't be expressed (see ``chunk_settings``): give play 0 to the next range
+    if len(chunks) > 1 and chunks[0] == (0, 0):
+        chunks = [(0, chunks[1][1])] + chunks[2:]
+    return chunks
+
+
+def chunk_settings(first: int, last: int, num_plays: int) -> dict:
+    """manim settings that render plays ``first..last`` (inclusive) of a scene with ``num_plays`` plays.
+
+    manim ignores an ``upto_animation_number`` of 0 (it is tested for
+    truthiness) and would render to the end, so the last range leaves it
+    unset and a range ending at play 0 is only accepted when it is the whole
+    scene.
+    """
+    if not 0 <= first <= last < num_plays:
+        raise ValueError(f"invalid play range {first}-{last} of {num_plays} plays")
+    if last == 0 and num_plays > 1:
+        raise ValueError("a range ending at play 0 would render the whole scene; merge it into the next range")
+    settings = {"from_animation_number": first}
+    if last < num_plays - 1:
+        settings["upto_animation_number"] = last
+    return settings
+
+
+def _load_scene_class(file: Path, scene: str):
+    sys.path.insert(0, str(file.parent))
+    spec = importlib.util.spec_from_file_location(f"reeval_chunk_{file.stem}", file)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return getattr(module, scene)
+
+
+def _run_scene(file: Path, scene: str, settings: dict, seed: int, record_durations: bool = False) -> dict:
+    """Worker body: render ``scene`` under ``settings``; runs inside a subprocess."""
+    import numpy as np
+    from manim import tempconfig
+
+    random.seed(seed)
+    np.random.seed(seed)
+    with tempconfig(settings):
+        scene_class = _load_scene_class(file, scene)
+        durations = []
+        if record_durations:
+            original_play = scene_class.play
+
+            def play(self, *args, **kwargs):
+                original_play(self, *args, **kwargs)
+                durations.append(float(getattr(self, "duration", 0.0) or 0.0))
+
+            scene_class.play = play
+        instance = scene_class()
+        instance.render()
+        movie = getattr(instance.renderer.file_writer, "movie_file_path", None)
+        return {"durations": durations, "movie": str(movie) if movie else None}
+
+
+def _worker_main(argv) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("file", type=Path)
+    parser.add_argument("scene")
+    parser.add_argument("result", type=Path)
+    parser.add_argument("--settings", required=True)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--probe", action="store_true")
+    args = parser.parse_args(argv)
+
+    file = args.file.resolve()
+    # manim reads the folder-wide manim.cfg from the working directory at import time
+    os.chdir(file.parent)
+    result = _run_scene(file, args.scene, json.loads(args.settings), args.seed, record_durations=args.probe)
+    args.result.write_text(json.dumps(result))
+    return 0
+
+
+def _spawn(file: Path, scene: str, settings: dict, seed: int, log_path: Path, probe: bool = False) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        result_path = Path(tmp) / "result.json"
+        command = [
+            sys.executable, "-m", "reeval.chunked", "_worker",
+            str(file), scene, str(result_path),
+            "--settings", json.dumps(settings), "--seed", str(seed),
+        ]
+        if probe:
+            command.append("--probe")
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(config.SCENES_DIR), os.environ.get("PYTHONPATH")])))
+        with open(log_path, "w") as log:
+            proc = subprocess.run(command, cwd=file.parent, stdout=log, stderr=subprocess.STDOUT, env=env)
+        if proc.returncode != 0 or not result_path.exists():
+            raise RuntimeError(f"{file.name}::{scene} worker failed, see {log_path}")
+        return json.loads(result_path.read_text())
+
+
+def stitch(movies: list[Path], output: Path) -> Path:
+    """Concatenate same-codec movies losslessly in the given order."""
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as listing:
+        for movie in movies:
+            escaped = str(Path(movie).resolve()).replace("'", "'\\''")
+            listing.write(f"file '{escaped}'\n")
+    try:
+        subprocess.run(
+            ["ffmpeg", "-y", "-loglevel", "error", "-f", "concat", "-safe", "0", "-i", listing.name, "-c", "copy", str(output)],
+            check=True,
+        )
+    finally:
+        os.unlink(listing.name)
+    return output
+
+
+def render_chunked(file: Path, scene: str, quality: str = "l", workers: int | None = None, seed: int = DEFAULT_SEED, report=print) -> Path:
+    """Probe, split, render the ranges in parallel and stitch; returns the final movie."""
+    file = Path(file).resolve()
+    media = config.media_dir()
+    work_dir = media / "chunks" / file.stem / scene
+    shutil.rmtree(work_dir, ignore_errors=True)
+    work_dir.mkdir(parents=True)
+    base = {"quality": QUALITY_NAMES[quality], "tex_dir": str(texcache.tex_cache_dir())}
+
+    probe = _spawn(file, scene, {**base, "media_dir": str(work_dir / "probe"), "dry_run": True, "from_animation_number": config.SKIP_ALL}, seed, work_dir / "probe.log", probe=True)
+    durations = probe["durations"]
+    if not durations:
+        raise RuntimeError(f"{file.name}::{scene} plays no animations")
+    chunks = plan_chunks(durations, workers or os.cpu_count())
+    report(f"{scene}: {len(durations)} plays, {sum(durations):.1f}s of animation in {len(chunks)} chunks")
+
+    def render_range(index: int, first: int, last: int) -> Path:
+        settings = {**base, "media_dir": str(work_dir / f"chunk_{index:03d}"), **chunk_settings(first, last, len(durations))}
+        start = time.time()
+        result = _spawn(file, scene, settings, seed, work_dir / f"chunk_{index:03d}.log")
+        report(f"  chunk {index} (plays {first}-{last}) in {time.time() - start:.1f}s")
+        return Path(result["movie"])
+
+    with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+        movies = list(pool.map(lambda args: render_range(*args), [(i, a, b) for i, (a, b) in enumerate(chunks)]))
+
+    output = media / "videos" / file.stem / movies[0].parent.name / f"{scene}{movies[0].suffix}"
+    return stitch(movies, output)
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "_worker":
+        return _worker_main(argv[1:])
+
+    parser = argparse.ArgumentParser(description="Render one scene in parallel chunks split at play() boundaries.")
+    parser.add_argument("file", type=Path, help="scene file, e.g. 13_mfi_illusration.py")
+    parser.add_argument("scene", help="Scene class name")
+    parser.add_argument("-q", "--quality", default="l", choices=list(QUALITY_NAMES))
+    parser.add_argument("-j", "--workers", type=int, default=None, help="number of chunks/processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="seed for random/np.random in every worker")
+    args = parser.parse_args(argv)
+
+    file = args.file if args.file.is_absolute() else (Path.cwd() / args.file)
+    output = render_chunked(file, args.scene, args.quality, args.workers, args.seed)
+    print(f"Wrote {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""Project settings read from the ``[reeval]`` section of ``scenes/manim.cfg``.
+
+Every setting can be overridden with an environment variable named
+``REEVAL_<KEY>`` (e.g. ``REEVAL_DATA_DIR=/mnt/reeval/data``). Relative paths
+are resolved against the ``scenes/`` directory, so renders work no matter
+which directory manim is launched from.
+"""
+from __future__ import annotations
+
+import configparser
+import os
+from pathlib import Path
+
+SCENES_DIR = Path(__file__).resolve().parent.parent
+CONFIG_FILE = SCENES_DIR / "manim.cfg"
+SECTION = "reeval"
+SKIP_ALL = 10**9  # manim from_animation_number beyond any scene: skip every play
+
+DEFAULTS = {
+    "data_dir": "../data",
+    "media_dir": "media",
+}
+
+
+def get_setting(key: str, default: str | None = None) -> str | None:
+    """Look up ``key`` in the environment, then manim.cfg, then ``DEFAULTS``."""
+    env_value = os.environ.get(f"REEVAL_{key.upper()}")
+    if env_value is not None:
+        return env_value
+    parser = configparser.ConfigParser()
+    parser.read(CONFIG_FILE)
+    if parser.has_option(SECTION, key):
+        return parser.get(SECTION, key)
+    return DEFAULTS.get(key, default)
+
+
+def resolve_path(value: str) -> Path:
+    path = Path(value).expanduser()
+    if not path.is_absolute():
+        path = SCENES_DIR / path
+    return path.resolve()
+
+
+def data_dir() -> Path:
+    """Root folder holding ``resmat*`` and the ``rasch_global_*.jsonl`` logs."""
+    return resolve_path(get_setting("data_dir"))
+
+
+def data_path(*parts: str) -> Path:
+    return data_dir().joinpath(*parts)
+
+
+def media_dir() -> Path:
+    """Render outputs, manifests and checkpoints (manim's ``media_dir``)."""
+    return resolve_path(get_setting("media_dir"))
@@ -0,0 +1,219 @@
+"""Many shapes moving at once as one mobject and one animation.
+
+``circle.animate(run_time=..., rate_func=...).move_to(...)`` for every
+member of a crowd gives manim one animation and one mobject copy per circle
+to interpolate on every frame. ``Crowd`` holds all outlines in a single
+VMobject, placed at a (n x 3) ``positions`` array and scaled by a per-member
+``sizes`` array. ``CrowdMove`` moves the whole crowd from its positions to
+an ``end`` array. Each member has its own duration, start delay and easing,
+given as an index into a tuple of ``RATE_FUNCTIONS`` names. A frame is one
+progress array, one easing call per distinct rate function and one
+broadcast add over the outlines.
+
+``ApplyToCrowd`` is the point-set version of ``ApplyFunction``: the
+destinations are a vectorized mapping of the current positions (e.g.
+``in_coordinates(axes, ...)`` around the IRT sigmoid), staggered with a
+``lag_ratio`` like ``LaggedStart``. With ``sizes`` it also grows or shrinks
+the members, which is how a crowd pops in member by member. No target
+mobjects are built, so it scales to tens of thousands of points.
+
+::
+
+    crowd = Crowd.circles(starts, radii, color=GRAY, fill_opacity=0.15)
+    self.add(crowd)
+    self.play(CrowdMove(crowd, ends, durations, rate_ids, rate_functions=("ease_in_expo", "ease_in_quad")))
+
+    dots = Crowd.dots(axes_points(axes, xs, ys), radius=0.03).set_sizes(0)
+    self.play(ApplyToCrowd(dots, sizes=1, lag_ratio=0.04))
+    self.play(ApplyToCrowd(dots, in_coordinates(axes, lambda x, y: (x, expit(x))), run_time=3))
+"""
+from __future__ import annotations
+
+import numpy as np
+from manim import *
+
+
+def _smooth(t, inflection: float = 10.0):
+    error = 1 / (1 + np.exp(inflection / 2))
+    return np.clip((1 / (1 + np.exp(-inflection * (t - 0.5))) - error) / (1 - 2 * error), 0, 1)
+
+
+# Array versions of the ``manim.rate_functions`` of the same name
+RATE_FUNCTIONS = {
+    "linear": lambda t: t,
+    "smooth": _smooth,
+    "ease_in_sine": lambda t: 1 - np.cos(t * np.pi / 2),
+    "ease_out_sine": lambda t: np.sin(t * np.pi / 2),
+    "ease_in_out_sine": lambda t: -(np.cos(np.pi * t) - 1) / 2,
+    "ease_in_quad": lambda t: t * t,
+    "ease_out_quad": lambda t: 1 - (1 - t) * (1 - t),
+    "ease_in_out_quad": lambda t: np.where(t < 0.5, 2 * t * t, 1 - (-2 * t + 2) ** 2 / 2),
+    "ease_in_cubic": lambda t: t**3,
+    "ease_in_quart": lambda t: t**4,
+    "ease_in_expo": lambda t: np.where(t == 0, 0.0, 2.0 ** (10 * t - 10)),
+}
+
+
+class Crowd(VMobject):
+    """Outlines of ``n`` shapes drawn as one VMobject, member ``i`` centered on ``positions[i]``.
+
+    ``positions`` and ``sizes`` are the source of truth: move members with
+    ``set_positions`` (or ``CrowdMove``) rather than ``shift``/``move_to`` on
+    the crowd.
+
+    Args:
+        outlines (np.array): (n, k, 3) or shared (k, 3) points of each member relative to its center.
+        positions (np.array): (n, 2) or (n, 3) centers.
+        sizes (float or np.array): Per-member scale of the outlines.
+    """
+
+    def __init__(self, outlines, positions, sizes=1.0, **kwargs):
+        super().__init__(**kwargs)
+        positions = np.asarray(positions, dtype=float)
+        if positions.shape[1] == 2:
+            positions = np.column_stack([positions, np.zeros(len(positions))])
+        self.outlines = np.broadcast_to(np.asarray(outlines, dtype=float), (len(positions),) + np.shape(outlines)[-2:])
+        self.set_positions(positions, sizes)
+
+    @classmethod
+    def circles(cls, positions, radius, **kwargs) -> "Crowd":
+        """Circles of per-member ``radius`` (float or (n,) array)."""
+        unit = Circle(radius=1.0).points
+        radius = np.broadcast_to(np.asarray(radius, dtype=float), (len(positions),))
+        return cls(unit[None] * radius[:, None, None], positions, **kwargs)
+
+    @classmethod
+    def dots(cls, positions, radius: float = DEFAULT_DOT_RADIUS, **kwargs) -> "Crowd":
+        """Circles styled like ``Dot``: filled, no stroke, white unless given a color."""
+        kwargs.setdefault("color", WHITE)
+        kwargs.setdefault("fill_opacity", 1.0)
+        kwargs.setdefault("stroke_width", 0)
+        return cls.circles(positions, radius, **kwargs)
+
+    def set_positions(self, positions=None, sizes=None) -> "Crowd":
+        if positions is not None:
+            self.positions = np.array(positions, dtype=float)
+        if sizes is not None:
+            self.sizes = np.array(np.broadcast_to(sizes, (len(self.positions),)), dtype=float)
+        self.set_points((self.outlines * self.sizes[:, None, None] + self.positions[:, None]).reshape(-1, 3))
+        return self
+
+    def set_sizes(self, sizes) -> "Crowd":
+        return self.set_positions(sizes=sizes)
+
+    def take(self, members) -> "Crowd":
+        """The ``members`` (indices or mask) as a new crowd with this crowd's style, e.g. to ``Indicate`` them."""
+        return Crowd(self.outlines[members], self.positions[members], self.sizes[members]).match_style(self)
+
+
+def _axes_frame(axes) -> tuple[np.ndarray, np.ndarray]:
+    """Origin and (2, 3) unit vectors of linear ``axes``, sampled with three ``c2p`` calls."""
+    origin = np.asarray(axes.c2p(0, 0), dtype=float)
+    return origin, np.stack([np.asarray(axes.c2p(1, 0)) - origin, np.asarray(axes.c2p(0, 1)) - origin])
+
+
+def axes_points(axes, x, y) -> np.ndarray:
+    """(n, 3) scene points of coordinate arrays ``x``, ``y`` on linear ``axes``."""
+    origin, basis = _axes_frame(axes)
+    return origin + np.column_stack(np.broadcast_arrays(np.ravel(x), np.ravel(y))) @ basis
+
+
+def in_coordinates(axes, function):
+    """Position mapping that applies ``function(x, y) -> (x, y)`` in the coordinates of linear ``axes``.
+
+    ``function`` gets and returns coordinate arrays, and the conversions are
+    two small matrix products.
+    """
+    origin, basis = _axes_frame(axes)
+    inverse = np.linalg.pinv(basis)
+
+    def mapping(positions):
+        x, y = function(*((positions - origin) @ inverse).T)
+        return axes_points(axes, x, y)
+
+    return mapping
+
+
+class CrowdMove(Animation):
+    """Move every member of a ``Crowd`` to ``end`` on its own schedule.
+
+    Member ``i`` waits ``delays[i]``, then moves over ``durations[i]`` seconds
+    eased by ``rate_functions[rate_ids[i]]``; the animation lasts until the
+    last member arrives.
+
+    Args:
+        crowd (Crowd): The crowd, starting from its current positions.
+        end (np.array): (n, 2) or (n, 3) destinations.
+        durations (float or np.array): Per-member travel time in seconds.
+        rate_ids (int or np.array): Per-member index into ``rate_functions``.
+        delays (float or np.array): Per-member start delay in seconds.
+        rate_functions (tuple): ``RATE_FUNCTIONS`` names.
+        sizes (float or np.array): Final per-member sizes, or None to keep them.
+    """
+
+    def __init__(self, crowd: Crowd, end, durations=1.0, rate_ids=0, delays=0.0, rate_functions=("smooth",), sizes=None, **kwargs):
+        n = len(crowd.positions)
+        end = np.asarray(end, dtype=float)
+        if end.shape[1] == 2:
+            end = np.column_stack([end, np.zeros(n)])
+        self.end = end
+        self.end_sizes = None if sizes is None else np.broadcast_to(np.asarray(sizes, dtype=float), (n,))
+        self.durations = np.broadcast_to(np.asarray(durations, dtype=float), (n,))
+        self.delays = np.broadcast_to(np.asarray(delays, dtype=float), (n,))
+        rate_ids = np.broadcast_to(np.asarray(rate_ids, dtype=int), (n,))
+        # Members grouped by easing, so a frame calls each rate function once
+        self.groups = [(RATE_FUNCTIONS[name], np.flatnonzero(rate_ids == k)) for k, name in enumerate(rate_functions)]
+        # Schedules are in seconds of this span; a different run_time stretches them all
+        self.span = float((self.delays + self.durations).max(initial=0))
+        kwargs.setdefault("run_time", self.span)
+        super().__init__(crowd, rate_func=linear, **kwargs)
+
+    def begin(self) -> None:
+        self.start = self.mobject.positions.copy()
+        self.start_sizes = self.mobject.sizes.copy()
+        super().begin()
+
+    def interpolate_mobject(self, alpha: float) -> None:
+        elapsed = alpha * self.span
+        progress = np.clip((elapsed - self.delays) / np.maximum(self.durations, 1e-9), 0.0, 1.0)
+        eased = np.empty_like(progress)
+        for func, members in self.groups:
+            eased[members] = func(progress[members])
+        sizes = None if self.end_sizes is None else self.start_sizes + (self.end_sizes - self.start_sizes) * eased
+        self.mobject.set_positions(self.start + (self.end - self.start) * eased[:, None], sizes)
+
+
+class ApplyToCrowd(CrowdMove):
+    """Move every member of a ``Crowd`` to ``function(positions)``, lagged like ``LaggedStart``.
+
+    With ``lag_ratio`` r each member takes ``run_time / (1 + (n - 1) r)`` and
+    starts r of that after the previous one, in index order or in the order
+    of ``order`` (e.g. the x coordinates for a left-to-right sweep).
+
+    Args:
+        crowd (Crowd): The crowd, starting from its current positions.
+        function: Maps (n, 3) positions to (n, 2) or (n, 3) destinations; None keeps them.
+        lag_ratio (float): As for ``LaggedStart``; 0 moves all members together.
+        order (np.array): Per-member sort key of the stagger, or None for index order.
+        rate_function (str): ``RATE_FUNCTIONS`` name of every member's easing.
+        sizes (float or np.array): Final per-member sizes, or None to keep them.
+        run_time (float): Seconds from the first start to the last arrival.
+    """
+
+    def __init__(self, crowd: Crowd, function=None, lag_ratio: float = 0.0, order=None, rate_function: str = "smooth", sizes=None, run_time: float = 1.0, **kwargs):
+        n = len(crowd.positions)
+        rank = np.arange(n) if order is None else np.argsort(np.argsort(order, kind="stable"))
+        duration = run_time / (1 + max(n - 1, 0) * lag_ratio)
+        self.function = function
+        super().__init__(
+            crowd, crowd.positions, duration, 0, rank * lag_ratio * duration, (rate_function,), sizes, run_time=run_time, **kwargs
+        )
+
+    def begin(self) -> None:
+        positions = self.mobject.positions
+        if self.function is not None:
+            end = np.asarray(self.function(positions.copy()), dtype=float)
+            self.end = np.column_stack([end, positions[:, 2]]) if end.shape[1] == 2 else end
+        else:
+            self.end = positions.copy()
+        super().begin()
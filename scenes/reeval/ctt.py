@@ -0,0 +1,182 @@
+"""Classical test theory statistics of the response matrix, ``X = T + e`` of ``2_ctt.py``.
+
+::
+
+    python -m reeval.ctt            # full matrix, writes <data_dir>/ctt_statistics.npz
+
+Every statistic skips missing responses instead of imputing them:
+
+- item p-value: proportion correct among the test-takers who answered it,
+- person score: proportion correct over the items the person answered (the
+  number correct and answered are kept too),
+- point-biserial discrimination: correlation between an item and the rest
+  score (the person score without that item), over the item's respondents,
+- Cronbach's alpha on prorated totals (person score times the number of
+  items), since hardly any two test-takers answered the same items.
+
+The item-rest correlation of every item comes from five sums over its
+respondents (count, item, rest, rest squared, item times rest). With the rest
+score written as ``A_i - y_ij B_i`` those are matrix-vector products of the
+block's bit planes with per-person vectors, so a column block of the store
+costs a handful of (persons x block) products. The person scores must be
+known first, so the full matrix takes two passes (``calibrate.score_totals``
+and the moments); everything is O(persons x block_size) in memory.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from . import config
+from .calibrate import BLOCK_SIZE, score_totals
+from .resmat import ResponseMatrix
+
+STATISTICS_FILE = "ctt_statistics.npz"
+
+
+class TestStatistics(NamedTuple):
+    p_value: np.ndarray  # (items,) proportion correct among respondents, NaN if unanswered
+    point_biserial: np.ndarray  # (items,) item-rest correlation, NaN where undefined
+    item_observed: np.ndarray  # (items,) number of respondents
+    person_correct: np.ndarray  # (persons,)
+    person_observed: np.ndarray  # (persons,)
+    alpha: float
+
+    @property
+    def person_score(self) -> np.ndarray:
+        """Proportion correct per person, NaN if nothing was answered."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.person_observed > 0, self.person_correct / self.person_observed, np.nan)
+
+    @property
+    def difficulty(self) -> np.ndarray:
+        """Proportion incorrect per item (``1 - p``), the bar height of ``6_E_vis.py``."""
+        return 1 - self.p_value
+
+    def save(self, path) -> Path:
+        path = Path(path)
+        np.savez_compressed(path, **self._asdict())
+        return path
+
+    @classmethod
+    def load(cls, path) -> "TestStatistics":
+        data = np.load(path)
+        return cls(*(data[field] for field in cls._fields[:-1]), float(data["alpha"]))
+
+
+def _rest_coefficients(person_correct, person_observed) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """``(A, B, usable)`` with rest score ``A_i - y B_i``; persons with one answer have no rest."""
+    usable = person_observed > 1
+    scale = np.where(usable, 1.0 / np.maximum(person_observed - 1, 1), 0.0)
+    return person_correct * scale, scale, usable
+
+
+def item_rest_moments(correct, observed, rest_a, rest_b) -> np.ndarray:
+    """(5, items) sums over respondents: count, item, rest, rest^2, item * rest.
+
+    Args:
+        correct, observed (np.array): (persons, items) bit planes of a block,
+            persons without a rest score already masked out of ``observed``.
+        rest_a, rest_b (np.array): Per-person rest coefficients (``_rest_coefficients``).
+    """
+    y = (correct.astype(bool) & observed).astype(float)
+    seen = observed.astype(float)
+    # Sums over persons as (items x persons) @ (persons x k) products, one per per-person vector
+    obs = seen.T @ np.stack([np.ones_like(rest_a), rest_a, rest_a**2], axis=1)
+    cor = y.T @ np.stack([np.ones_like(rest_a), rest_a, rest_b, rest_a * rest_b, rest_b**2], axis=1)
+    n, sum_y = obs[:, 0], cor[:, 0]
+    sum_r = obs[:, 1] - cor[:, 2]
+    sum_rr = obs[:, 2] - 2 * cor[:, 3] + cor[:, 4]
+    sum_yr = cor[:, 1] - cor[:, 2]
+    return np.stack([n, sum_y, sum_r, sum_rr, sum_yr])
+
+
+def point_biserial(moments) -> np.ndarray:
+    """Item-rest correlation from ``item_rest_moments``; NaN for constant items or rests."""
+    n, sum_y, sum_r, sum_rr, sum_yr = moments
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_y, mean_r = sum_y / n, sum_r / n
+        covariance = sum_yr / n - mean_y * mean_r
+        variance = mean_y * (1 - mean_y) * np.maximum(sum_rr / n - mean_r**2, 0)
+        return np.where(variance > 0, covariance / np.sqrt(variance), np.nan)
+
+
+def cronbach_alpha(item_correct, item_observed, person_correct, person_observed) -> float:
+    """Alpha from item variances ``p q`` and the variance of prorated totals; NaN below two items."""
+    answered = item_observed > 0
+    k = int(answered.sum())
+    persons = person_observed > 0
+    if k < 2 or persons.sum() < 2:
+        return np.nan
+    p = item_correct[answered] / item_observed[answered]
+    totals = k * person_correct[persons] / person_observed[persons]
+    total_variance = totals.var()
+    if total_variance <= 0:
+        return np.nan
+    return float(k / (k - 1) * (1 - (p * (1 - p)).sum() / total_variance))
+
+
+def _statistics(item_correct, item_observed, person_correct, person_observed, moments) -> TestStatistics:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        p_value = np.where(item_observed > 0, item_correct / item_observed, np.nan)
+    return TestStatistics(
+        p_value,
+        point_biserial(moments),
+        item_observed,
+        person_correct,
+        person_observed,
+        cronbach_alpha(item_correct, item_observed, person_correct, person_observed),
+    )
+
+
+def array_statistics(values) -> TestStatistics:
+    """Statistics of an in-memory 0/1/NaN matrix (rows = test-takers), e.g. a subset shown in a scene."""
+    values = np.asarray(values, dtype=float)
+    observed = ~np.isnan(values)
+    correct = np.where(observed, values, 0) > 0.5
+    person_correct, person_observed = correct.sum(axis=1), observed.sum(axis=1)
+    rest_a, rest_b, usable = _rest_coefficients(person_correct, person_observed)
+    moments = item_rest_moments(correct, observed & usable[:, None], rest_a, rest_b)
+    return _statistics(correct.sum(axis=0), observed.sum(axis=0), person_correct, person_observed, moments)
+
+
+def matrix_statistics(resmat: ResponseMatrix, block_size: int = BLOCK_SIZE, items=None) -> TestStatistics:
+    """Statistics of the whole store: a totals pass, then one pass for the item-rest moments.
+
+    Args:
+        items: Item-sharded executor for the totals (``calibrate.SerialItems`` by default).
+    """
+    totals = score_totals(resmat, block_size, items)
+    rest_a, rest_b, usable = _rest_coefficients(totals.person_correct, totals.person_observed)
+    moments = np.empty((5, resmat.shape[1]))
+    for start, stop, correct, observed in resmat.iter_column_blocks(block_size):
+        moments[:, start:stop] = item_rest_moments(correct, observed & usable[:, None], rest_a, rest_b)
+    return _statistics(totals.item_correct, totals.item_observed, totals.person_correct, totals.person_observed, moments)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Classical test theory statistics of the response matrix.")
+    parser.add_argument("--store", default=None, help="response matrix store (default: <data_dir>/resmat)")
+    parser.add_argument("--block-size", type=int, default=BLOCK_SIZE)
+    parser.add_argument("--out", default=None, help=f"statistics file (default: <data_dir>/{STATISTICS_FILE})")
+    args = parser.parse_args(argv)
+
+    resmat = ResponseMatrix.open(args.store or config.data_path("resmat"))
+    start = time.time()
+    stats = matrix_statistics(resmat, args.block_size)
+    path = stats.save(args.out or config.data_path(STATISTICS_FILE))
+    print(
+        f"{resmat.shape[0]} x {resmat.shape[1]} in {time.time() - start:.1f}s: "
+        f"mean p-value {np.nanmean(stats.p_value):.3f}, median point-biserial {np.nanmedian(stats.point_biserial):.3f}, "
+        f"alpha {stats.alpha:.3f}, mean person score {np.nanmean(stats.person_score):.3f}; wrote {path}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""Tracker-driven curves and labels that don't rebuild themselves every frame.
+
+``always_redraw(lambda: axes.plot(...))`` re-samples the function, builds a
+new ``ParametricFunction`` and (for axis labels) a new ``MathTex`` on every
+frame of a ``ValueTracker`` animation. ``ParameterSweepCurve`` evaluates the
+whole family once over a parameter grid and linearly interpolates between
+neighbouring rows per frame; ``TrackedTexLabel`` keeps one mobject per
+formatted label string so each distinct value goes through LaTeX once.
+"""
+from __future__ import annotations
+
+import numpy as np
+from manim import *
+
+
+def axes_affine(axes):
+    """``(origin, x_unit, y_unit)`` so that ``c2p(x, y) == origin + x * x_unit + y * y_unit``."""
+    origin = np.array(axes.c2p(0, 0))
+    return origin, np.array(axes.c2p(1, 0)) - origin, np.array(axes.c2p(0, 1)) - origin
+
+
+class ParameterSweepCurve(VMobject):
+    """Graph of ``func(x, p)`` that follows ``tracker`` (the value of ``p``).
+
+    Args:
+        axes (Axes): Linear axes to draw in.
+        func (callable): Vectorized ``func(x, p)``; called once with an
+            (params x samples) grid, e.g. ``lambda theta, b: icc(theta, a=2.5, b=b)``.
+        tracker (ValueTracker): Drives ``p``.
+        param_range (tuple): ``(p_min, p_max)`` covered by the precomputed grid;
+            values outside it are evaluated directly (still one array call).
+        x_range (tuple): Plotted x interval, defaults to the axes' range.
+        x_min_tracker (ValueTracker): Optional moving lower x bound; the curve
+            is cut where x reaches its value (clamped to ``x_range``).
+        num_params (int): Grid resolution along ``p``.
+        num_samples (int): Points along the curve.
+    """
+
+    def __init__(self, axes, func, tracker, param_range, x_range=None, x_min_tracker=None, num_params=201, num_samples=161, **kwargs):
+        super().__init__(**kwargs)
+        self.func = func
+        self.tracker = tracker
+        self.x_min_tracker = x_min_tracker
+        self.origin, self.x_unit, self.y_unit = axes_affine(axes)
+
+        x_min, x_max = x_range if x_range is not None else axes.x_range[:2]
+        self.xs = np.linspace(x_min, x_max, num_samples)
+        self.params = np.linspace(param_range[0], param_range[1], num_params)
+        ys = np.broadcast_to(func(self.xs[None, :], self.params[:, None]), (num_params, num_samples))
+        self.point_grid = self.to_points(ys)
+
+        self.update_from_tracker()
+        self.add_updater(lambda m: m.update_from_tracker())
+
+    def to_points(self, ys):
+        """Scene points for samples ``ys`` taken at ``self.xs``."""
+        ys = np.asarray(ys, dtype=float)
+        return self.origin + self.xs[:, None] * self.x_unit + ys[..., None] * self.y_unit
+
+    def points_at(self, value: float) -> np.ndarray:
+        p_min, p_max = self.params[0], self.params[-1]
+        if not p_min <= value <= p_max or len(self.params) < 2:
+            return self.to_points(self.func(self.xs, value))
+        position = (value - p_min) / (p_max - p_min) * (len(self.params) - 1)
+        i = min(int(position), len(self.params) - 2)
+        t = position - i
+        return (1 - t) * self.point_grid[i] + t * self.point_grid[i + 1]
+
+    def clip_below(self, points: np.ndarray, x_min: float) -> np.ndarray:
+        """The part of ``points`` (sampled at ``self.xs``) at ``x >= x_min``, starting exactly at ``x_min``."""
+        i = int(np.searchsorted(self.xs, x_min, side="right"))
+        if i == 0:
+            return points
+        if i == len(self.xs):
+            return points[[-1, -1]]
+        t = (x_min - self.xs[i - 1]) / (self.xs[i] - self.xs[i - 1])
+        return np.vstack([(1 - t) * points[i - 1] + t * points[i], points[i:]])
+
+    def update_from_tracker(self):
+        points = self.points_at(self.tracker.get_value())
+        if self.x_min_tracker is not None:
+            points = self.clip_below(points, self.x_min_tracker.get_value())
+        self.set_points_as_corners(points)
+        return self
+
+
+class TrackedTexLabel(VGroup):
+    """Label showing ``template.format(tracker value)``, built once per distinct string.
+
+    Args:
+        tracker (ValueTracker): Value substituted into ``template``.
+        template (str): ``str.format`` template, e.g. ``r"P(\\theta, b={:.1f})"``.
+        factory (callable): Builds and positions the mobject for a TeX string,
+            e.g. ``lambda tex: axes.get_y_axis_label(tex, edge=UP, direction=LEFT, buff=0.3)``.
+    """
+
+    def __init__(self, tracker, template: str, factory=MathTex, **kwargs):
+        super().__init__(**kwargs)
+        self.tracker = tracker
+        self.template = template
+        self.factory = factory
+        self.cache = {}
+        self.current_text = None
+        self.update_label()
+        self.add_updater(lambda m: m.update_label())
+
+    def label_for(self, text: str):
+        label = self.cache.get(text)
+        if label is None:
+            label = self.cache[text] = self.factory(text)
+        return label
+
+    def prewarm(self, values):
+        """Build the labels for ``values`` ahead of the animation."""
+        for value in values:
+            self.label_for(self.template.format(value))
+        return self
+
+    def update_label(self):
+        text = self.template.format(self.tracker.get_value())
+        if text != self.current_text:
+            self.remove(*self.submobjects)
+            self.add(self.label_for(text))
+            self.current_text = text
+        return self
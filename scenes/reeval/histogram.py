@@ -0,0 +1,128 @@
+"""Fixed-bar density histogram for the per-iteration theta/z animations.
+
+``histogram_densities`` bins every iteration of a log in one vectorized
+pass, giving an (iterations x bins) array. ``HistogramBars`` builds its
+rectangles once; ``set_heights`` rewrites their points in place and
+``HistogramTransition`` interpolates between two density rows, so moving to
+the next iteration costs one row of floats instead of a fresh VGroup and a
+``ReplacementTransform``.
+"""
+from __future__ import annotations
+
+import numpy as np
+from manim import *
+
+HIST_BINS = np.arange(-4, 4.2, 0.2)
+MIN_BAR_HEIGHT = 0.01  # scene units; keeps empty bins visible as a sliver
+EMPTY_BAR_OPACITY = 0.1
+
+
+def histogram_densities(values, bins=HIST_BINS, y_max=None, headroom=0.9) -> np.ndarray:
+    """Density histogram of each row of ``values`` (same normalisation as ``np.histogram(density=True)``).
+
+    Args:
+        values (np.array): (iterations, samples) or a single 1D sample.
+        bins (np.array): Bin edges shared by every iteration.
+        y_max (float): If given, iterations whose peak exceeds it are scaled
+            down so the peak sits at ``headroom * y_max`` (fits the axes).
+        headroom (float): Fraction of ``y_max`` used by a rescaled peak.
+    """
+    values = np.asarray(values)
+    single = values.ndim == 1
+    values = np.atleast_2d(values)
+    bins = np.asarray(bins, dtype=float)
+    n_iterations, n_bins = values.shape[0], len(bins) - 1
+
+    # np.histogram semantics: half-open bins, except the last which includes its right edge
+    index = np.searchsorted(bins, values, side="right") - 1
+    index[values == bins[-1]] = n_bins - 1
+    in_range = (index >= 0) & (index < n_bins)
+    flat = (index + n_bins * np.arange(n_iterations)[:, None])[in_range]
+    counts = np.bincount(flat, minlength=n_iterations * n_bins).reshape(n_iterations, n_bins)
+
+    totals = counts.sum(axis=1, keepdims=True)
+    density = counts / np.maximum(totals, 1) / np.diff(bins)
+
+    if y_max is not None:
+        peak = density.max(axis=1, keepdims=True)
+        scale = np.where(peak > y_max, (y_max * headroom) / np.where(peak > 0, peak, 1), 1.0)
+        density = density * scale
+
+    return density[0] if single else density
+
+
+class HistogramBars(VGroup):
+    """One ``Rectangle`` per bin, resized in place by ``set_heights``.
+
+    The bars remember their unit-height outlines relative to the axes
+    baseline, so ``set_heights`` must be called before the group is moved or
+    scaled (shifting/scaling afterwards for a split/merge is fine).
+    """
+
+    def __init__(self, axes, density, color, opacity, bins=HIST_BINS, **kwargs):
+        super().__init__(**kwargs)
+        self.bar_color = color
+        self.bar_opacity = opacity
+
+        bins = np.asarray(bins, dtype=float)
+        origin = axes.c2p(0, 0)
+        self.baseline = origin[1]
+        self.unit_height = axes.c2p(0, 1)[1] - origin[1]
+
+        for left, right in zip(bins[:-1], bins[1:]):
+            width = axes.c2p(right, 0)[0] - axes.c2p(left, 0)[0]
+            rect = Rectangle(
+                height=1,
+                width=width,
+                fill_color=color,
+                fill_opacity=opacity,
+                stroke_width=1,
+                stroke_color=color,
+            )
+            rect.move_to(axes.c2p((left + right) / 2, 0), aligned_edge=DOWN)
+            self.add(rect)
+
+        # Outline of each bar at height 1, with y measured from the baseline
+        self.unit_points = np.stack([np.array(rect.points) for rect in self.submobjects])
+        self.unit_points[..., 1] -= self.baseline
+
+        self.density = np.zeros(len(self.submobjects))
+        self.is_empty = np.zeros(len(self.submobjects), dtype=bool)
+        self.set_heights(density)
+
+    def set_heights(self, density):
+        """Resize every bar to ``density`` (axes units) without rebuilding it."""
+        density = np.asarray(density, dtype=float)
+        heights = np.maximum(density * self.unit_height, MIN_BAR_HEIGHT)
+        points = self.unit_points.copy()
+        points[..., 1] = self.baseline + self.unit_points[..., 1] * heights[:, None]
+        for rect, bar_points in zip(self.submobjects, points):
+            rect.set_points(bar_points)
+
+        # Restyle only the bars that switched between empty and non-empty
+        empty = density <= 0
+        for i in np.flatnonzero(empty != self.is_empty):
+            if empty[i]:
+                self.submobjects[i].set_fill(self.bar_color, opacity=EMPTY_BAR_OPACITY).set_stroke(GRAY, width=0)
+            else:
+                self.submobjects[i].set_fill(self.bar_color, opacity=self.bar_opacity).set_stroke(self.bar_color, width=1)
+        self.density = density
+        self.is_empty = empty
+        return self
+
+
+class HistogramTransition(Animation):
+    """Morph ``HistogramBars`` from their current density to ``target``."""
+
+    def __init__(self, bars: HistogramBars, target, **kwargs):
+        self.target = np.asarray(target, dtype=float)
+        self.start = bars.density.copy()
+        super().__init__(bars, **kwargs)
+
+    def begin(self):
+        self.start = self.mobject.density.copy()
+        super().begin()
+
+    def interpolate_mobject(self, alpha: float) -> None:
+        t = self.rate_func(alpha)
+        self.mobject.set_heights(self.start + (self.target - self.start) * t)
@@ -0,0 +1,109 @@
+"""Deterministic filling of missing responses for visualisation.
+
+Calibration and the CTT statistics skip missing responses. The scenes draw
+complete grids, so they need a value for every shown cell. ``Imputer`` gives
+one from the fitted Rasch model:
+
+- ``"bernoulli"``: a draw with probability ``sigma(theta_i - z_j)``,
+- ``"mode"``: the more likely answer, 1 where ``theta_i >= z_j``.
+
+A draw compares the model probability with a uniform number hashed from
+``(row, col, seed)`` (splitmix64). Nothing is stored, each cell costs O(1),
+and a cell gets the same value whichever subset it is shown in. Scenes that
+share a seed therefore agree on every cell.
+
+::
+
+    z, theta = load_learning_logs()
+    imputer = Imputer(theta[-1], z[-1], seed=7)
+    block = imputer.take(resmat, slice(12), slice(8))   # resmat[:12, :8], no NaNs
+"""
+from __future__ import annotations
+
+import numpy as np
+
+from .irt import icc
+
+METHODS = ("bernoulli", "mode")
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _splitmix64(x) -> np.ndarray:
+    """Finaliser of the splitmix64 generator; uint64 arithmetic wraps."""
+    x = np.asarray(x, dtype=np.uint64) + _GOLDEN
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def cell_uniforms(rows, cols, seed: int = 0) -> np.ndarray:
+    """Uniform [0, 1) number of every cell ``(rows[k], cols[k])``, a pure function of (row, col, seed)."""
+    rows = np.asarray(rows, dtype=np.uint64)
+    cols = np.asarray(cols, dtype=np.uint64)
+    key = (rows << np.uint64(32)) | cols
+    with np.errstate(over="ignore"):
+        bits = _splitmix64(key ^ _splitmix64(np.uint64(seed % 2**64)))
+    # Top 53 bits, the float64 mantissa
+    return (bits >> np.uint64(11)).astype(np.float64) * 2.0**-53
+
+
+class Imputer:
+    """
+    Seeded model-based values for missing cells of the response matrix.
+
+    Args:
+        theta (np.array): Ability of every matrix row (e.g. the last theta log iteration).
+        z (np.array): Difficulty of every matrix column.
+        seed (int): Key of the per-cell draws.
+        method (str): ``"bernoulli"`` or ``"mode"``.
+    """
+
+    def __init__(self, theta, z, seed: int = 0, method: str = "bernoulli"):
+        if method not in METHODS:
+            raise ValueError(f"unknown method {method!r}, expected one of {METHODS}")
+        self.theta = np.asarray(theta, dtype=float)
+        self.z = np.asarray(z, dtype=float)
+        self.seed = seed
+        self.method = method
+
+    def probability(self, rows, cols) -> np.ndarray:
+        """Rasch probability of a correct answer in each cell ``(rows[k], cols[k])``."""
+        return icc(self.theta[rows], 1.0, self.z[cols])
+
+    def values(self, rows, cols) -> np.ndarray:
+        """Imputed 0/1 answer of each cell ``(rows[k], cols[k])``, elementwise."""
+        rows, cols = np.asarray(rows), np.asarray(cols)
+        if self.method == "mode":
+            return (self.theta[rows] >= self.z[cols]).astype(np.float32)
+        return (cell_uniforms(rows, cols, self.seed) < self.probability(rows, cols)).astype(np.float32)
+
+    def check_shape(self, shape) -> None:
+        """Raise if ``theta``/``z`` don't have one value per matrix row/column (logs of another calibration)."""
+        n_rows, n_cols = shape
+        if len(self.theta) != n_rows or len(self.z) != n_cols:
+            raise ValueError(
+                f"imputer has {len(self.theta)} abilities and {len(self.z)} difficulties, "
+                f"the response matrix is {n_rows} x {n_cols}; were the logs calibrated on this matrix?"
+            )
+
+    def fill(self, block, rows, cols, shape=None) -> np.ndarray:
+        """Copy of ``block`` (rows x cols of the matrix, NaN = missing) with the NaNs imputed.
+
+        Args:
+            rows, cols (np.array): Matrix row and column of every block row and column.
+            shape (tuple): Shape of the whole matrix, checked against ``theta``/``z`` if given.
+        """
+        rows, cols = np.asarray(rows), np.asarray(cols)
+        if shape is not None:
+            self.check_shape(shape)
+        elif (rows.size and rows.max() >= len(self.theta)) or (cols.size and cols.max() >= len(self.z)):
+            raise ValueError(f"block reaches past the {len(self.theta)} x {len(self.z)} matrix the imputer was built for")
+        block = np.array(block, dtype=np.float32)
+        missing_rows, missing_cols = np.nonzero(np.isnan(block))
+        block[missing_rows, missing_cols] = self.values(rows[missing_rows], cols[missing_cols])
+        return block
+
+    def take(self, resmat, rows=slice(None), cols=slice(None)) -> np.ndarray:
+        """``resmat[rows, cols]`` with every missing cell imputed."""
+        n_rows, n_cols = resmat.shape
+        return self.fill(resmat[rows, cols], np.arange(n_rows)[rows], np.arange(n_cols)[cols], resmat.shape)
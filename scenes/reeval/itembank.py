@@ -0,0 +1,214 @@
+"""Sorted-difficulty index for maximum-information item selection.
+
+Under the Rasch model ``p (1 - p)`` falls with ``|theta - b|``, so the
+``argmax`` over the remaining bank in ``12_mfi_algorithm.py`` is a
+nearest-neighbour query on the difficulties. ``DifficultyIndex`` keeps the
+bank sorted by ``b`` once and, per session, a deletion bitmap over the sorted
+positions plus a Fenwick tree of the same bits (counts of remaining items).
+A query is then
+
+1. ``searchsorted`` for theta in the sorted difficulties,
+2. the number of remaining items left of it (a Fenwick prefix sum),
+3. the last remaining item before and the first one after (Fenwick
+   order-statistic descents), whichever is closer wins,
+
+each O(log n) and vectorized over all sessions of a block. Removing (or
+restoring) an item flips its bit and walks the tree up, O(log n).
+
+With varying discrimination (2PL) or guessing (3PL) the most informative item
+need not be the nearest one. The bank is then split into ``NUM_STRATA``
+discrimination strata, each sorted by ``b`` (one tree still covers them all,
+a stratum being a contiguous range of positions). Within a stratum the
+candidates are taken outwards in order of ``|theta - b|``, a window of
+remaining items on each side at a time, until the best information found is
+at least ``information_bound`` of the nearest item not yet looked at: the
+most any item of the stratum could have that far out. Strata go from the most
+to the least discriminating and are skipped once they cannot beat the best
+item so far, so the search stays a few windows wide.
+
+Content groups (``groups``) are laid out the same way, each group its own
+set of ranges, so closing a group for a session (a content quota reached) is
+a flag that makes ``select`` skip its ranges rather than thousands of removals.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+from .irt import expit
+
+NUM_STRATA = 16  # discrimination strata for the 2PL/3PL search
+# x^2 sigma(x) sigma(-x), the information at distance d times d^2, peaks at x = PEAK_X
+PEAK_X = 2.399357280515
+
+
+def information_bound(distance, a_low, a_high, c_low=0.0) -> np.ndarray:
+    """Largest information of any item with ``a_low <= a <= a_high``, ``c >= c_low`` at ``|theta - b| = distance``.
+
+    ``a^2 s (1 - s)`` with ``s = sigma(a d)`` is largest at ``a = PEAK_X / d``,
+    so the sup is at that ``a`` clipped to the range; guessing scales the
+    information by at most ``1 - c``.
+    """
+    distance = np.asarray(distance, dtype=float)
+    with np.errstate(divide="ignore"):
+        a = np.clip(PEAK_X / distance, a_low, a_high)
+    s = expit(a * distance)
+    return (1 - c_low) * a * a * s * (1 - s)
+
+
+class DifficultyIndex:
+    """
+    Per-session remaining-item sets over one difficulty-sorted bank.
+
+    Args:
+        b, a, c (float or np.array): Bank parameters.
+        available (np.array): (sessions, items) bool, items each session may
+            still take, default one session with the whole bank; the index
+            keeps its own copy in sorted order.
+        num_strata (int): Discrimination strata when ``a`` varies or ``c > 0``.
+        groups (np.array): Content group of every item (see ``close_group``);
+            each group gets its own strata.
+    """
+
+    def __init__(self, b, a=1.0, c=0.0, available=None, num_strata: int = NUM_STRATA, groups=None):
+        b = np.asarray(b, dtype=float)
+        n = len(b)
+        a = np.broadcast_to(np.asarray(a, dtype=float), (n,))
+        c = np.broadcast_to(np.asarray(c, dtype=float), (n,))
+        groups = np.zeros(n, dtype=np.int64) if groups is None else np.asarray(groups, dtype=np.int64)
+        available = np.ones((1, n), dtype=bool) if available is None else np.asarray(available, dtype=bool)
+        if n == 0 or (np.ptp(a) == 0 and not np.any(c)):
+            # Information is a function of the distance alone: one stratum, nearest item wins
+            stratum = np.zeros(n, dtype=np.int64)
+        else:
+            edges = np.quantile(a, np.linspace(0, 1, num_strata + 1)[1:-1])
+            stratum = np.searchsorted(edges, a, side="right")
+        self.order = np.lexsort((b, stratum, groups))
+        self.rank = np.empty(n, dtype=np.int64)
+        self.rank[self.order] = np.arange(n)
+        self.sorted_b, self.sorted_a, self.sorted_c = b[self.order], a[self.order], c[self.order]
+        # Non-empty (group, stratum) ranges as (start, stop, group, a_low, a_high, c_low), most discriminating first
+        key = (groups * (stratum.max(initial=0) + 1) + stratum)[self.order]
+        starts = np.flatnonzero(np.diff(key, prepend=-1, append=key[-1] + 1 if n else 0))
+        self.strata = sorted(
+            [
+                (start, stop, int(groups[self.order[start]]), self.sorted_a[start:stop].min(), self.sorted_a[start:stop].max(), self.sorted_c[start:stop].min())
+                for start, stop in zip(starts[:-1], starts[1:])
+            ],
+            key=lambda entry: -entry[4],
+        )
+        self.closed = np.zeros((available.shape[0], groups.max(initial=0) + 1), dtype=bool)
+
+        self.n = n
+        # Item-major (positions x sessions): building and walking the tree touch whole contiguous rows
+        self.bits = np.ascontiguousarray(np.take(available, self.order, axis=1).T)
+        self.remaining = available.sum(axis=1)
+        # tree[i] (1-based) counts the bits at sorted positions (i - lowbit(i), i]; built bottom-up a level at a time
+        self.tree = np.zeros((n + 1, available.shape[0]), dtype=np.int32)
+        self.tree[1:] = self.bits
+        step = 1
+        while step <= n // 2:
+            parents = self.tree[2 * step::2 * step]
+            parents += self.tree[step::2 * step][:len(parents)]
+            step *= 2
+        self.top = 1 << max(n.bit_length() - 1, 0)
+
+    def prefix_count(self, rows, pos) -> np.ndarray:
+        """Remaining items at sorted positions ``[0, pos)`` of each row."""
+        i = np.array(np.broadcast_to(pos, np.shape(rows)), dtype=np.int64)
+        total = np.zeros(i.shape, dtype=np.int64)
+        while np.any(i > 0):
+            total += self.tree[i, rows]  # row 0 is all zeros
+            i -= i & -i
+        return total
+
+    def find(self, rows, k) -> np.ndarray:
+        """Sorted position of each row's ``k``-th remaining item (1-based); ``k`` must be in range."""
+        k = np.array(k, dtype=np.int64)
+        pos = np.zeros(np.broadcast(rows, k).shape, dtype=np.int64)
+        step = self.top
+        while step:
+            nxt = pos + step
+            count = self.tree[np.minimum(nxt, self.n), rows]
+            take = (nxt <= self.n) & (count < k)
+            pos = np.where(take, nxt, pos)
+            k = np.where(take, k - count, k)
+            step >>= 1
+        return pos
+
+    def remove(self, rows, items) -> None:
+        """Take bank ``items`` out of their sessions' remaining sets."""
+        self._toggle(rows, items, False)
+
+    def restore(self, rows, items) -> None:
+        """Put removed ``items`` back (e.g. candidates a strategy looked at but did not give)."""
+        self._toggle(rows, items, True)
+
+    def _toggle(self, rows, items, value: bool) -> None:
+        cells = np.unique(np.asarray(rows, dtype=np.int64) * self.n + self.rank[np.asarray(items)])
+        rows, pos = np.divmod(cells, self.n)
+        change = self.bits[pos, rows] != value
+        rows, pos = rows[change], pos[change]
+        self.bits[pos, rows] = value
+        delta = 1 if value else -1
+        # ``add.at``: a row may change several items in one call
+        np.add.at(self.remaining, rows, delta)
+        i = pos + 1
+        while len(i):
+            np.add.at(self.tree, (i, rows), delta)
+            i = i + (i & -i)
+            inside = i <= self.n
+            rows, i = rows[inside], i[inside]
+
+    def close_group(self, rows, group: int) -> None:
+        """Exclude every item of content ``group`` for ``rows`` (O(1): its ranges are skipped)."""
+        self.closed[rows, group] = True
+
+    def select(self, rows, theta) -> np.ndarray:
+        """Most informative remaining bank item for each row at ``theta``, -1 where none is left."""
+        rows = np.asarray(rows)
+        theta = np.asarray(theta, dtype=float)
+        best = np.full(len(rows), -1)
+        best_info = np.full(len(rows), -np.inf)
+        for stratum in self.strata:
+            # Rows the stratum could still improve on (its best possible item sits at distance 0)
+            pending = np.flatnonzero((best_info < information_bound(0.0, *stratum[3:])) & ~self.closed[rows, stratum[2]])
+            if len(pending):
+                self._search(stratum, rows, theta, best, best_info, pending)
+        return np.where(best >= 0, self.order[np.maximum(best, 0)], -1)
+
+    def _search(self, stratum, rows, theta, best, best_info, pending) -> None:
+        """Widening windows around theta within one stratum; updates ``best``/``best_info`` in place."""
+        start, stop, _, a_low, a_high, c_low = stratum
+        r, t = rows[pending], theta[pending]
+        base = self.prefix_count(r, start)
+        count = self.prefix_count(r, stop) - base
+        before = self.prefix_count(r, start + np.searchsorted(self.sorted_b[start:stop], t)) - base
+        width = 1
+        while len(pending):
+            ks = before[:, None] + np.arange(1 - width, width + 1)
+            candidates = self._position(r[:, None], ks, base[:, None], count[:, None])
+            safe = np.maximum(candidates, 0)
+            a, c = self.sorted_a[safe], self.sorted_c[safe]
+            s = expit(a * (t[:, None] - self.sorted_b[safe]))
+            p = c + (1 - c) * s
+            info = np.where(candidates >= 0, a * a * s * s * (1 - p) / np.maximum(p, 1e-300), -np.inf)
+            pick = info.argmax(axis=1)
+            found = info[np.arange(len(pending)), pick]
+            better = found > best_info[pending]
+            best[pending[better]] = candidates[np.arange(len(pending)), pick][better]
+            best_info[pending[better]] = found[better]
+            # Nearest items not looked at yet, one per side
+            outside = np.stack([
+                self._position(r, before - width, base, count),
+                self._position(r, before + width + 1, base, count),
+            ], axis=1)
+            gap = np.where(outside >= 0, np.abs(t[:, None] - self.sorted_b[np.maximum(outside, 0)]), np.inf).min(axis=1)
+            # Stop once nothing further out can beat the best so far, or nothing is left outside
+            more = (best_info[pending] < information_bound(gap, a_low, a_high, c_low)) & ~np.isinf(gap)
+            pending, r, t, base, count, before = (x[more] for x in (pending, r, t, base, count, before))
+            width *= 2
+
+    def _position(self, rows, k, base, count) -> np.ndarray:
+        """Sorted position of the ``k``-th remaining item after ``base`` where ``1 <= k <= count``, -1 elsewhere."""
+        valid = (k >= 1) & (k <= count)
+        return np.where(valid, self.find(rows, base + np.clip(k, 1, np.maximum(count, 1))), -1)
@@ -0,0 +1,171 @@
+"""Columnar float32 cache for the ``rasch_global_*.jsonl`` calibration logs.
+
+Each log line is one iteration, ``{"parameters": {"<param>": [...]}, ...}``.
+Item parameters are sharded over files named
+``<prefix>_<param>_batch_<start>_<stop>.jsonl``; shards are discovered,
+ordered by ``start`` and merged automatically. An unsharded parameter lives
+in ``<prefix>_<param>.jsonl``.
+
+``ParameterLogWriter`` produces the same files from an in-repo calibration
+(see ``reeval.calibrate``).
+
+The first load streams the JSONL once into ``<data_dir>/.cache/<prefix>_<param>.f32``
+(iterations x values, float32) with a small JSON sidecar. Later loads
+memory-map that file, so ``load_parameter_log("z")[-1]`` only reads the final
+iteration. The cache is rebuilt whenever a source file changes size or mtime.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+from pathlib import Path
+
+import numpy as np
+
+from . import config
+
+LOG_PREFIX = "rasch_global"
+CACHE_DIR = ".cache"
+
+
+def find_log_files(param: str, prefix: str = LOG_PREFIX, data_dir=None) -> list[Path]:
+    """Return the JSONL files holding ``param``, shards in item order."""
+    root = Path(data_dir) if data_dir is not None else config.data_dir()
+    pattern = re.compile(rf"{re.escape(prefix)}_{re.escape(param)}_batch_(\d+)_(\d+)\.jsonl")
+    shards = []
+    for path in root.glob(f"{prefix}_{param}_batch_*_*.jsonl"):
+        match = pattern.fullmatch(path.name)
+        if match:
+            shards.append((int(match.group(1)), int(match.group(2)), path))
+    if shards:
+        shards.sort()
+        for (_, prev_stop, prev), (start, _, path) in zip(shards, shards[1:]):
+            if start != prev_stop:
+                raise ValueError(f"{path.name} does not continue {prev.name} (gap or overlap at item {start})")
+        return [path for _, _, path in shards]
+
+    single = root / f"{prefix}_{param}.jsonl"
+    if single.exists():
+        return [single]
+    raise FileNotFoundError(f"no {prefix}_{param}*.jsonl log in {root}")
+
+
+def log_file_path(param: str, prefix: str = LOG_PREFIX, data_dir=None, shard: tuple[int, int] | None = None) -> Path:
+    """Where ``param`` is written: ``<prefix>_<param>.jsonl`` or the ``_batch_<start>_<stop>`` shard."""
+    root = Path(data_dir) if data_dir is not None else config.data_dir()
+    suffix = f"_batch_{shard[0]}_{shard[1]}" if shard is not None else ""
+    return root / f"{prefix}_{param}{suffix}.jsonl"
+
+
+def clear_parameter_logs(param: str, prefix: str = LOG_PREFIX, data_dir=None) -> None:
+    """Remove every existing log (sharded or not) for ``param`` so a new run can't mix with an old one."""
+    root = Path(data_dir) if data_dir is not None else config.data_dir()
+    for path in [*root.glob(f"{prefix}_{param}_batch_*_*.jsonl"), root / f"{prefix}_{param}.jsonl"]:
+        if path.exists():
+            path.unlink()
+
+
+class ParameterLogWriter:
+    """Append one ``{"parameters": {param: [...]}, ...}`` line per iteration.
+
+    Extra keyword arguments to ``append`` (iteration number, log-likelihood)
+    are stored next to ``parameters`` and ignored by the loader.
+    """
+
+    def __init__(self, param: str, prefix: str = LOG_PREFIX, data_dir=None, shard: tuple[int, int] | None = None):
+        self.param = param
+        self.path = log_file_path(param, prefix, data_dir, shard)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(self.path, "w")
+
+    def append(self, values, **extra) -> None:
+        row = {"parameters": {self.param: np.round(np.asarray(values, dtype=float), 6).tolist()}, **extra}
+        self.file.write(json.dumps(row) + "\n")
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_log_rows(path: Path, param: str):
+    """Yield one float32 array per iteration from a single JSONL file."""
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield np.asarray(json.loads(line)["parameters"][param], dtype=np.float32)
+
+
+def _signature(paths: list[Path]) -> list[dict]:
+    return [{"name": p.name, "size": p.stat().st_size, "mtime_ns": p.stat().st_mtime_ns} for p in paths]
+
+
+def _cache_paths(root: Path, prefix: str, param: str) -> tuple[Path, Path]:
+    cache = root / CACHE_DIR
+    return cache / f"{prefix}_{param}.f32", cache / f"{prefix}_{param}.json"
+
+
+def build_cache(param: str, paths: list[Path], values_path: Path, meta_path: Path) -> dict:
+    """Stream ``paths`` into ``values_path`` one merged iteration at a time.
+
+    Shards are read in lockstep; like the old ``load_data`` only iterations
+    present in every shard are kept.
+    """
+    values_path.parent.mkdir(parents=True, exist_ok=True)
+    # Per-process names: parallel renders may build the same cache at once. The
+    # values go into place before the sidecar, so a reader never sees a sidecar
+    # describing a file that isn't there yet.
+    tmp_path = values_path.with_suffix(f".{os.getpid()}.tmp")
+    n_iterations, n_values = 0, None
+    with open(tmp_path, "wb") as out:
+        for shard_rows in zip(*(iter_log_rows(p, param) for p in paths)):
+            row = np.concatenate(shard_rows) if len(shard_rows) > 1 else shard_rows[0]
+            if n_values is None:
+                n_values = row.size
+            elif row.size != n_values:
+                raise ValueError(f"iteration {n_iterations} of {param} has {row.size} values, expected {n_values}")
+            out.write(row.tobytes())
+            n_iterations += 1
+    os.replace(tmp_path, values_path)
+
+    meta = {"shape": [n_iterations, n_values or 0], "sources": _signature(paths)}
+    tmp_meta = meta_path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_meta.write_text(json.dumps(meta))
+    os.replace(tmp_meta, meta_path)
+    return meta
+
+
+def load_parameter_log(param: str, prefix: str = LOG_PREFIX, data_dir=None) -> np.ndarray:
+    """Return the ``(iterations, values)`` float32 log for ``param`` as a memmap.
+
+    Index it for the iterations you need (``log[-1]``, ``log[::2]``); nothing
+    else is read from disk.
+    """
+    root = Path(data_dir) if data_dir is not None else config.data_dir()
+    paths = find_log_files(param, prefix, root)
+    values_path, meta_path = _cache_paths(root, prefix, param)
+
+    meta = None
+    if meta_path.exists() and values_path.exists():
+        meta = json.loads(meta_path.read_text())
+        if meta.get("sources") != _signature(paths):
+            meta = None
+    if meta is None:
+        meta = build_cache(param, paths, values_path, meta_path)
+
+    shape = tuple(meta["shape"])
+    if shape[0] == 0:
+        return np.empty(shape, dtype=np.float32)
+    return np.memmap(values_path, dtype=np.float32, mode="r", shape=shape)
+
+
+def load_learning_logs(data_dir=None) -> tuple[np.ndarray, np.ndarray]:
+    """``(z, theta)`` logs as used by the learning-visualisation scenes."""
+    return load_parameter_log("z", data_dir=data_dir), load_parameter_log("theta", data_dir=data_dir)
@@ -0,0 +1,84 @@
+"""Vectorized Monte Carlo estimate of pi and a point cloud that reveals it.
+
+``sample_quarter_circle`` draws all samples in one generator call and returns
+the running estimate after every sample, so a readout is a lookup instead of a
+pair of trackers. ``RevealPointCloud`` is a single ``PMobject`` holding every
+sample with its color; the Cairo camera draws a point cloud with one array
+write, and ``set_reveal`` only changes how much of the (pre-built) arrays is
+exposed, so the per-frame cost doesn't grow with the number of mobjects.
+"""
+from __future__ import annotations
+
+from typing import NamedTuple
+
+import numpy as np
+from manim import *
+
+
+class MonteCarloSamples(NamedTuple):
+    points: np.ndarray  # (n, 2)
+    inside: np.ndarray  # (n,) bool
+    pi_estimates: np.ndarray  # (n,) estimate after the first k + 1 samples
+
+
+def sample_quarter_circle(n: int, radius: float = 1.0, seed=None) -> MonteCarloSamples:
+    """Uniform samples in ``[0, radius]^2`` with the inside-quarter-circle test and running pi estimate."""
+    rng = np.random.default_rng(seed)
+    points = rng.uniform(0.0, radius, size=(n, 2))
+    inside = np.einsum("ij,ij->i", points, points) <= radius * radius
+    pi_estimates = 4.0 * np.cumsum(inside) / np.arange(1, n + 1)
+    return MonteCarloSamples(points, inside, pi_estimates)
+
+
+class RevealPointCloud(PMobject):
+    """Point cloud of ``points`` with per-point colors, showing only the first ``reveal`` of them.
+
+    Args:
+        points (np.array): (n, 2) or (n, 3) scene coordinates.
+        colors (np.array): (n, 4) RGBA in [0, 1], or a single color for all.
+        reveal (int): Number of points initially visible.
+        stroke_width (float): Point size in pixels.
+    """
+
+    def __init__(self, points, colors=WHITE, reveal: int = 0, stroke_width: float = 2, **kwargs):
+        super().__init__(stroke_width=stroke_width, **kwargs)
+        points = np.asarray(points, dtype=float)
+        if points.shape[1] == 2:
+            points = np.column_stack([points, np.zeros(len(points))])
+        if isinstance(colors, np.ndarray) and colors.ndim == 2:
+            rgbas = np.asarray(colors, dtype=float)
+        else:
+            rgbas = np.tile(color_to_rgba(colors), (len(points), 1))
+        self.all_points = points
+        self.all_rgbas = rgbas
+        self.set_reveal(reveal)
+
+    @classmethod
+    def from_labels(cls, points, labels, palette, **kwargs):
+        """Cloud colored by integer (or bool) ``labels`` indexing into ``palette``."""
+        rgbas = np.array([color_to_rgba(c) for c in palette])[np.asarray(labels, dtype=int)]
+        return cls(points, rgbas, **kwargs)
+
+    def set_reveal(self, count) -> "RevealPointCloud":
+        count = int(np.clip(count, 0, len(self.all_points)))
+        # Views, not copies: revealing more points costs nothing until the camera draws them
+        self.points = self.all_points[:count]
+        self.rgbas = self.all_rgbas[:count]
+        self.reveal = count
+        return self
+
+    # Transforms act on every point, hidden ones included, so a later reveal lands in the right place
+    def shift(self, *vectors):
+        self.points = self.all_points
+        super().shift(*vectors)
+        return self.set_reveal(self.reveal)
+
+    def apply_points_function_about_point(self, func, about_point=None, about_edge=None):
+        self.points = self.all_points
+        super().apply_points_function_about_point(func, about_point, about_edge)
+        self.all_points = self.points
+        return self.set_reveal(self.reveal)
+
+    def follow(self, tracker) -> "RevealPointCloud":
+        """Keep the reveal count equal to ``tracker``'s value."""
+        return self.add_updater(lambda m: m.set_reveal(tracker.get_value()), call_updater=True)
@@ -0,0 +1,156 @@
+"""Numeric labels laid out from one compiled glyph atlas.
+
+``MathTex(f"\\theta = {v:.2f}")`` compiles the formula and parses a new SVG
+for every label. ``DecimalNumber.set_value`` builds a whole new
+``DecimalNumber`` on every frame it is updated. ``GlyphAtlas`` runs a single
+``MathTex(prefix, "-0123456789.00")`` compile instead and measures where TeX
+put each glyph: the prefix, each character's ink relative to its cell, and the
+cell advances. The prefix and the digits come from one formula, so they share
+TeX's baseline and the spacing after ``=``.
+
+Laying out a number is then a cumulative sum of advances. Its glyph outlines
+are concatenated into one VMobject, so a label is the prefix copy plus one
+mobject, and no TeX or SVG work is done per label. ``NumberLabelFactory.labels``
+builds any number of labels this way. ``NumberReadout`` replaces an updated
+``DecimalNumber``: ``set_value`` rewrites the points of its one mobject.
+
+Computer Modern digits have equal advances and no kerns, so digit strings
+match what TeX would set. A leading minus sits where the atlas put it (the
+unary minus after the prefix).
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+
+import numpy as np
+from manim import *
+
+ATLAS_CHARS = "-0123456789.00"  # the trailing "00" gives the digit advance
+CHARS = "0123456789.-"
+
+
+class GlyphAtlas:
+    """Outlines and metrics of the number characters, compiled once.
+
+    Points are stored relative to the character's cell origin on the
+    baseline, with the number's first cell origin at (0, 0) and the prefix
+    placed accordingly.
+
+    Args:
+        prefix (str): Static TeX in front of the number (e.g. ``r"\\theta ="``), or None.
+        font_size (float): Size the atlas is compiled at.
+    """
+
+    def __init__(self, prefix: str | None = None, font_size: float = DEFAULT_FONT_SIZE):
+        tex = MathTex(*([prefix] if prefix else []), ATLAS_CHARS, font_size=font_size)
+        glyphs = list(tex[-1])
+        if len(glyphs) != len(ATLAS_CHARS):
+            raise ValueError(f"expected {len(ATLAS_CHARS)} glyphs in the atlas, TeX produced {len(glyphs)}")
+        lefts = np.array([glyph.get_left()[0] for glyph in glyphs])
+        baseline = glyphs[ATLAS_CHARS.index("1")].get_bottom()[1]  # the flat foot of "1" sits on the baseline
+        zero = lefts[1]
+        digit_advance = lefts[-1] - lefts[-2]
+        # Cell origins in atlas coordinates: "0" starts its cell, the minus is only ever first
+        origins = {"-": lefts[0], ".": zero + 10 * digit_advance}
+        advances = {"-": zero - lefts[0], ".": lefts[-2] - origins["."]}
+        for d in range(10):
+            origins[str(d)] = zero + d * digit_advance
+            advances[str(d)] = digit_advance
+        start = np.array([lefts[0], baseline, 0.0])
+
+        self.advance = np.array([advances[char] for char in CHARS])
+        self.points = [glyphs[ATLAS_CHARS.index(char)].points - [origins[char], baseline, 0.0] for char in CHARS]
+        self.codes = {char: i for i, char in enumerate(CHARS)}
+        self.template = glyphs[1].copy()
+        self.prefix = tex[0].copy().shift(-start) if prefix else None
+
+    def layout(self, text: str) -> np.ndarray:
+        """Points of ``text`` set from the origin, all glyphs in one array."""
+        codes = np.array([self.codes[char] for char in text])
+        starts = np.concatenate([[0.0], np.cumsum(self.advance[codes])[:-1]])
+        return np.concatenate([self.points[code] + [x, 0.0, 0.0] for code, x in zip(codes, starts)])
+
+
+@lru_cache(maxsize=None)
+def glyph_atlas(prefix: str | None = None, font_size: float = DEFAULT_FONT_SIZE) -> GlyphAtlas:
+    """Shared atlas per (prefix, font size), so every factory in a render compiles it once."""
+    return GlyphAtlas(prefix, font_size)
+
+
+class NumberLabelFactory:
+    """Labels ``prefix <value>`` with the value formatted to ``num_decimal_places``.
+
+    Args:
+        prefix (str): Static TeX in front of the number, or None for bare numbers.
+        num_decimal_places (int): Digits after the point.
+        font_size (float): As for ``MathTex``.
+        color: Fill color of prefix and digits.
+    """
+
+    def __init__(self, prefix: str | None = None, num_decimal_places: int = 2, font_size: float = DEFAULT_FONT_SIZE, color=WHITE):
+        self.atlas = glyph_atlas(prefix, font_size)
+        self.num_decimal_places = num_decimal_places
+        self.color = color
+
+    def format(self, value) -> str:
+        text = f"{value:.{self.num_decimal_places}f}"
+        # "-0.00" reads as a glitch in a readout
+        return text[1:] if text.startswith("-") and not text.strip("-0.") else text
+
+    def number(self, value):
+        """The digits of ``value`` as one mobject, first cell origin at the scene origin."""
+        number = self.atlas.template.copy()
+        number.set_points(self.atlas.layout(self.format(value)))
+        return number.set_color(self.color)
+
+    def prefix(self):
+        return self.atlas.prefix.copy().set_color(self.color) if self.atlas.prefix is not None else None
+
+    def label(self, value) -> VGroup:
+        """Prefix and number in TeX's relative placement."""
+        return VGroup(*[part for part in (self.prefix(), self.number(value)) if part is not None])
+
+    def labels(self, values) -> VGroup:
+        """One label per value, all at the origin for the caller to place."""
+        return VGroup(*[self.label(value) for value in np.ravel(values)])
+
+
+class NumberReadout(VGroup):
+    """A ``DecimalNumber`` replacement whose ``set_value`` only rewrites points.
+
+    Moving the readout is fine; scaling it after creation is not (new values
+    are laid out at the factory's font size).
+
+    Args:
+        factory (NumberLabelFactory): Format, size, color and optional prefix.
+        value (float): Initial value.
+    """
+
+    def __init__(self, factory: NumberLabelFactory, value: float = 0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.factory = factory
+        self.value = value
+        self.text = factory.format(value)
+        self.layout = factory.atlas.layout(self.text)
+        self.digits = factory.number(value)
+        prefix = factory.prefix()
+        self.add(*([prefix] if prefix is not None else []), self.digits)
+
+    def get_value(self) -> float:
+        return self.value
+
+    def set_value(self, value: float):
+        self.value = value
+        text = self.factory.format(value)
+        if text != self.text:
+            # Where the readout has been moved to since it was laid out
+            offset = self.digits.points[0] - self.layout[0]
+            self.layout = self.factory.atlas.layout(text)
+            self.digits.set_points(self.layout + offset)
+            self.text = text
+        return self
+
+    def track(self, tracker):
+        """Follow a ``ValueTracker`` every frame."""
+        self.add_updater(lambda m: m.set_value(tracker.get_value()))
+        return self
@@ -0,0 +1,310 @@
+"""Vectorized falling-circle physics and a single mobject that draws every particle.
+
+One ``apply_physics`` updater per circle recomputes bounding boxes with
+``get_bottom``/``get_left``/``get_right``/``move_to`` for every circle on
+every frame. ``ParticleSystem`` instead keeps positions, velocities,
+restitution and radii as arrays and advances all particles with a few array
+operations per step:
+
+- gravity and explicit Euler integration,
+- floor bounces (restitution, a random sideways kick, rolling friction),
+  resting once the vertical speed has died out on the floor,
+- side walls,
+- optionally circle-circle collisions. Candidate pairs come from a spatial
+  hash: particles are sorted by grid cell (cell size = largest diameter) and
+  each one is paired with the particles of its own cell and four neighbour
+  cells. Overlapping pairs are pushed apart and exchange an impulse along the
+  normal, in a few averaged (Jacobi) sweeps per step. That holds up a few
+  layers of circles; taller piles settle somewhat compressed. With
+  collisions a step is split so nothing moves more than half a radius.
+
+``ParticleCloud`` draws every particle as a copy of one template outline
+(e.g. the ``Circle`` the scene built) in a single VMobject. A frame rewrites
+its points with one broadcast add.
+
+Stepping with the renderer's ``dt`` (``start``) makes the motion depend on
+the frame rate. ``bake`` removes that dependence. It simulates a copy of the
+system once at the fixed ``BAKE_STEP`` and keeps ``BAKE_SAMPLES_PER_SECOND``
+float32 position samples as a ``Trajectory``. The result is cached under
+``<media_dir>/baked`` and keyed by a hash of the initial state, the seed, the
+physics constants and the bake settings. ``ParticleCloud.replay`` then looks
+positions up by elapsed time. A 15 fps preview and a 60 fps render show the
+same motion, and a chunk that starts mid-scene (``reeval.chunked``) lands on
+the same frame as a serial render.
+"""
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+from manim import *
+
+from . import config
+
+GRAVITY = 5.2
+FLOOR_FRICTION = 0.985  # horizontal speed kept per step on the floor
+BOUNCE_KICK = 0.5  # sideways speed added on a floor bounce, uniform in [-kick, kick]
+KICK_SPEED = 0.5  # impact speed above which a bounce gets the kick
+REST_SPEED = 0.02  # vertical speed below which a particle on the floor stops bouncing
+COLLISION_ITERATIONS = 8  # contact relaxation sweeps per step
+MAX_TRAVEL = 0.5  # with collisions, largest move per substep in radii
+MAX_SUBSTEPS = 16
+NEIGHBOUR_CELLS = ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1))  # own cell + half the neighbours: every pair once
+BAKE_STEP = 1 / 240  # fixed integration step of baked trajectories
+BAKE_SAMPLES_PER_SECOND = 60  # stored samples; replay interpolates linearly between them
+BAKE_VERSION = 1  # bump when the stepping logic changes so old bakes are not reused
+
+
+class ParticleSystem:
+    """
+    Circles under gravity in a box open at the top.
+
+    Args:
+        positions (np.array): (n, 2) or (n, 3) centers.
+        velocities (np.array): Same shape, zeros by default.
+        restitution (float or np.array): Bounce factor per particle.
+        radius (float or np.array): Per-particle radius.
+        bounds (tuple): ``(left, right, floor)`` wall and floor coordinates.
+        gravity (float): Downward acceleration.
+        collisions (bool): Resolve circle-circle contacts.
+        seed (int): Seed of the bounce kicks (needed for ``bake`` to cache).
+    """
+
+    def __init__(self, positions, velocities=None, restitution=0.65, radius=0.18, bounds=(-7.0, 7.0, -4.0), gravity: float = GRAVITY, collisions: bool = False, seed=None):
+        positions = np.asarray(positions, dtype=float)
+        if positions.shape[1] == 2:
+            positions = np.column_stack([positions, np.zeros(len(positions))])
+        n = len(positions)
+        self.positions = positions.copy()
+        self.velocities = np.zeros_like(self.positions) if velocities is None else np.array(velocities, dtype=float).reshape(n, -1)
+        if self.velocities.shape[1] == 2:
+            self.velocities = np.column_stack([self.velocities, np.zeros(n)])
+        self.restitution = np.broadcast_to(np.asarray(restitution, dtype=float), (n,)).copy()
+        self.radius = np.broadcast_to(np.asarray(radius, dtype=float), (n,)).copy()
+        self.left, self.right, self.floor = bounds
+        self.gravity = gravity
+        self.collisions = collisions
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def key(self, **settings) -> str:
+        """Hash of the current state, seed, physics constants and ``settings``."""
+        digest = hashlib.sha256()
+        for array in (self.positions, self.velocities, self.restitution, self.radius):
+            digest.update(np.ascontiguousarray(array, dtype=np.float64).tobytes())
+        params = {
+            "seed": self.seed,
+            "bounds": [self.left, self.right, self.floor],
+            "gravity": self.gravity,
+            "collisions": self.collisions,
+            "constants": [FLOOR_FRICTION, BOUNCE_KICK, KICK_SPEED, REST_SPEED, COLLISION_ITERATIONS, MAX_TRAVEL, MAX_SUBSTEPS],
+            "version": BAKE_VERSION,
+            **settings,
+        }
+        digest.update(json.dumps(params, sort_keys=True).encode())
+        return digest.hexdigest()[:32]
+
+    def step(self, dt: float) -> None:
+        """Advance by ``dt``; with collisions in substeps short enough that nothing tunnels through a neighbour."""
+        substeps = 1
+        if self.collisions and len(self):
+            travel = (np.abs(self.velocities).max() + self.gravity * dt) * dt
+            substeps = int(np.clip(np.ceil(travel / (MAX_TRAVEL * self.radius.min())), 1, MAX_SUBSTEPS))
+        for _ in range(substeps):
+            self._advance(dt / substeps)
+
+    def _advance(self, dt: float) -> None:
+        x, v, r, e = self.positions, self.velocities, self.radius, self.restitution
+        v[:, 1] -= self.gravity * dt
+        x += v * dt
+
+        floor = x[:, 1] - r <= self.floor
+        bounce = floor & (v[:, 1] < 0)
+        # Only visible bounces get the sideways kick; a particle resting on the floor hits it every step
+        kicked = bounce & (v[:, 1] < -KICK_SPEED)
+        v[bounce, 1] *= -e[bounce]
+        v[kicked, 0] += self.rng.uniform(-BOUNCE_KICK, BOUNCE_KICK, np.count_nonzero(kicked))
+        v[floor, 0] *= FLOOR_FRICTION
+
+        left = (x[:, 0] - r <= self.left) & (v[:, 0] < 0)
+        v[left, 0] *= -e[left]
+        right = (x[:, 0] + r >= self.right) & (v[:, 0] > 0)
+        v[right, 0] *= -e[right]
+        self._clamp()
+
+        if self.collisions and len(x) > 1:
+            self._collide()
+        v[(np.abs(v[:, 1]) < REST_SPEED) & (np.abs(x[:, 1] - r - self.floor) < 1e-3), 1] = 0.0
+
+    def _clamp(self) -> None:
+        """Move particles that crossed the floor or a wall back onto it."""
+        x, r = self.positions, self.radius
+        x[:, 1] = np.maximum(x[:, 1], self.floor + r)
+        x[:, 0] = np.clip(x[:, 0], self.left + r, self.right - r)
+
+    def candidate_pairs(self) -> tuple[np.ndarray, np.ndarray]:
+        """Index pairs ``(i, j)`` in the same or adjacent spatial-hash cells, each pair once."""
+        size = 2 * self.radius.max()
+        cells = np.floor(self.positions[:, :2] / size).astype(np.int64)
+        keys = cells[:, 0] * 2**32 + cells[:, 1]
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        unique, starts, counts = np.unique(sorted_keys, return_index=True, return_counts=True)
+        firsts, seconds = [], []
+        for dx, dy in NEIGHBOUR_CELLS:
+            wanted = (cells[order, 0] + dx) * 2**32 + cells[order, 1] + dy
+            slot = np.minimum(np.searchsorted(unique, wanted), len(unique) - 1)
+            count = np.where(unique[slot] == wanted, counts[slot], 0)
+            # Every particle against every member of the wanted cell (positions in sorted order)
+            first = np.repeat(np.arange(len(order)), count)
+            second = np.repeat(starts[slot], count) + np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+            if (dx, dy) == (0, 0):
+                keep = second > first
+                first, second = first[keep], second[keep]
+            firsts.append(order[first])
+            seconds.append(order[second])
+        return np.concatenate(firsts), np.concatenate(seconds)
+
+    def _contacts(self, i, j):
+        """Overlapping pairs among ``(i, j)`` with their unit normals (i towards j) and overlap depth."""
+        delta = self.positions[j, :2] - self.positions[i, :2]
+        distance = np.sqrt(np.einsum("ij,ij->i", delta, delta))
+        depth = self.radius[i] + self.radius[j] - distance
+        touching = depth > 0
+        delta, distance = delta[touching], distance[touching]
+        # Coincident centers (e.g. both clamped into a corner) separate sideways
+        normal = np.where(distance[:, None] > 1e-12, delta / np.maximum(distance, 1e-12)[:, None], [1.0, 0.0])
+        return i[touching], j[touching], normal, depth[touching]
+
+    def _collide(self) -> None:
+        """Relax overlaps and cancel approach speeds over the candidate pairs, a few Jacobi sweeps."""
+        pairs = self.candidate_pairs()
+        x, v = self.positions, self.velocities
+        for _ in range(COLLISION_ITERATIONS):
+            i, j, normal, depth = self._contacts(*pairs)
+            if not len(i):
+                break
+            # Jacobi averaging: a particle in several contacts moves by the mean of their pushes,
+            # so deep piles neither stay compressed nor overshoot
+            contacts = np.maximum(np.bincount(np.concatenate([i, j]), minlength=len(x)), 1)[:, None]
+            x[:, :2] += self._pair_sum(i, j, (-0.5 * depth)[:, None] * normal) / contacts
+            # Equal-mass impulse along the normal for approaching pairs, averaged the same way
+            approach = np.einsum("ij,ij->i", v[j, :2] - v[i, :2], normal)
+            e = np.minimum(self.restitution[i], self.restitution[j])
+            impulse = (0.5 * (1 + e) * np.minimum(approach, 0.0))[:, None] * normal
+            v[:, :2] += self._pair_sum(i, j, impulse) / contacts
+            self._clamp()
+
+    def _pair_sum(self, i, j, values) -> np.ndarray:
+        """Per-particle sum of ``values`` added to ``i`` and subtracted from ``j`` (bincount, not ``add.at``)."""
+        n = len(self.positions)
+        return np.column_stack([
+            np.bincount(i, values[:, k], minlength=n) - np.bincount(j, values[:, k], minlength=n) for k in range(values.shape[1])
+        ])
+
+
+class Trajectory(NamedTuple):
+    positions: np.ndarray  # (samples, particles, 2) float32, sample k at time k * interval
+    interval: float
+
+    @property
+    def duration(self) -> float:
+        return (len(self.positions) - 1) * self.interval
+
+    def at(self, time: float) -> np.ndarray:
+        """(particles, 3) positions at ``time``, linear between samples and held after the end."""
+        position = float(np.clip(time / self.interval, 0, len(self.positions) - 1))
+        i = min(int(position), max(len(self.positions) - 2, 0))
+        t = position - i
+        xy = self.positions[i] * (1 - t) + self.positions[min(i + 1, len(self.positions) - 1)] * t
+        return np.column_stack([xy, np.zeros(len(xy))])
+
+
+def bake_dir() -> Path:
+    return config.media_dir() / "baked"
+
+
+def bake(system: ParticleSystem, duration: float, step: float = BAKE_STEP, samples_per_second: int = BAKE_SAMPLES_PER_SECOND, cache: bool = True) -> Trajectory:
+    """Simulate a copy of ``system`` for ``duration`` seconds at the fixed ``step``.
+
+    Systems without a seed are simulated but not cached (their kicks are not reproducible).
+    """
+    steps_per_sample = max(1, round(1 / (samples_per_second * step)))
+    interval = steps_per_sample * step
+    num_samples = int(np.ceil(duration / interval)) + 1
+    cache = cache and system.seed is not None
+    path = bake_dir() / f"{system.key(duration=duration, step=step, steps_per_sample=steps_per_sample)}.npy"
+    if cache and path.exists():
+        return Trajectory(np.load(path, mmap_mode="r"), interval)
+
+    simulation = copy.deepcopy(system)
+    positions = np.empty((num_samples, len(simulation), 2), dtype=np.float32)
+    positions[0] = simulation.positions[:, :2]
+    for k in range(1, num_samples):
+        for _ in range(steps_per_sample):
+            simulation.step(step)
+        positions[k] = simulation.positions[:, :2]
+    if cache:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Parallel chunk workers may bake the same key; each writes its own file and renames
+        partial = path.with_suffix(f".{os.getpid()}.npy")
+        np.save(partial, positions)
+        os.replace(partial, path)
+    return Trajectory(positions, interval)
+
+
+class ParticleCloud(VMobject):
+    """Every particle of ``system`` drawn as a copy of ``template``, all in one VMobject.
+
+    Args:
+        system (ParticleSystem): Positions to draw.
+        template (VMobject): Outline and style of one particle (drawn as-is, centered on each particle).
+    """
+
+    def __init__(self, system: ParticleSystem, template: VMobject | None = None, **kwargs):
+        super().__init__(**kwargs)
+        template = template if template is not None else Circle(radius=float(system.radius[0]))
+        self.system = system
+        self.outline = template.points - template.get_center()
+        self.match_style(template)
+        self.sync()
+
+    def sync(self, positions=None) -> "ParticleCloud":
+        """Copy ``positions`` (the system's by default) into the outline points."""
+        positions = self.system.positions if positions is None else positions
+        self.set_points((self.outline[None] + positions[:, None]).reshape(-1, 3))
+        return self
+
+    def advance(self, dt: float) -> "ParticleCloud":
+        self.system.step(dt)
+        return self.sync()
+
+    def start(self) -> "ParticleCloud":
+        """Step the system with the renderer's ``dt`` every frame."""
+        self.add_updater(ParticleCloud.advance)
+        return self
+
+    def replay(self, trajectory: Trajectory, start_time: float = 0.0) -> "ParticleCloud":
+        """Follow a baked ``trajectory`` by elapsed time instead of stepping the system."""
+        self.trajectory = trajectory
+        self.time = start_time
+        self.add_updater(ParticleCloud.follow)
+        return self.sync(trajectory.at(start_time))
+
+    def follow(self, dt: float) -> "ParticleCloud":
+        # Only the summed time matters, so one large dt (a skipped animation) lands on the same state
+        self.time += dt
+        return self.sync(self.trajectory.at(self.time))
+
+    def stop(self) -> "ParticleCloud":
+        self.remove_updater(ParticleCloud.advance)
+        self.remove_updater(ParticleCloud.follow)
+        return self
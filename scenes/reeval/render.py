@@ -0,0 +1,262 @@
+"""Render every scene in the project in parallel, skipping the ones that haven't changed.
+
+::
+
+    python -m reeval.render                 # everything, preview quality
+    python -m reeval.render -q h 4_PL       # only scenes whose key matches "4_PL"
+    python -m reeval.render --dry-run       # show what would render
+
+Scenes are discovered statically (classes deriving from a manim ``*Scene``
+base, directly or through another class in the same file) and each one is
+rendered by its own ``manim`` subprocess on a worker pool sized to the
+machine, longest-first by the previous run's timings. A scene is skipped when
+its content hash matches the manifest and its output still exists. The hash
+covers the scene file, the shared ``reeval`` package, manim.cfg, the data
+files the scene references and the quality/extra arguments.
+
+The manifest (``<media_dir>/render_manifest.json``) records per scene the
+hash, output files, wall time and status; per-scene manim logs go to
+``<media_dir>/logs``.
+"""
+from __future__ import annotations
+
+import argparse
+import ast
+import fnmatch
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import NamedTuple
+
+from . import config, logs, texcache
+
+MANIM_SCENE_BASES = {
+    "Scene",
+    "MovingCameraScene",
+    "ThreeDScene",
+    "SpecialThreeDScene",
+    "ZoomedScene",
+    "VectorScene",
+    "LinearTransformationScene",
+}
+MANIFEST_FILE = "render_manifest.json"
+PACKAGE_DIR = Path(__file__).resolve().parent
+
+
+class SceneJob(NamedTuple):
+    file: Path
+    scene: str
+
+    @property
+    def key(self) -> str:
+        return f"{self.file.relative_to(config.SCENES_DIR).as_posix()}::{self.scene}"
+
+
+def _base_names(node: ast.ClassDef) -> list[str]:
+    names = []
+    for base in node.bases:
+        if isinstance(base, ast.Name):
+            names.append(base.id)
+        elif isinstance(base, ast.Attribute):
+            names.append(base.attr)
+    return names
+
+
+def scene_classes(path: Path) -> list[str]:
+    """Names of the Scene subclasses defined in ``path``, in source order."""
+    tree = ast.parse(path.read_text(), filename=str(path))
+    scenes = []
+    known = set(MANIM_SCENE_BASES)
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and known.intersection(_base_names(node)):
+            scenes.append(node.name)
+            known.add(node.name)
+    return scenes
+
+
+def discover_jobs(root: Path = config.SCENES_DIR) -> list[SceneJob]:
+    return [SceneJob(path, scene) for path in texcache.scene_files(root) for scene in scene_classes(path)]
+
+
+def data_dependencies(path: Path) -> list[Path]:
+    """Data files a scene file reads, from ``data_path(...)`` and the log loaders."""
+    deps = []
+    tree = ast.parse(path.read_text(), filename=str(path))
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call):
+            continue
+        name = node.func.id if isinstance(node.func, ast.Name) else getattr(node.func, "attr", None)
+        literal_args = [a.value for a in node.args if isinstance(a, ast.Constant) and isinstance(a.value, str)]
+        params = []
+        if name == "data_path" and literal_args:
+            deps.append(config.data_path(*literal_args))
+        elif name == "load_parameter_log" and literal_args:
+            params = literal_args[:1]
+        elif name == "load_learning_logs":
+            params = ["z", "theta"]
+        for param in params:
+            try:
+                deps.extend(logs.find_log_files(param))
+            except FileNotFoundError:
+                deps.append(config.data_path(f"{logs.LOG_PREFIX}_{param}.jsonl"))
+    return deps
+
+
+def _hash_tree(digest, path: Path, content: bool) -> None:
+    """Feed ``path`` (a file or every file below a directory) into ``digest``."""
+    files = sorted(p for p in path.rglob("*") if p.is_file()) if path.is_dir() else [path]
+    for file in files:
+        digest.update(str(file).encode())
+        if not file.exists():
+            digest.update(b"<missing>")
+        elif content:
+            digest.update(file.read_bytes())
+        else:
+            # Data files are large; size + mtime is enough to notice a new export
+            stat = file.stat()
+            digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+
+
+def hash_inputs(digest, file: Path) -> None:
+    """Feed what a scene file's output depends on into ``digest``.
+
+    The file and its folder's manim.cfg, every ``reeval`` source and the
+    size/mtime of the data files it reads (``data_dependencies``).
+    """
+    _hash_tree(digest, file, content=True)
+    _hash_tree(digest, file.parent / "manim.cfg", content=True)
+    for source in sorted(PACKAGE_DIR.glob("*.py")):
+        _hash_tree(digest, source, content=True)
+    for dep in data_dependencies(file):
+        _hash_tree(digest, dep, content=False)
+
+
+def job_hash(job: SceneJob, render_args: list[str]) -> str:
+    digest = hashlib.sha256()
+    digest.update(job.key.encode())
+    digest.update(json.dumps(render_args).encode())
+    hash_inputs(digest, job.file)
+    return digest.hexdigest()
+
+
+def load_manifest(path: Path) -> dict:
+    if path.exists():
+        return json.loads(path.read_text())
+    return {"scenes": {}}
+
+
+def find_outputs(job: SceneJob, media: Path, since: float) -> list[str]:
+    videos = media / "videos" / job.file.stem
+    images = media / "images" / job.file.stem
+    candidates = list(videos.glob(f"*/{job.scene}.*")) + list(images.glob(f"{job.scene}*.png"))
+    return sorted(str(p) for p in candidates if p.is_file() and p.stat().st_mtime >= since - 1)
+
+
+def render_job(job: SceneJob, render_args: list[str], media: Path) -> dict:
+    """Run one manim subprocess; returns the manifest entry for the scene."""
+    log_dir = media / "logs"
+    log_dir.mkdir(parents=True, exist_ok=True)
+    log_path = log_dir / (job.key.replace("/", "_").replace("::", "__") + ".log")
+    command = [sys.executable, "-m", "manim", "render", *render_args, "--media_dir", str(media), job.file.name, job.scene]
+
+    start = time.time()
+    with open(log_path, "w") as log:
+        # Run next to the script so its folder-wide manim.cfg and relative paths apply
+        result = subprocess.run(command, cwd=job.file.parent, stdout=log, stderr=subprocess.STDOUT)
+    elapsed = time.time() - start
+    return {
+        "status": "ok" if result.returncode == 0 else f"failed ({result.returncode})",
+        "seconds": round(elapsed, 2),
+        "outputs": find_outputs(job, media, start),
+        "log": str(log_path),
+        "rendered_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(start)),
+    }
+
+
+def render_all(jobs: list[SceneJob], render_args: list[str], workers: int | None = None, force: bool = False, dry_run: bool = False, report=print, known: set[str] | None = None) -> dict:
+    """Render ``jobs`` across a worker pool and update the manifest.
+
+    ``known`` is the key set of every scene in the project (``jobs`` may be a
+    filtered subset); manifest entries of scenes outside it are dropped.
+    """
+    media = config.media_dir()
+    manifest_path = media / MANIFEST_FILE
+    manifest = load_manifest(manifest_path)
+    entries = manifest.setdefault("scenes", {})
+    if known is not None:
+        for key in set(entries) - known:
+            del entries[key]
+
+    pending = []
+    for job in jobs:
+        digest = job_hash(job, render_args)
+        previous = entries.get(job.key, {})
+        outputs_exist = previous.get("outputs") and all(Path(p).exists() for p in previous["outputs"])
+        if not force and previous.get("hash") == digest and previous.get("status") == "ok" and outputs_exist:
+            report(f"skip    {job.key} (unchanged)")
+            continue
+        pending.append((job, digest, previous.get("seconds", 0.0)))
+
+    # Longest first so the total is bounded by the slowest scene, not by unlucky ordering
+    pending.sort(key=lambda item: item[2], reverse=True)
+    if dry_run:
+        for job, _, _ in pending:
+            report(f"render  {job.key}")
+        return manifest
+
+    media.mkdir(parents=True, exist_ok=True)
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = {pool.submit(render_job, job, render_args, media): (job, digest) for job, digest, _ in pending}
+        for future in as_completed(futures):
+            job, digest = futures[future]
+            entry = future.result()
+            entry["hash"] = digest
+            entries[job.key] = entry
+            report(f"{entry['status']:<7} {job.key} in {entry['seconds']:.1f}s")
+            manifest_path.write_text(json.dumps(manifest, indent=2))
+
+    manifest["last_run"] = {
+        "render_args": render_args,
+        "rendered": len(pending),
+        "skipped": len(jobs) - len(pending),
+        "wall_seconds": round(time.time() - start, 2),
+    }
+    manifest_path.write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Render all REEVAL scenes in parallel.")
+    parser.add_argument("patterns", nargs="*", help="only scenes whose 'file::Scene' key contains or glob-matches one of these")
+    parser.add_argument("-q", "--quality", default="l", choices=list("lmhpk"), help="manim quality flag (default: l)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="parallel renders (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="render even if unchanged")
+    parser.add_argument("--dry-run", action="store_true", help="list the scenes that would render")
+    parser.add_argument("--prewarm-tex", action="store_true", help="fill the shared TeX cache first")
+    parser.add_argument("--manim-args", default="", help="extra arguments passed to 'manim render'")
+    args = parser.parse_args(argv)
+
+    all_jobs = discover_jobs()
+    jobs = all_jobs
+    if args.patterns:
+        jobs = [j for j in jobs if any(p in j.key or fnmatch.fnmatch(j.key, p) for p in args.patterns)]
+    render_args = [f"-q{args.quality}", *args.manim_args.split()]
+
+    if args.prewarm_tex and not args.dry_run:
+        for spec, error in texcache.prewarm(sorted({j.file for j in jobs}), args.workers):
+            print(f"tex failed: {spec.strings}: {error}", file=sys.stderr)
+
+    manifest = render_all(jobs, render_args, args.workers, args.force, args.dry_run, known={j.key for j in all_jobs})
+    # Only this run's scenes decide the exit status
+    failed = [j.key for j in jobs if manifest["scenes"].get(j.key, {}).get("status", "ok") != "ok"]
+    return 1 if failed and not args.dry_run else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
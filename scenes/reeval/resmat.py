@@ -0,0 +1,202 @@
+"""Bit-packed, memory-mapped store for the (test-takers x questions) response matrix.
+
+On disk a store is a directory with three files:
+
+- ``correct.npy``: uint8, shape (n_rows, ceil(n_cols / 8)), one bit per cell,
+  1 = correct answer (little bit order, see ``np.packbits``).
+- ``missing.npy``: same layout, 1 = no response (NaN in the original matrix).
+- ``meta.json``: shape plus optional test-taker names and per-question
+  labels (``input.text``, ``scenario``, ``benchmark``) from ``resmat.pkl``.
+
+Both bit planes are opened with ``np.load(mmap_mode="r")`` so slicing only
+touches the bytes that cover the requested rows/columns. The 183 x 78,712
+matrix is about 1.8 MB per plane instead of 115 MB as float64.
+
+Convert once from the pickle::
+
+    python -m reeval.resmat ../data/resmat.pkl ../data/resmat   (run from scenes/)
+"""
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+CORRECT_FILE = "correct.npy"
+MISSING_FILE = "missing.npy"
+META_FILE = "meta.json"
+FORMAT_VERSION = 1
+
+
+def _packed_width(n_cols: int) -> int:
+    return (n_cols + 7) // 8
+
+
+def _pack(bits: np.ndarray) -> np.ndarray:
+    return np.packbits(bits, axis=-1, bitorder="little")
+
+
+def _unpack_cols(packed: np.ndarray, cols, n_cols: int) -> np.ndarray:
+    """Decode the bits for ``cols`` from the last axis of ``packed``.
+
+    Contiguous column slices are unpacked from the covering byte range only;
+    any other index (ints, arrays, strided slices) gathers the bytes it needs.
+    """
+    if isinstance(cols, slice):
+        start, stop, step = cols.indices(n_cols)
+        if step == 1:
+            stop = max(start, stop)
+            first, last = start // 8, _packed_width(stop)
+            bits = np.unpackbits(
+                packed[..., first:last], axis=-1, bitorder="little"
+            )
+            return bits[..., start - first * 8 : stop - first * 8]
+        cols = np.arange(start, stop, step)
+    cols = np.asarray(cols)
+    if cols.dtype == bool:
+        cols = np.flatnonzero(cols)
+    cols = np.where(cols < 0, cols + n_cols, cols)
+    if np.any((cols < 0) | (cols >= n_cols)):
+        raise IndexError(f"column index out of range for {n_cols} columns")
+    return (packed[..., cols >> 3] >> (cols & 7).astype(np.uint8)) & 1
+
+
+class ResponseMatrix:
+    """Read-only view over a bit-packed response matrix store.
+
+    Indexing mirrors a 2D float array: ``resmat[:12, :8]`` returns a float32
+    array with 1.0 (correct), 0.0 (incorrect) and NaN (missing) for just
+    that block. Row and column indices are applied independently (outer
+    indexing, like ``np.ix_``), so ``resmat[[0, 5], [3, 9]]`` is a 2x2 block.
+    ``take`` returns the two planes separately for code that wants to avoid
+    NaN arithmetic.
+    """
+
+    def __init__(self, correct: np.ndarray, missing: np.ndarray, n_cols: int, columns: dict | None = None, index: list | None = None, path: Path | None = None):
+        if correct.shape != missing.shape:
+            raise ValueError("correct and missing bit planes must have the same shape")
+        if correct.shape[1] != _packed_width(n_cols):
+            raise ValueError(f"packed width {correct.shape[1]} does not match {n_cols} columns")
+        self.correct_bits = correct
+        self.missing_bits = missing
+        self.n_rows = correct.shape[0]
+        self.n_cols = n_cols
+        self.columns = columns or {}
+        self.index = index
+        self.path = path
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.n_rows, self.n_cols
+
+    @classmethod
+    def open(cls, path) -> "ResponseMatrix":
+        """Memory-map an existing store directory."""
+        path = Path(path)
+        meta = json.loads((path / META_FILE).read_text())
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"{path} has unsupported format version {meta.get('version')}")
+        correct = np.load(path / CORRECT_FILE, mmap_mode="r")
+        missing = np.load(path / MISSING_FILE, mmap_mode="r")
+        return cls(correct, missing, meta["n_cols"], meta.get("columns"), meta.get("index"), path)
+
+    @classmethod
+    def from_array(cls, values: np.ndarray, columns: dict | None = None, index: list | None = None) -> "ResponseMatrix":
+        """Pack an in-memory 0/1/NaN matrix without touching disk."""
+        values = np.asarray(values, dtype=np.float64)
+        missing = np.isnan(values)
+        correct = np.where(missing, 0, values) > 0.5
+        return cls(_pack(correct), _pack(missing), values.shape[1], columns, index)
+
+    @classmethod
+    def write(cls, path, values, columns: dict | None = None, index: list | None = None, chunk_rows: int = 16) -> "ResponseMatrix":
+        """Write ``values`` (array-like or DataFrame, rows = test-takers) as a store.
+
+        Rows are converted ``chunk_rows`` at a time so an object-dtype
+        DataFrame never has to be turned into one big float64 array.
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        n_rows, n_cols = values.shape
+        width = _packed_width(n_cols)
+        correct = np.lib.format.open_memmap(path / CORRECT_FILE, mode="w+", dtype=np.uint8, shape=(n_rows, width))
+        missing = np.lib.format.open_memmap(path / MISSING_FILE, mode="w+", dtype=np.uint8, shape=(n_rows, width))
+
+        rows_of = getattr(values, "iloc", values)
+        for start in range(0, n_rows, chunk_rows):
+            stop = min(start + chunk_rows, n_rows)
+            block = np.asarray(rows_of[start:stop], dtype=np.float64)
+            block_missing = np.isnan(block)
+            correct[start:stop] = _pack(np.where(block_missing, 0, block) > 0.5)
+            missing[start:stop] = _pack(block_missing)
+        correct.flush()
+        missing.flush()
+        del correct, missing
+
+        meta = {"version": FORMAT_VERSION, "n_rows": n_rows, "n_cols": n_cols}
+        if index is not None:
+            meta["index"] = [str(v) for v in index]
+        if columns:
+            meta["columns"] = {name: [str(v) for v in labels] for name, labels in columns.items()}
+        (path / META_FILE).write_text(json.dumps(meta))
+        return cls.open(path)
+
+    def take(self, rows=slice(None), cols=slice(None)) -> tuple[np.ndarray, np.ndarray]:
+        """Return ``(correct, observed)`` uint8/bool arrays for the given block."""
+        correct = _unpack_cols(self.correct_bits[rows], cols, self.n_cols)
+        observed = _unpack_cols(self.missing_bits[rows], cols, self.n_cols) == 0
+        return correct, observed
+
+    def take_pairs(self, rows, cols) -> tuple[np.ndarray, np.ndarray]:
+        """``(correct, observed)`` of the cells ``(rows[k], cols[k])``, elementwise."""
+        rows, cols = np.asarray(rows), np.asarray(cols)
+        shift = (cols & 7).astype(np.uint8)
+        correct = (self.correct_bits[rows, cols >> 3] >> shift) & 1
+        observed = ((self.missing_bits[rows, cols >> 3] >> shift) & 1) == 0
+        return correct, observed
+
+    def __getitem__(self, key) -> np.ndarray:
+        rows, cols = key if isinstance(key, tuple) else (key, slice(None))
+        correct, observed = self.take(rows, cols)
+        return np.where(observed, correct, np.nan).astype(np.float32)
+
+    def iter_column_blocks(self, block_size: int = 8192, rows=slice(None)):
+        """Yield ``(start, stop, correct, observed)`` for consecutive column blocks.
+
+        ``block_size`` is rounded up to a multiple of 8 so each block maps to
+        whole bytes of the packed planes.
+        """
+        block_size = max(8, -(-block_size // 8) * 8)
+        for start in range(0, self.n_cols, block_size):
+            stop = min(start + block_size, self.n_cols)
+            correct, observed = self.take(rows, slice(start, stop))
+            yield start, stop, correct, observed
+
+    def __repr__(self) -> str:
+        return f"ResponseMatrix(shape={self.shape}, path={self.path})"
+
+
+def convert_pickle(pkl_path, out_path) -> ResponseMatrix:
+    """One-time conversion of ``resmat.pkl`` (pandas DataFrame) to a store."""
+    import pandas as pd
+
+    df = pd.read_pickle(pkl_path)
+    columns = None
+    if isinstance(df.columns, pd.MultiIndex):
+        # Levels are (input.text, scenario, benchmark) in the REEVAL export
+        default_names = ["input.text", "scenario", "benchmark"]
+        columns = {}
+        for i, name in enumerate(df.columns.names):
+            if name is None:
+                name = default_names[i] if i < len(default_names) else f"level_{i}"
+            columns[str(name)] = df.columns.get_level_values(i).tolist()
+    return ResponseMatrix.write(out_path, df, columns=columns, index=df.index.tolist())
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("usage: python -m reeval.resmat <resmat.pkl> <store_dir>")
+    store = convert_pickle(sys.argv[1], sys.argv[2])
+    print(f"Wrote {store}")
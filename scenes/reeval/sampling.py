@@ -0,0 +1,175 @@
+"""Stratified draws from the ability prior by inverse-CDF sampling, no rejection.
+
+Collecting tail samples by drawing from the prior and keeping the ones past
+a cut throws away most draws: about 97.7% of them for ``theta <= -2``. Here
+every draw lands in its stratum. A draw from the prior truncated to
+``(a, b]`` is ``ppf(u)`` with ``u`` uniform on ``(cdf(a), cdf(b)]``. Strata
+on the upper side of the median are mapped through the survival function
+(``-isf``) instead, so far tails keep their precision instead of rounding to
+``1 - tiny``.
+
+``stratified_sample`` returns exactly ``counts[k]`` draws for stratum ``k``,
+from one generator call, in O(n). ``stratum_counts`` splits a total in
+proportion to the strata masses and always sums to the total. A prior is
+anything with ``cdf``/``sf``/``ppf``/``isf``/``median``:
+
+- ``NormalPrior``: N(mu, sigma). The ppf is Acklam's rational approximation
+  (relative error below 1.2e-9, plenty for scene positions), and the cdf is
+  ``math.erfc``, which is only ever called on the cut points.
+- ``HistogramPrior``: piecewise-uniform density of a histogram, e.g. the
+  fitted abilities of the last theta log iteration.
+
+::
+
+    prior = NormalPrior()                     # or HistogramPrior.from_samples(theta_log[-1])
+    cuts = [-np.inf, -2, 2, np.inf]
+    left, center, right = stratified_sample(prior, cuts, stratum_counts(prior, cuts, 300), seed=0)
+"""
+from __future__ import annotations
+
+import math
+from typing import NamedTuple
+
+import numpy as np
+
+# Acklam's inverse normal CDF: central rational function and tail function in sqrt(-2 log p)
+_A = (-3.969683028665376e01, 2.209460984245205e02, -2.759285104469687e02, 1.383577518672690e02, -3.066479806614716e01, 2.506628277459239e00)
+_B = (-5.447609879822406e01, 1.615858368580409e02, -1.556989798598866e02, 6.680131188771972e01, -1.328068155288572e01, 1.0)
+_C = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e00, -2.549732539343734e00, 4.374664141464968e00, 2.938163982698783e00)
+_D = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e00, 3.754408661907416e00, 1.0)
+_P_LOW = 0.02425  # below this the tail form is used
+
+_erfc = np.vectorize(math.erfc, otypes=[float])
+
+
+def standard_normal_ppf(p):
+    """Inverse of the standard normal CDF; -inf at 0, inf at 1 and NaN outside [0, 1]."""
+    p = np.asarray(p, dtype=float)
+    x = np.empty_like(p)
+    lower, upper = p < _P_LOW, p > 1 - _P_LOW
+    central = ~(lower | upper)
+
+    q = p[central] - 0.5
+    r = q * q
+    x[central] = q * np.polyval(_A, r) / np.polyval(_B, r)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for side, sign, tail in ((lower, 1.0, p[lower]), (upper, -1.0, 1 - p[upper])):
+            q = np.sqrt(-2 * np.log(tail))
+            x[side] = sign * np.polyval(_C, q) / np.polyval(_D, q)
+    # The rational function is inf / inf at the end points
+    x[p == 0] = -np.inf
+    x[p == 1] = np.inf
+    x[(p < 0) | (p > 1)] = np.nan
+    return x
+
+
+class NormalPrior(NamedTuple):
+    mu: float = 0.0
+    sigma: float = 1.0
+
+    @property
+    def median(self) -> float:
+        return self.mu
+
+    def cdf(self, x):
+        return 0.5 * _erfc(-(np.asarray(x, dtype=float) - self.mu) / (self.sigma * math.sqrt(2)))
+
+    def sf(self, x):
+        return 0.5 * _erfc((np.asarray(x, dtype=float) - self.mu) / (self.sigma * math.sqrt(2)))
+
+    def ppf(self, p):
+        return self.mu + self.sigma * standard_normal_ppf(p)
+
+    def isf(self, q):
+        return self.mu - self.sigma * standard_normal_ppf(q)
+
+
+class HistogramPrior:
+    """
+    Piecewise-uniform density of a histogram: the CDF interpolates the cumulative counts linearly.
+
+    Args:
+        edges (np.array): Bin edges, increasing.
+        counts (np.array): Count (or any non-negative weight) of every bin.
+    """
+
+    def __init__(self, edges, counts):
+        self.edges = np.asarray(edges, dtype=float)
+        counts = np.asarray(counts, dtype=float)
+        if len(self.edges) != len(counts) + 1 or counts.sum() <= 0:
+            raise ValueError("expected len(counts) + 1 edges and a positive total count")
+        self.cumulative = np.concatenate([[0.0], np.cumsum(counts) / counts.sum()])
+
+    @classmethod
+    def from_samples(cls, values, bins=40) -> "HistogramPrior":
+        """Histogram of the finite ``values`` (e.g. a theta log iteration); ``bins`` as for ``np.histogram``."""
+        values = np.asarray(values, dtype=float)
+        counts, edges = np.histogram(values[np.isfinite(values)], bins=bins)
+        return cls(edges, counts)
+
+    @property
+    def median(self) -> float:
+        return float(self.ppf(0.5))
+
+    def cdf(self, x):
+        return np.interp(x, self.edges, self.cumulative)
+
+    def sf(self, x):
+        return 1 - self.cdf(x)
+
+    def ppf(self, p):
+        return np.interp(p, self.cumulative, self.edges)
+
+    def isf(self, q):
+        return self.ppf(1 - np.asarray(q, dtype=float))
+
+
+def _open_uniforms(rng, n: int) -> np.ndarray:
+    """Uniforms strictly inside (0, 1), so no draw maps to an infinite cut."""
+    return (rng.integers(0, 2**53, n) + 0.5) * 2.0**-53
+
+
+def stratum_counts(prior, cuts, total: int) -> np.ndarray:
+    """Split ``total`` over the strata between consecutive ``cuts`` in proportion to their prior mass.
+
+    Largest remainders get the leftover draws, so the counts always sum to ``total``.
+    """
+    cuts = np.asarray(cuts, dtype=float)
+    mass = np.diff(prior.cdf(cuts))
+    share = total * mass / mass.sum()
+    counts = np.floor(share).astype(int)
+    counts[np.argsort(counts - share, kind="stable")[: total - counts.sum()]] += 1
+    return counts
+
+
+def stratified_sample(prior, cuts, counts, seed=None) -> list[np.ndarray]:
+    """Exactly ``counts[k]`` draws from ``prior`` truncated to ``(cuts[k], cuts[k + 1]]``, for every stratum.
+
+    Args:
+        prior: ``NormalPrior``, ``HistogramPrior`` or anything with the same methods.
+        cuts (np.array): Increasing stratum bounds; may start at -inf and end at inf.
+        counts (np.array): Draws per stratum (``len(cuts) - 1`` of them).
+        seed: As for ``np.random.default_rng``.
+    """
+    cuts = np.asarray(cuts, dtype=float)
+    counts = np.asarray(counts, dtype=int)
+    if len(counts) != len(cuts) - 1 or np.any(np.diff(cuts) <= 0):
+        raise ValueError("expected increasing cuts and one count per stratum")
+    lower, upper = cuts[:-1], cuts[1:]
+    # Upper-side strata are sampled in survival space, where their probabilities are small
+    with np.errstate(invalid="ignore"):
+        upper_side = np.where(np.isinf(lower), False, np.where(np.isinf(upper), True, (lower + upper) / 2 > prior.median))
+    lo = np.where(upper_side, prior.sf(upper), prior.cdf(lower))
+    hi = np.where(upper_side, prior.sf(lower), prior.cdf(upper))
+    if np.any((hi <= lo) & (counts > 0)):
+        raise ValueError("a stratum with draws has no prior mass")
+
+    stratum = np.repeat(np.arange(len(counts)), counts)
+    u = lo[stratum] + (hi - lo)[stratum] * _open_uniforms(np.random.default_rng(seed), len(stratum))
+    flip = upper_side[stratum]
+    x = np.empty(len(stratum))
+    x[flip] = prior.isf(u[flip])
+    x[~flip] = prior.ppf(u[~flip])
+    # Rounding at a finite cut must not leak a draw into the neighbouring stratum
+    x = np.clip(x, lower[stratum], upper[stratum])
+    return np.split(x, np.cumsum(counts)[:-1])
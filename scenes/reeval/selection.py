@@ -0,0 +1,204 @@
+"""Item-selection strategies for ``reeval.cat``: exposure control and content balancing.
+
+::
+
+    python -m reeval.cat --strategy randomesque --top-k 5
+    python -m reeval.cat --strategy sympson-hetter --max-exposure 0.2 --sh-rounds 5
+    python -m reeval.cat --quota-by benchmark
+
+Plain MFI gives every session with a similar estimate the same items, so a
+few items are seen by most test-takers. Each strategy sits between
+``simulate`` and the bank selector (``itembank.DifficultyIndex`` or
+``cat.DenseSelector``) and works on a whole block of sessions at once:
+
+- ``MaxInfo``: the most informative remaining item (the default).
+- ``Randomesque``: the ``k`` most informative items are drawn off the bank
+  one round at a time, one of them is given at random and the others go back.
+- ``SympsonHetter``: the MFI choice is given with probability ``K_j``,
+  otherwise it leaves the session's pool and the next one is offered. The
+  ``K_j`` come from repeated simulations (``update``) so that no item is
+  given to more than ``max_exposure`` of the sessions.
+- ``ContentQuota``: caps the items per content group (e.g. the ``benchmark``
+  column label) in a session; once a group is full the bank stops offering
+  its items to that session (``close_group``). Wraps any of the others.
+
+Every offer and every administration is counted per item in
+``ExposureCounters``.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+MAX_OFFERS = 32  # Sympson-Hetter offers per session and step before giving the last one regardless
+
+
+class ExposureCounters:
+    """
+    Per-item offer and administration counts.
+
+    Args:
+        n_items (int): Bank size.
+    """
+
+    def __init__(self, n_items: int):
+        self.counts = np.zeros((2, n_items), dtype=np.int64)
+
+    @property
+    def offered(self) -> np.ndarray:
+        return self.counts[0]
+
+    @property
+    def administered(self) -> np.ndarray:
+        return self.counts[1]
+
+    def record_offered(self, items) -> None:
+        np.add.at(self.counts[0], items, 1)
+
+    def record_administered(self, items) -> None:
+        np.add.at(self.counts[1], items, 1)
+
+    def reset(self) -> None:
+        self.counts[...] = 0
+
+
+class MaxInfo:
+    """Plain maximum-information selection."""
+
+    groups = None  # content group per item, for strategies that close groups on the bank
+
+    def start(self, bank, sessions, exposure=None) -> None:
+        """Called once per session block with that block's bank selector."""
+        self.bank = bank
+        self.exposure = exposure
+
+    def select(self, rows, theta) -> np.ndarray:
+        items = self.bank.select(rows, theta)
+        self._offered(items)
+        return items
+
+    def administered(self, rows, items) -> None:
+        """Called after ``items`` were given to ``rows`` (and removed from the bank)."""
+
+    def _offered(self, items) -> None:
+        if self.exposure is not None:
+            self.exposure.record_offered(items[items >= 0])
+
+
+class Randomesque(MaxInfo):
+    """
+    One of the ``k`` most informative remaining items, uniformly at random.
+
+    Args:
+        k (int): Candidates per pick.
+        seed (int): Seed for the draws.
+    """
+
+    def __init__(self, k: int = 5, seed=None):
+        self.k = k
+        self.rng = np.random.default_rng(seed)
+
+    def select(self, rows, theta) -> np.ndarray:
+        candidates = np.full((len(rows), self.k), -1)
+        for j in range(self.k):
+            candidates[:, j] = self.bank.select(rows, theta)
+            found = candidates[:, j] >= 0
+            self.bank.remove(rows[found], candidates[found, j])
+        taken = candidates >= 0
+        self.bank.restore(np.broadcast_to(rows[:, None], candidates.shape)[taken], candidates[taken])
+        # Uniform over the candidates each row actually has (fewer than k near the end of a bank)
+        pick = np.floor(self.rng.random(len(rows)) * np.maximum(taken.sum(axis=1), 1)).astype(int)
+        items = candidates[np.arange(len(rows)), pick]
+        self._offered(items)
+        return items
+
+
+class SympsonHetter(MaxInfo):
+    """
+    Sympson-Hetter exposure control: the MFI item is given with probability ``control[j]``.
+
+    Args:
+        control (np.array): Per-item ``K_j`` in [0, 1]; ones (no control) by default.
+        n_items (int): Bank size when ``control`` is not given.
+        seed (int): Seed for the acceptance draws.
+    """
+
+    def __init__(self, control=None, n_items: int | None = None, seed=None):
+        self.control = np.ones(n_items) if control is None else np.asarray(control, dtype=float)
+        self.rng = np.random.default_rng(seed)
+
+    def select(self, rows, theta) -> np.ndarray:
+        items = np.full(len(rows), -1)
+        pending = np.arange(len(rows))
+        for offer in range(MAX_OFFERS):
+            offered = self.bank.select(rows[pending], theta[pending])
+            self._offered(offered)
+            accept = (offered < 0) | (self.rng.random(len(pending)) < self.control[np.maximum(offered, 0)])
+            if offer == MAX_OFFERS - 1:
+                accept[:] = True
+            items[pending[accept]] = offered[accept]
+            # Rejected items are not given to this session at all
+            rejected = pending[~accept]
+            self.bank.remove(rows[rejected], offered[~accept])
+            pending = rejected
+            if not len(pending):
+                break
+        return items
+
+    def update(self, exposure: ExposureCounters, num_sessions: int, max_exposure: float) -> float:
+        """One Sympson-Hetter round from the offers of a simulation under the current ``control``.
+
+        ``K_j = max_exposure / P(offered_j)`` where that is below 1, else 1.
+        Returns the largest administration rate of that simulation, which
+        the rounds drive towards ``max_exposure``.
+        """
+        offered_rate = exposure.offered / max(num_sessions, 1)
+        with np.errstate(divide="ignore"):
+            self.control = np.where(offered_rate > max_exposure, max_exposure / offered_rate, 1.0)
+        return float(exposure.administered.max(initial=0) / max(num_sessions, 1))
+
+
+class ContentQuota(MaxInfo):
+    """
+    At most ``caps[g]`` items of content group ``g`` per session.
+
+    Args:
+        groups (np.array): Group id of every bank item (0 .. n_groups - 1).
+        caps (np.array): Per-group item cap.
+        inner: Strategy choosing among the items still allowed (``MaxInfo()`` by default).
+    """
+
+    def __init__(self, groups, caps, inner=None):
+        self.groups = np.asarray(groups, dtype=np.int64)
+        self.caps = np.asarray(caps, dtype=np.int64)
+        self.inner = inner or MaxInfo()
+
+    def start(self, bank, sessions, exposure=None) -> None:
+        super().start(bank, sessions, exposure)
+        self.inner.start(bank, sessions, exposure)
+        self.given = np.zeros((len(sessions), len(self.caps)), dtype=np.int64)
+        # Groups capped at 0 are never allowed
+        for group in np.flatnonzero(self.caps <= 0):
+            bank.close_group(np.arange(len(sessions)), group)
+
+    def select(self, rows, theta) -> np.ndarray:
+        return self.inner.select(rows, theta)
+
+    def administered(self, rows, items) -> None:
+        self.inner.administered(rows, items)
+        groups = self.groups[items]
+        np.add.at(self.given, (rows, groups), 1)
+        full = self.given[rows, groups] == self.caps[groups]
+        for group in np.unique(groups[full]):
+            self.bank.close_group(rows[full & (groups == group)], group)
+
+
+def proportional_caps(groups, max_items: int) -> np.ndarray:
+    """Per-group caps proportional to the group's share of the bank, rounded up (so they sum to at least ``max_items``)."""
+    sizes = np.bincount(np.asarray(groups, dtype=np.int64))
+    return np.ceil(max_items * sizes / max(sizes.sum(), 1)).astype(np.int64)
+
+
+def content_groups(labels) -> tuple[np.ndarray, list]:
+    """Integer group ids and the distinct names for per-item ``labels`` (e.g. ``resmat.columns["benchmark"]``)."""
+    names, groups = np.unique(np.asarray(labels, dtype=str), return_inverse=True)
+    return groups, names.tolist()
@@ -0,0 +1,112 @@
+"""Item-sharded calibration on a process pool over shared memory.
+
+::
+
+    python -m reeval.calibrate --shard-size 50000 -j 2   # writes rasch_calibrated_z_batch_0_50000.jsonl, ...
+
+``ShardedItems`` is the multi-process counterpart of ``calibrate.SerialItems``.
+The two packed bit planes of the response matrix are copied once into
+``multiprocessing.shared_memory`` blocks; every worker maps them and builds a
+zero-copy ``ResponseMatrix`` over the columns of the shard it is asked to
+process. Shards start on multiples of 8 so each one is a whole-byte slice of
+the packed planes.
+
+Per iteration each shard runs the same pass the serial code runs on the full
+matrix (Newton steps for its own difficulties) and returns the per-person
+sufficient statistics (expected scores and information for JML, the
+node log-likelihood for MML); ``calibrate.reduce_shards`` sums those (the
+all-reduce) and concatenates the difficulties, so the person update sees
+exactly what a single process would. ``calibrate_to_logs`` writes one
+``_batch_<start>_<stop>`` z log per shard, which ``logs.load_parameter_log``
+merges back in item order.
+"""
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .resmat import ResponseMatrix
+
+_WORKER_STATE = {}
+
+
+def shard_bounds(n_cols: int, shard_size: int | None = None, num_shards: int | None = None) -> list[tuple[int, int]]:
+    """Contiguous ``(start, stop)`` item ranges; every start is a multiple of 8."""
+    if shard_size is None:
+        shard_size = -(-n_cols // max(1, num_shards or os.cpu_count()))
+    shard_size = max(8, -(-shard_size // 8) * 8)
+    return [(start, min(start + shard_size, n_cols)) for start in range(0, n_cols, shard_size)]
+
+
+def _share(array: np.ndarray) -> shared_memory.SharedMemory:
+    block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+    return block
+
+
+def _attach(planes: dict) -> None:
+    """Worker initializer: map the shared bit planes once per process."""
+    for key, (name, shape, dtype) in planes.items():
+        block = shared_memory.SharedMemory(name=name)
+        _WORKER_STATE[key + "_block"] = block  # keep the mapping alive
+        _WORKER_STATE[key] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def _shard_view(correct_bits, missing_bits, start: int, stop: int) -> ResponseMatrix:
+    first, last = start // 8, (stop + 7) // 8
+    return ResponseMatrix(correct_bits[:, first:last], missing_bits[:, first:last], stop - start)
+
+
+def _run_shard(fn, start: int, stop: int, item_arrays, args):
+    resmat = _shard_view(_WORKER_STATE["correct"], _WORKER_STATE["missing"], start, stop)
+    return fn(resmat, *item_arrays, *args)
+
+
+class ShardedItems:
+    """Run item passes for disjoint item shards in a process pool.
+
+    Use as a context manager so the pool and the shared memory are released::
+
+        with ShardedItems(resmat, shard_size=50000) as items:
+            result = calibrate(resmat, items=items)
+
+    Args:
+        resmat (ResponseMatrix): The full matrix.
+        shard_size (int): Items per shard (rounded up to a multiple of 8).
+        num_shards (int): Alternative to ``shard_size``; defaults to the CPU count.
+        workers (int): Pool size, defaults to ``min(shards, CPU count)``.
+    """
+
+    def __init__(self, resmat: ResponseMatrix, shard_size: int | None = None, num_shards: int | None = None, workers: int | None = None):
+        self.resmat = resmat
+        self.shards = shard_bounds(resmat.shape[1], shard_size, num_shards)
+        self.blocks = [_share(np.ascontiguousarray(resmat.correct_bits)), _share(np.ascontiguousarray(resmat.missing_bits))]
+        planes = {
+            key: (block.name, resmat.correct_bits.shape, np.uint8)
+            for key, block in zip(("correct", "missing"), self.blocks)
+        }
+        workers = workers or min(len(self.shards), os.cpu_count())
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=(planes,))
+
+    def map(self, fn, item_arrays, *args) -> list:
+        futures = [
+            self.pool.submit(_run_shard, fn, start, stop, tuple(a[..., start:stop] for a in item_arrays), args)
+            for start, stop in self.shards
+        ]
+        return [future.result() for future in futures]
+
+    def close(self) -> None:
+        self.pool.shutdown()
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
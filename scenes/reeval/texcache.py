@@ -0,0 +1,168 @@
+"""Shared TeX -> SVG cache and a parallel prewarm for every formula in ``scenes/``.
+
+Manim names each compiled formula after a hash of the full ``.tex`` source
+and skips LaTeX when the matching ``.svg`` already exists in ``tex_dir``.
+The shared cache is simply manim's default ``tex_dir``,
+``<media_dir>/Tex`` of the project media dir (``media_dir`` setting). Every
+render uses it without configuration: ``manim render`` from ``scenes/``,
+``reeval.render`` (which passes that ``--media_dir``) and ``reeval.chunked``
+(which points its per-chunk media dirs' ``tex_dir`` back at it). Scenes
+must not set their own ``tex_dir``. This module fills the cache ahead of
+time::
+
+    python -m reeval.texcache            # compile every literal formula
+    python -m reeval.texcache --list     # just print what would be compiled
+
+Formulas are collected statically with ``ast``: ``MathTex``/``Tex``/
+``SingleStringMathTex``/``Title`` calls and ``get_x_axis_label``/
+``get_y_axis_label`` with string-literal arguments. Formulas built from
+runtime values (f-strings) are skipped and compile on first use as before.
+"""
+from __future__ import annotations
+
+import argparse
+import ast
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import NamedTuple
+
+from . import config
+
+TEX_CLASSES = {"MathTex", "Tex", "SingleStringMathTex", "Title"}
+AXIS_LABEL_METHODS = {"get_x_axis_label", "get_y_axis_label"}
+# Keyword arguments that change the generated .tex source (everything else is styling)
+COMPILE_OPTIONS = {"arg_separator", "substrings_to_isolate", "tex_to_color_map", "tex_environment"}
+
+
+class TexSpec(NamedTuple):
+    kind: str  # "MathTex" or "Tex"
+    strings: tuple
+    options: tuple  # sorted (name, value) pairs from COMPILE_OPTIONS
+
+
+def tex_cache_dir() -> Path:
+    """manim's ``tex_dir`` for the project media dir, shared by every render."""
+    return config.media_dir() / "Tex"
+
+
+def _call_name(node: ast.Call) -> str | None:
+    if isinstance(node.func, ast.Name):
+        return node.func.id
+    if isinstance(node.func, ast.Attribute):
+        return node.func.attr
+    return None
+
+
+def _freeze(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+def _spec_from_call(node: ast.Call) -> TexSpec | None:
+    name = _call_name(node)
+    if name in AXIS_LABEL_METHODS:
+        # Only plain strings become MathTex; mobject labels are their own calls
+        if node.args and isinstance(node.args[0], ast.Constant) and isinstance(node.args[0].value, str):
+            return TexSpec("MathTex", (node.args[0].value,), ())
+        return None
+    if name not in TEX_CLASSES:
+        return None
+
+    strings = []
+    for arg in node.args:
+        if not (isinstance(arg, ast.Constant) and isinstance(arg.value, str)):
+            return None
+        strings.append(arg.value)
+    if not strings:
+        return None
+
+    options = []
+    for keyword in node.keywords:
+        if keyword.arg in COMPILE_OPTIONS:
+            try:
+                options.append((keyword.arg, _freeze(ast.literal_eval(keyword.value))))
+            except ValueError:
+                return None
+    kind = "MathTex" if name in ("MathTex", "SingleStringMathTex") else "Tex"
+    return TexSpec(kind, tuple(strings), tuple(sorted(options)))
+
+
+def collect_tex_specs(paths) -> list[TexSpec]:
+    """Unique literal formulas used in the given scene files, in first-seen order."""
+    seen = {}
+    for path in paths:
+        tree = ast.parse(Path(path).read_text(), filename=str(path))
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Call):
+                spec = _spec_from_call(node)
+                if spec is not None:
+                    seen.setdefault(spec, None)
+    return list(seen)
+
+
+def scene_files(root: Path = config.SCENES_DIR) -> list[Path]:
+    """The scene scripts directly in ``root``.
+
+    Subfolders are not scanned: ``old/`` holds archived scenes with their own
+    manim.cfg, and ``reeval``/``tests`` hold no scenes.
+    """
+    return sorted(p for p in Path(root).glob("*.py") if p.name != "conftest.py")
+
+
+def compile_spec(spec: TexSpec) -> tuple[TexSpec, str | None]:
+    """Worker: typeset ``spec`` exactly as the scene would. Returns an error message or None."""
+    import manim
+
+    path = tex_cache_dir()
+    path.mkdir(parents=True, exist_ok=True)
+    manim.config.tex_dir = str(path)
+
+    options = {}
+    for key, value in spec.options:
+        options[key] = dict(value) if key == "tex_to_color_map" else value
+    try:
+        getattr(manim, spec.kind)(*spec.strings, **options)
+    except Exception as exc:  # a bad formula shouldn't stop the rest of the prewarm
+        return spec, f"{type(exc).__name__}: {exc}"
+    return spec, None
+
+
+def prewarm(paths=None, workers: int | None = None) -> list[tuple[TexSpec, str]]:
+    """Compile every collected formula in a process pool; returns the failures."""
+    specs = collect_tex_specs(paths or scene_files())
+    failures = []
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        for future in as_completed([pool.submit(compile_spec, spec) for spec in specs]):
+            spec, error = future.result()
+            if error is not None:
+                failures.append((spec, error))
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Prewarm the shared TeX cache for all scenes.")
+    parser.add_argument("paths", nargs="*", type=Path, help="scene files (default: the scene scripts in scenes/, not old/)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--list", action="store_true", help="print the collected formulas and exit")
+    args = parser.parse_args(argv)
+
+    paths = args.paths or scene_files()
+    if args.list:
+        for spec in collect_tex_specs(paths):
+            print(spec.kind, " | ".join(spec.strings))
+        return 0
+
+    print(f"Prewarming TeX cache in {tex_cache_dir()}")
+    failures = prewarm(paths, args.workers)
+    for spec, error in failures:
+        print(f"failed: {spec.kind}{spec.strings}: {error}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
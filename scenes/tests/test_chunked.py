@@ -0,0 +1,48 @@
+import pytest
+
+from reeval.chunked import chunk_settings, plan_chunks
+
+
+def _covers(chunks, num_plays):
+    plays = [i for first, last in chunks for i in range(first, last + 1)]
+    return plays == list(range(num_plays))
+
+
+@pytest.mark.parametrize(
+    "durations, num_chunks",
+    [
+        ([10.0, 1.0, 1.0, 1.0], 2),  # the first play alone reaches the target
+        ([1.0, 1.0, 1.0], 3),  # one chunk per play
+        ([1.0] * 8, 8),
+        ([0.5, 3.0, 0.2, 2.0, 1.0], 4),
+    ],
+)
+def test_plan_chunks_never_ends_a_range_at_play_zero(durations, num_chunks):
+    chunks = plan_chunks(durations, num_chunks)
+    assert _covers(chunks, len(durations))
+    assert chunks[0][1] > 0
+    for first, last in chunks:
+        chunk_settings(first, last, len(durations))
+
+
+def test_plan_chunks_single_play():
+    assert plan_chunks([2.0], 4) == [(0, 0)]
+    assert chunk_settings(0, 0, 1) == {"from_animation_number": 0}
+
+
+def test_plan_chunks_balances_duration():
+    assert plan_chunks([1.0] * 6, 3) == [(0, 1), (2, 3), (4, 5)]
+
+
+def test_chunk_settings_mapping():
+    assert chunk_settings(0, 2, 6) == {"from_animation_number": 0, "upto_animation_number": 2}
+    assert chunk_settings(3, 4, 6) == {"from_animation_number": 3, "upto_animation_number": 4}
+    # The last range renders to the end instead of relying on upto_animation_number
+    assert chunk_settings(5, 5, 6) == {"from_animation_number": 5}
+
+
+def test_chunk_settings_rejects_range_ending_at_play_zero():
+    with pytest.raises(ValueError):
+        chunk_settings(0, 0, 3)
+    with pytest.raises(ValueError):
+        chunk_settings(2, 1, 3)